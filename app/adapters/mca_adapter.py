@@ -1,6 +1,9 @@
-import httpx
+from app.core.config import settings
+from app.core.http import get_client
+from app.core.adapter_cache import cached_adapter
 from bs4 import BeautifulSoup
 
+@cached_adapter("mca", ttl=86400, stale_ttl=86400)
 def search_mca_company(name: str) -> dict:
     """
     Lightweight MCA company check using Google search.
@@ -10,11 +13,9 @@ def search_mca_company(name: str) -> dict:
 
     try:
         query = f'site:mca.gov.in "{name}" "Master Data"'
-        url = f"https://www.google.com/search?q={query}"
-
         headers = {"User-Agent": "Mozilla/5.0"}
 
-        r = httpx.get(url, headers=headers, timeout=10)
+        r = get_client("google").get(settings.MCA_SEARCH_URL, params={"q": query}, headers=headers, timeout=10)
         soup = BeautifulSoup(r.text, "html.parser")
 
         links = soup.find_all("a")
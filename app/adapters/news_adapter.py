@@ -1,58 +1,205 @@
-import httpx
+import contextvars
+import datetime
+import logging
+import math
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
 from app.core.config import settings
+from app.core.http import get_client
+from app.core.keyword_matcher import KeywordMatcher
+from app.core.quota import check_quota, skipped
+from app.core.adapter_cache import cached_adapter
+from app.services import news_store
+
+logger = logging.getLogger(__name__)
+
+scam_matcher = KeywordMatcher(settings.NEWS_SCAM_KEYWORDS)
+
+# Pages after the first are fetched in parallel
+_page_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="news-page")
+
+
+def _fetch_page(entity: str, page: int, since: str = None) -> dict:
+    params = {
+        "q": entity,  # broad search, we filter locally
+        "apiKey": settings.NEWS_API_KEY,
+        "language": "en",
+        "sortBy": "relevancy",
+        "pageSize": settings.NEWS_PAGE_SIZE,
+        "page": page,
+    }
+    if since:
+        params["from"] = since
+
+    denied = check_quota("newsapi")
+    if denied:
+        return denied
+
+    resp = get_client("newsapi").get(settings.NEWS_API_URL, params=params, timeout=10)
+    if resp.status_code == 429:
+        return skipped("newsapi", "quota (429)")
+    if resp.status_code != 200:
+        return {"error": f"NewsAPI error {resp.status_code}"}
+    return resp.json()
+
+
+def scan_articles(entity: str, articles: list) -> dict:
+    """
+    Keeps articles that mention the entity and reach NEWS_SCAM_MIN_WEIGHT
+    in scam keywords, with each keyword hit's field and offset.
+    """
+    entity_l = entity.lower()
+    keyword_hits = Counter()
+    scam_hits = []
+
+    for art in articles:
+        title = art.get("title") or ""
+        desc = art.get("description") or ""
+        text = f"{title} {desc}"
+
+        # entity MUST appear in the text
+        if entity_l not in text.lower():
+            continue
+
+        hits = scam_matcher.find(text)
+        weight = sum(scam_matcher.weights[kw] for kw in {h.keyword for h in hits})
+        if not hits or weight < settings.NEWS_SCAM_MIN_WEIGHT:
+            continue
+
+        matches = [
+            {"keyword": h.keyword, "field": "title", "offset": h.start} if h.start < len(title) else
+            {"keyword": h.keyword, "field": "description", "offset": h.start - len(title) - 1}
+            for h in hits
+        ]
+        keyword_hits.update(h.keyword for h in hits)
+        scam_hits.append({**art, "scam_weight": weight, "matches": matches})
+
+    scam_hits.sort(key=lambda a: a["scam_weight"], reverse=True)
+    return {
+        "scam_related": len(scam_hits),
+        "scam_articles": scam_hits[:3],
+        "keyword_hits": dict(keyword_hits),
+    }
+
+
+def fetch_articles(entity: str, since: datetime.datetime = None) -> dict:
+    """
+    Up to NEWS_MAX_PAGES pages of NewsAPI results (the first tells how
+    many exist; the rest are fetched in parallel unless the first already
+    has a scam hit), de-duplicated by URL. Each page is one request of
+    the newsapi quota.
+    since limits the query to articles published after it.
+    Returns {"articles", "total_results", "pages_fetched", "pages_failed",
+    "complete"} or the first page's error / skipped result; complete is
+    True when every page of results was fetched.
+    """
+    since_s = since.strftime("%Y-%m-%dT%H:%M:%S") if since else None
+    first = _fetch_page(entity, 1, since_s)
+    if "articles" not in first:
+        return first
+
+    available = math.ceil(first.get("totalResults", 0) / settings.NEWS_PAGE_SIZE)
+    last_page = min(settings.NEWS_MAX_PAGES, available)
+    if last_page > 1 and scan_articles(entity, first["articles"])["scam_related"]:
+        # more pages can't change the verdict, only spend quota
+        last_page = 1
+    pages = [
+        # carry the caller's quota priority into the page threads
+        _page_pool.submit(contextvars.copy_context().run, _fetch_page, entity, page, since_s)
+        for page in range(2, last_page + 1)
+    ]
+
+    articles = list(first["articles"])
+    failed = 0
+    for fut in pages:
+        try:
+            data = fut.result()
+        except Exception:
+            data = {}
+        if "articles" in data:
+            articles.extend(data["articles"])
+        else:
+            failed += 1
+
+    seen = set()
+    unique = []
+    for art in articles:
+        url = art.get("url")
+        if url and url in seen:
+            continue
+        seen.add(url)
+        unique.append(art)
+
+    return {
+        "articles": unique,
+        "total_results": first.get("totalResults", 0),
+        "pages_fetched": 1 + len(pages) - failed,
+        "pages_failed": failed,
+        "complete": available <= last_page and not failed,
+    }
+
+
+def _search_upstream(entity: str) -> dict:
+    fetched = fetch_articles(entity)
+    if "articles" not in fetched:
+        return fetched
+    articles = fetched.pop("articles")
+    return {"total_articles": len(articles), **fetched, **scan_articles(entity, articles)}
+
+
+def _search_with_store(entity: str, tokens: list) -> dict:
+    """
+    Answers from the local article store, querying NewsAPI first only
+    when no fresh fetch covers these tokens - and then only for articles
+    published since the last fetch (minus NEWS_STORE_OVERLAP_SECONDS).
+    """
+    last_fetched, was_complete, covered = news_store.fetch_state(tokens)
+    out = {"from_store": covered, "new_articles": 0}
+
+    if not covered:
+        since = None
+        if last_fetched is not None:
+            since = last_fetched - datetime.timedelta(seconds=settings.NEWS_STORE_OVERLAP_SECONDS)
+
+        started = datetime.datetime.now(datetime.timezone.utc)
+        fetched = fetch_articles(entity, since)
+        if "articles" in fetched:
+            out["new_articles"] = news_store.add_articles(fetched.pop("articles"))
+            # an incremental fetch only completes what an earlier complete one stored
+            news_store.mark_fetched(tokens, started, fetched["complete"] and (since is None or was_complete))
+            out.update(fetched)
+        elif last_fetched is None:
+            return fetched
+        else:
+            # upstream refused (quota) or failed: older local articles beat nothing
+            out.update(from_store=True, stale=True, upstream=fetched)
+
+    articles = news_store.articles_for(tokens)
+    return {"total_articles": len(articles), **out, **scan_articles(entity, articles)}
 
-STRONG_SCAM_KEYWORDS = [
-    "scam", "fraud", "ponzi", "fake", "phishing",
-    "cheat", "cheating", "money laundering", "scam alert",
-    "fraud case", "fraudster", "fake investment"
-]
 
+@cached_adapter("news_api", ttl=3600, stale_ttl=6 * 3600)
 def search_news(entity: str) -> dict:
     """
     Searches NewsAPI for scam/fraud related reports
     about a company or domain, with stricter filtering.
+    Articles are kept in the local news store, which answers repeat
+    queries for the same or narrower entities without NewsAPI.
     """
     entity = (entity or "").strip()
     if not entity:
         return {"total_articles": 0, "scam_related": 0, "scam_articles": []}
 
     try:
-        params = {
-            "q": entity,  # broad search, we filter locally
-            "apiKey": settings.NEWS_API_KEY,
-            "language": "en",
-            "sortBy": "relevancy",
-            "pageSize": 20,
-        }
-
-        resp = httpx.get(settings.NEWS_API_URL, params=params, timeout=10)
-        if resp.status_code != 200:
-            return {"error": f"NewsAPI error {resp.status_code}"}
-
-        data = resp.json()
-        articles = data.get("articles", [])
-
-        scam_hits = []
-        entity_l = entity.lower()
-
-        for art in articles:
-            title = (art.get("title") or "").lower()
-            desc = (art.get("description") or "").lower()
-            text = f"{title} {desc}"
-
-            # entity MUST appear in the text
-            if entity_l not in text:
-                continue
-
-            # and at least ONE strong scam keyword
-            if any(kw in text for kw in STRONG_SCAM_KEYWORDS):
-                scam_hits.append(art)
-
-        return {
-            "total_articles": len(articles),
-            "scam_related": len(scam_hits),
-            "scam_articles": scam_hits[:3],
-        }
+        tokens = news_store.tokenize(entity)
+        if settings.NEWS_STORE_ENABLED and tokens:
+            try:
+                return _search_with_store(entity, tokens)
+            except Exception:
+                # the store is an optimization; never fail a lookup over it
+                logger.warning("News store unavailable; querying NewsAPI directly", exc_info=True)
+        return _search_upstream(entity)
 
     except Exception as e:
         return {"error": str(e), "total_articles": 0, "scam_related": 0, "scam_articles": []}
@@ -1,64 +1,177 @@
-import httpx
+import logging
+import threading
+import time
+from typing import FrozenSet, Optional
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.core.domains import normalize_host, registrable_domain
+from app.core.http import get_client
+from app.core.quota import skipped
+
+logger = logging.getLogger(__name__)
 
 OPENPHISH_FEED = "https://openphish.com/feed.txt"
 
-# Local cache to avoid downloading feed repeatedly
-openphish_cache = {
-    "domains": set(),
-    "last_updated": None
-}
 
-def load_openphish_feed() -> set:
+def _feed_key(host: str) -> str:
+    # "www.evil.com" and "evil.com" are one site to a phishing feed
+    return host[4:] if host.startswith("www.") else host
+
+
+def _is_root(url: str) -> bool:
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False
+    return parts.path in ("", "/") and not parts.query
+
+
+def parse_feed(text: str) -> FrozenSet[str]:
     """
-    Downloads OpenPhish feed (latest phishing URLs) and caches domains.
+    Extracts the hostnames from feed.txt (one phishing URL per line),
+    normalized like lookups (lowercase, punycode, no port or "www.").
+    A root URL on a registrable domain also adds "root:<domain>", which
+    covers its subdomains; any other URL only lists its own host.
     """
-    global openphish_cache
+    domains = set()
+
+    for url in text.splitlines():
+        host = normalize_host(url)
+        if not host:
+            continue
+        key = _feed_key(host)
+        domains.add(key)
+        if _is_root(url.strip()) and key == registrable_domain(host):
+            domains.add("root:" + key)
+
+    return frozenset(domains)
+
+
+class OpenPhishFeed:
+    """
+    In-memory OpenPhish domain set, kept fresh by a background thread.
+
+    The refresher sends conditional GETs (ETag / Last-Modified), parses the
+    feed off the request path and swaps in a new frozenset in one reference
+    assignment, so readers never see a half-built set and never lock.
+    """
+
+    def __init__(self, url: str = OPENPHISH_FEED, interval: float = 900):
+        self.url = url
+        self.interval = interval
+        self.domains: FrozenSet[str] = frozenset()
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.last_updated: Optional[float] = None   # last successful sync (200 or 304)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> bool:
+        """
+        Fetches the feed once. Returns True if a new set was swapped in.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        response = get_client("openphish").get(self.url, headers=headers, timeout=10)
+
+        if response.status_code == 304:
+            self.last_updated = time.time()
+            return False
 
-    try:
-        response = httpx.get(OPENPHISH_FEED, timeout=10)
         if response.status_code != 200:
-            return openphish_cache["domains"]
+            logger.warning("OpenPhish feed fetch failed (%s)", response.status_code)
+            return False
+
+        domains = parse_feed(response.text)
 
-        urls = response.text.splitlines()
-        domains = set()
+        self.domains = domains
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.last_updated = time.time()
+        return True
 
-        for url in urls:
+    def _run(self):
+        while not self._stop.is_set():
             try:
-                # Extract domain cleanly
-                if "://" in url:
-                    url = url.split("://")[1]
-                domain = url.split("/")[0]
-                domains.add(domain.lower().strip())
-            except:
-                continue
+                self.refresh()
+            except Exception:
+                logger.exception("OpenPhish feed refresh failed")
+            self._stop.wait(self.interval)
 
-        openphish_cache["domains"] = domains
-        return domains
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="openphish-refresher", daemon=True)
+        self._thread.start()
 
-    except:
-        return openphish_cache["domains"]
+    def stop(self):
+        self._stop.set()
 
+    def status(self) -> dict:
+        age = time.time() - self.last_updated if self.last_updated else None
+        return {
+            "loaded": self.last_updated is not None,
+            "size": len(self.domains),
+            "age_seconds": round(age, 1) if age is not None else None,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        }
 
-def check_openphish(domain: str) -> dict:
+
+openphish_feed = OpenPhishFeed(
+    url=settings.OPENPHISH_FEED_URL or OPENPHISH_FEED,
+    interval=settings.OPENPHISH_REFRESH_SECONDS,
+)
+
+
+def load_openphish_feed() -> set:
     """
-    Checks if a domain appears in OpenPhish active phishing list.
+    Forces a synchronous refresh and returns the current domain set.
+    Kept for scripts and warm-up; the API relies on the background refresher.
     """
-    domain = domain.lower().strip()
+    try:
+        openphish_feed.refresh()
+    except Exception:
+        logger.exception("OpenPhish feed refresh failed")
+    return openphish_feed.domains
 
+
+def check_openphish(domain: str) -> dict:
+    """
+    Checks if a host appears in the OpenPhish active phishing list, or its
+    registrable domain does as a root URL (a phishing page on one shared
+    host, e.g. docs.google.com, doesn't flag its siblings). Pure in-memory
+    lookup against the last refreshed feed; skipped until the feed has
+    loaded once, so a cold worker doesn't report phishing hosts as clean.
+    """
     try:
-        domains = load_openphish_feed()
-
-        if domain in domains:
-            return {
-                "found": True,
-                "source": "openphish",
-                "risk": 80
-            }
+        status = openphish_feed.status()
+        if not status["loaded"]:
+            return {**skipped("openphish", "feed not loaded"), "loaded": False}
+
+        host = normalize_host(domain) or domain.lower().strip()
+        feed = openphish_feed.domains
+        site, root = _feed_key(host), registrable_domain(host)
+        if site in feed:
+            matched = site
+        elif root and "root:" + root in feed:
+            matched = root
         else:
-            return {
-                "found": False,
-                "source": "openphish",
-                "risk": 0
-            }
+            matched = None
+        found = matched is not None
+
+        return {
+            "found": found,
+            "matched": matched,
+            "source": "openphish",
+            "risk": 80 if found else 0,
+            "feed_size": status["size"],
+        }
     except Exception as e:
         return {"error": str(e)}
@@ -1,23 +1,29 @@
-import httpx
-from app.core.config import settings
+from app.core.blocklist import phishing_blocklist
 
 
 def check_phishing_blacklist(domain: str) -> dict:
     """
-    Unified phishing / malware blacklist check.
-
-    Currently implemented as a safe stub that always returns
-    'not found'. You can later plug in real services such as
-    PhishTank, OpenPhish, URLScan, etc., using PHISHTANK_API_KEY
-    in app.core.config.settings.
+    Unified phishing / malware blacklist check against the local
+    multi-feed blocklist (OpenPhish, PhishTank, URLhaus dumps; see
+    scripts/build_blocklist.py). Accepts a URL or a domain: the exact URL
+    matches URL entries; the host matches host and root-URL entries, and
+    the registrable domain matches host entries (see blocklist.entry_keys).
     """
+    try:
+        hit = phishing_blocklist.lookup(domain)
+        status = phishing_blocklist.status()
+    except Exception as e:
+        return {"error": str(e)}
 
-    # Example structure that real integrations should also return:
     return {
-        "found": False,           # True if any blacklist flags this domain
-        "blacklist_hit": False,   # Backwards-compatible key
-        "source": "stub_phishing_service",
-        "risk": 0,
+        "found": hit is not None,            # True if any blacklist flags this domain
+        "blacklist_hit": hit is not None,    # Backwards-compatible key
+        "source": "local_blocklist",
+        "risk": 70 if hit else 0,
+        "matched": hit["matched"] if hit else None,
+        "feeds": hit["feeds"] if hit else [],
+        "list_loaded": status["loaded"],
+        "list_size": status["size"],
     }
 
 
@@ -1,5 +1,156 @@
+import gzip
 import json
 import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Built offline from app/data/rbi_nbfc_list.csv.XLSX by scripts/build_rbi_index.py
+INDEX_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "rbi_nbfc_index.json.gz")
+INDEX_VERSION = 1
+
+# Minimum match confidence to treat a company as RBI-registered
+MATCH_THRESHOLD = 0.85
+
+# Trailing legal-form tokens dropped before matching ("Pvt Ltd", "Limited", ...)
+LEGAL_SUFFIXES = {"private", "pvt", "p", "limited", "ltd", "llp", "plc", "inc", "pte"}
+LEADING_NOISE = {"m", "s", "the"}   # "M/s", "The"
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    """
+    Canonical form used both at build time and at lookup time:
+    lowercase, '&' -> 'and', punctuation dropped, legal suffixes stripped.
+    """
+    text = (name or "").lower().replace("&", " and ").replace(".", "")
+    tokens = _NON_ALNUM.sub(" ", text).split()
+
+    while len(tokens) > 1 and tokens[0] in LEADING_NOISE:
+        tokens.pop(0)
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+
+    return " ".join(tokens)
+
+
+def trigrams(key: str) -> set:
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _dice(a: int, b: int, common: int) -> float:
+    return (2.0 * common) / (a + b) if (a + b) else 0.0
+
+
+class RBIIndex:
+    """
+    Read-only NBFC/ARC registry index, loaded once per process.
+
+    keys are normalized names (current and former names), each pointing
+    at one registry entry. Token postings answer "every query word appears
+    in the name"; trigram postings (rare grams only) find typo'd names.
+    """
+
+    def __init__(self, data: dict):
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported RBI index version {data.get('version')}")
+
+        self.fields: List[str] = data["fields"]
+        self.entries: List[list] = data["entries"]
+        self.keys: List[str] = data["keys"]
+        self.key_entry: List[int] = data["key_entry"]
+        self.built_at: str = data.get("built_at")
+
+        self.exact: Dict[str, int] = {k: i for i, k in enumerate(self.keys)}
+        self.key_len: List[int] = [len(k.split()) for k in self.keys]
+        self.tokens: Dict[str, frozenset] = {t: frozenset(ids) for t, ids in data["tokens"].items()}
+        self.ngrams: Dict[str, List[int]] = data["ngrams"]
+
+    @classmethod
+    def load(cls, path: str = INDEX_PATH) -> "RBIIndex":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _entry(self, key_id: int, confidence: float, match_type: str) -> dict:
+        entry = dict(zip(self.fields, self.entries[self.key_entry[key_id]]))
+        entry.update({
+            "matched_key": self.keys[key_id],
+            "confidence": round(confidence, 3),
+            "match_type": match_type,
+        })
+        return entry
+
+    def _token_match(self, q_tokens: List[str]):
+        postings = [self.tokens.get(t) for t in q_tokens]
+        if not postings or any(p is None for p in postings):
+            return None
+
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+
+        if not candidates:
+            return None
+
+        # every candidate contains all query tokens, so the shortest name wins
+        key_id = min(candidates, key=self.key_len.__getitem__)
+        return key_id, _dice(len(q_tokens), self.key_len[key_id], len(q_tokens))
+
+    def _fuzzy_match(self, key: str, limit: int = 10):
+        q_grams = trigrams(key)
+        counts = Counter()
+        for gram in q_grams:
+            counts.update(self.ngrams.get(gram, ()))
+
+        best = None
+        for key_id, _ in counts.most_common(limit):
+            c_grams = trigrams(self.keys[key_id])
+            score = _dice(len(q_grams), len(c_grams), len(q_grams & c_grams))
+            if best is None or score > best[1]:
+                best = (key_id, score)
+        return best
+
+    def lookup(self, name: str) -> Optional[dict]:
+        key = normalize_name(name)
+        if not key:
+            return None
+
+        key_id = self.exact.get(key)
+        if key_id is not None:
+            return self._entry(key_id, 1.0, "exact")
+
+        matches = []
+        token_hit = self._token_match(key.split())
+        if token_hit:
+            matches.append((token_hit, "token"))
+        fuzzy_hit = self._fuzzy_match(key)
+        if fuzzy_hit:
+            matches.append((fuzzy_hit, "fuzzy"))
+
+        if not matches:
+            return None
+
+        (key_id, score), match_type = max(matches, key=lambda m: m[0][1])
+        return self._entry(key_id, score, match_type)
+
+
+_index: Optional[RBIIndex] = None
+_index_lock = threading.Lock()
+
+
+def load_rbi_index(path: str = INDEX_PATH) -> RBIIndex:
+    """
+    Loads the index once; later calls return the same instance.
+    Called from app startup so the first request doesn't pay for it.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = RBIIndex.load(path)
+    return _index
 
 
 def check_rbi_nbfc(name: str) -> dict:
@@ -9,29 +160,21 @@ def check_rbi_nbfc(name: str) -> dict:
     """
 
     try:
-        # Path to rbi_list.json inside adapters folder
-        base_path = os.path.dirname(__file__)
-        file_path = os.path.join(base_path, "rbi_list.json")
-
-        if not os.path.exists(file_path):
-            return {"authorized": False, "error": "RBI list file missing"}
-
-        # Load JSON file
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        nbfc_list = data.get("nbfc_list", [])
-        query = name.lower()
+        if _index is None and not os.path.exists(INDEX_PATH):
+            return {"authorized": False, "error": "RBI index missing (run scripts/build_rbi_index.py)"}
 
-        # Match partial or full name
-        for nbfc in nbfc_list:
-            if query in nbfc.lower():
-                return {
-                    "authorized": True,
-                    "matched_name": nbfc
-                }
+        match = load_rbi_index().lookup(name)
+        if not match:
+            return {"authorized": False, "confidence": 0.0}
 
-        return {"authorized": False}
+        return {
+            "authorized": match["confidence"] >= MATCH_THRESHOLD,
+            "matched_name": match["name"],
+            "confidence": match["confidence"],
+            "match_type": match["match_type"],
+            "cin": match.get("cin"),
+            "classification": match.get("classification"),
+        }
 
     except Exception as e:
         return {"authorized": False, "error": str(e)}
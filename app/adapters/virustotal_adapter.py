@@ -1,31 +1,42 @@
-import httpx
 from app.core.config import settings
+from app.core.http import get_client
+from app.core.adapter_cache import cached_adapter
+from app.core.quota import check_quota, skipped
 
-VT_URL = "https://www.virustotal.com/api/v3/urls"
-VT_DOMAIN = "https://www.virustotal.com/api/v3/domains/"
+# Base URL is configurable so a local VirusTotal stand-in can be used in tests
+VT_URL = f"{settings.VIRUSTOTAL_API_URL}/urls"
+VT_DOMAIN = f"{settings.VIRUSTOTAL_API_URL}/domains/"
+VT_ANALYSES = f"{settings.VIRUSTOTAL_API_URL}/analyses/"
 
 headers = {
     "x-apikey": settings.VIRUSTOTAL_API_KEY
 }
 
 
+@cached_adapter("virustotal_url", ttl=900)
 def vt_check_url(url: str) -> dict:
     """
     Submits or retrieves a URL scan from VirusTotal.
     Returns detection stats and reputation.
     """
     try:
+        denied = check_quota("virustotal", cost=2)
+        if denied:
+            return denied
+
         # First: submit URL to get analysis ID
-        submit = httpx.post(VT_URL, headers=headers, data={"url": url}, timeout=10)
+        submit = get_client("virustotal").post(VT_URL, headers=headers, data={"url": url}, timeout=10)
 
+        if submit.status_code == 429:
+            return skipped("virustotal", "quota (429)")
         if submit.status_code not in (200, 201):
             return {"error": f"VT URL submission failed ({submit.status_code})"}
 
         analysis_id = submit.json()["data"]["id"]
 
         # Retrieve analysis results
-        report_url = f"https://www.virustotal.com/api/v3/analyses/{analysis_id}"
-        result = httpx.get(report_url, headers=headers, timeout=10)
+        report_url = VT_ANALYSES + analysis_id
+        result = get_client("virustotal").get(report_url, headers=headers, timeout=10)
 
         if result.status_code != 200:
             return {"error": "VT analysis fetch failed"}
@@ -44,14 +55,82 @@ def vt_check_url(url: str) -> dict:
         return {"error": str(e)}
 
 
+@cached_adapter("virustotal_url_submit", ttl=900)
+def vt_submit_url(url: str) -> dict:
+    """
+    Submits a URL for scanning and returns the analysis id without waiting
+    for the result (one round trip). A background job polls the analysis.
+    """
+    try:
+        denied = check_quota("virustotal")
+        if denied:
+            return denied
+
+        submit = get_client("virustotal").post(VT_URL, headers=headers, data={"url": url}, timeout=10)
+
+        if submit.status_code == 429:
+            return skipped("virustotal", "quota (429)")
+        if submit.status_code not in (200, 201):
+            return {"error": f"VT URL submission failed ({submit.status_code})"}
+
+        return {
+            "status": "pending",
+            "analysis_id": submit.json()["data"]["id"],
+            "source": "virustotal_url"
+        }
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def vt_fetch_analysis(analysis_id: str) -> dict:
+    """
+    Fetches one analysis. status is "completed" once VT has the stats,
+    otherwise VT's own status ("queued", "in-progress").
+    """
+    try:
+        denied = check_quota("virustotal")
+        if denied:
+            return denied
+
+        result = get_client("virustotal").get(VT_ANALYSES + analysis_id, headers=headers, timeout=10)
+
+        if result.status_code == 429:
+            return skipped("virustotal", "quota (429)")
+        if result.status_code != 200:
+            return {"error": f"VT analysis fetch failed ({result.status_code})"}
+
+        attributes = result.json()["data"]["attributes"]
+        stats = attributes.get("stats", {})
+
+        return {
+            "status": attributes.get("status", "queued"),
+            "malicious": stats.get("malicious", 0),
+            "suspicious": stats.get("suspicious", 0),
+            "undetected": stats.get("undetected", 0),
+            "harmless": stats.get("harmless", 0),
+            "source": "virustotal_url"
+        }
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@cached_adapter("virustotal_domain", ttl=3600, stale_ttl=6 * 3600)
 def vt_check_domain(domain: str) -> dict:
     """
     Retrieves domain reputation from VirusTotal.
     """
     try:
+        denied = check_quota("virustotal")
+        if denied:
+            return denied
+
         url = VT_DOMAIN + domain
-        result = httpx.get(url, headers=headers, timeout=10)
+        result = get_client("virustotal").get(url, headers=headers, timeout=10)
 
+        if result.status_code == 429:
+            return skipped("virustotal", "quota (429)")
         if result.status_code != 200:
             return {"error": f"VT domain check failed ({result.status_code})"}
 
@@ -1,11 +1,32 @@
-import httpx
 import datetime
 from app.core.config import settings
+from app.core.http import get_client
+from app.core.quota import check_quota, skipped
+from app.core.adapter_cache import cached_adapter
+
+def age_days(creation_date: str) -> int:
+    """
+    Domain age today from an ISO creation date (as stored by _whois_lookup).
+    """
+    return (datetime.datetime.utcnow() - datetime.datetime.fromisoformat(creation_date)).days
+
 
 def domain_whois_info(domain: str) -> dict:
     """
     Uses WHOISXML API to fetch accurate WHOIS data.
+    age_days is derived on every call so cached records don't age.
     """
+    info = dict(_whois_lookup(domain))
+
+    if info.get("creation_date"):
+        info["age_days"] = age_days(info["creation_date"])
+
+    return info
+
+
+# Creation dates practically never change
+@cached_adapter("whois", ttl=7 * 86400, stale_ttl=7 * 86400)
+def _whois_lookup(domain: str) -> dict:
     try:
         params = {
             "apiKey": settings.WHOIS_API_KEY,
@@ -13,8 +34,14 @@ def domain_whois_info(domain: str) -> dict:
             "outputFormat": "JSON"
         }
 
-        response = httpx.get(settings.WHOIS_API_URL, params=params, timeout=10)
+        denied = check_quota("whois")
+        if denied:
+            return denied
+
+        response = get_client("whois").get(settings.WHOIS_API_URL, params=params, timeout=10)
 
+        if response.status_code == 429:
+            return skipped("whois", "quota (429)")
         if response.status_code != 200:
             return {"error": f"WHOIS API error {response.status_code}"}
 
@@ -1,65 +1,52 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Optional
 
-from app.db.session import get_db
-from app.schemas import VerifyRequest
-from app import crud
-from app.services.orchestrator import run_verification   # ✅ FIX: required import
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
-router = APIRouter()
-
-
-# -------------------------------------------------------------------------
-# VERIFY ENDPOINT
-# -------------------------------------------------------------------------
+from app.core.config import settings
+from app.core.payloads import decode_payload
+from app.db.repository import repo
+from app.schemas import VerifyRequest, BatchVerifyRequest
+from app.services.orchestrator import run_verification_async, canonical_artifact   # ✅ FIX: required import
+from app.services import verdict_cache, singleflight
+from app.core.adapter_cache import adapter_cache_stats
+from app.core.resolver import dns_cache
+from app.core.metrics import VERDICT_CACHE, VERIFICATIONS_IN_FLIGHT
+from app.core.quota import BACKGROUND, SKIPPED, quota_priority
 
-@router.post("/api/verify")
-def verify(payload: VerifyRequest, db: Session = Depends(get_db)):
-
-    # Run the verification engine
-    try:
-        result = run_verification(payload.query, payload.type or "auto")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Verification failed: {str(e)}")
+router = APIRouter()
 
-    # Create OR get existing artifact
-    art = crud.get_artifact_by_value(db, result["artifact_value"])
-    if not art:
-        art = crud.create_artifact(
-            db,
-            result["artifact_type"],
-            result["artifact_value"],
-            metadata=result.get("metadata")
-        )
 
-    # Persist evidences
-    evidence_records = []
-    for ev in result.get("evidences", []):
-        try:
-            saved = crud.add_evidence(
-                db,
-                art,
-                source=ev.get("source"),
-                title=ev.get("title"),
-                url=None,
-                summary=str(ev.get("data"))
-            )
-            evidence_records.append(saved)
-        except Exception:
-            pass  # skip failed evidence inserts
-
-    # Persist risk score
+async def _persist_verification(result: dict) -> dict:
+    """
+    Stores the artifact, evidences and score of one run_verification
+    result and returns the API payload shared by verify and verify/batch.
+    """
     scoring = result["scoring"]
-    crud.add_riskscore(
-        db,
-        art,
+    saved = await repo.save_verification(
+        result["artifact_type"],
+        result["artifact_value"],
+        metadata=result.get("metadata"),
+        evidences=[
+            {
+                "source": ev.get("source"),
+                "title": ev.get("title"),
+                "url": None,
+                "data": ev.get("data"),
+                "job": ev.get("job"),
+            }
+            for ev in result.get("evidences", [])
+        ],
         score=scoring["score"],
         label=scoring["label"],
-        reasons=scoring["reasons"]
+        reasons=scoring["reasons"],
     )
-
-    # Reload with relations
-    db_art = crud.get_artifact_by_value(db, art.value)
+    art = saved["artifact"]
 
     # ---------------- CLEAN OUTPUT ----------------
 
@@ -77,89 +64,334 @@ def verify(payload: VerifyRequest, db: Session = Depends(get_db)):
     # Evidences
     evidences_out = [
         {
-            "id": e.id,
-            "source": e.source,
-            "title": e.title,
-            "url": e.url,
-            "summary": e.summary,
-            "captured_at": e.captured_at.isoformat()
+            "id": e["id"],
+            "source": e["source"],
+            "title": e["title"],
+            "url": e["url"],
+            "summary": e["data"],
+            "captured_at": e["captured_at"].isoformat()
         }
-        for e in evidence_records
+        for e in saved["evidences"]
     ]
 
     # Scores
     scores_out = [
         {
-            "id": s.id,
-            "score": s.score,
-            "label": s.label,
+            "id": s["id"],
+            "score": s["score"],
+            "label": s["label"],
             "reasons": reasons_out,
-            "computed_at": s.computed_at.isoformat()
+            "computed_at": s["computed_at"].isoformat()
         }
-        for s in db_art.scores
+        for s in saved["scores"]
     ]
 
-    return {
+    out = {
         "label": scoring["label"],
         "score": scoring["score"],
         "reasons": reasons_out,
         "evidences": evidences_out,
         "artifact": {
-            "id": db_art.id,
-            "type": db_art.type,
-            "value": db_art.value,
+            "id": art["id"],
+            "type": art["type"],
+            "value": art["value"],
             "metadata": {},
-            "created_at": db_art.created_at.isoformat(),
+            "created_at": art["created_at"].isoformat(),
             "evidences": evidences_out,
             "scores": scores_out
-        }
+        },
+        "jobs": saved["jobs"],
     }
+    return out
+
+
+def _cacheable(result: dict) -> bool:
+    """
+    A verdict with sources skipped for quota is incomplete; don't let the
+    verdict cache serve it for hours.
+    """
+    return not any(ev.get("status") == SKIPPED for ev in result.get("evidences", []))
+
+
+async def _verify_and_store(cache_key: str, query: str, qtype: str, shared: Optional[dict] = None) -> dict:
+    """
+    One full verification: adapters, persistence, verdict cache.
+    Run through singleflight so concurrent requests for one artifact share it.
+    """
+    with VERIFICATIONS_IN_FLIGHT.track():
+        result = await run_verification_async(query, qtype, shared)
+    if result.get("error"):
+        return {"error": result["error"]}
+
+    out = await _persist_verification(result)
+    if _cacheable(result):
+        await run_in_threadpool(verdict_cache.set_verdict, cache_key, out, out["label"])
+    return out
+
+
+# -------------------------------------------------------------------------
+# VERIFY ENDPOINT
+# -------------------------------------------------------------------------
+
+@router.post("/api/verify")
+async def verify(payload: VerifyRequest, response: Response):
+
+    # Serve a recent verdict for the same artifact without re-running adapters
+    cache_key = verdict_cache.cache_key(*canonical_artifact(payload.query, payload.type or "auto"))
+    if not payload.refresh:
+        cached = await run_in_threadpool(verdict_cache.get_verdict, cache_key)
+        VERDICT_CACHE.inc("hit" if cached else "miss")
+        if cached:
+            out, age = cached
+            response.headers["X-Cache"] = "HIT"
+            response.headers["Age"] = str(age)
+            return {**out, "cache": {"hit": True, "age_seconds": age}}
+
+    # Run the verification engine (or join an identical one already running)
+    try:
+        out, coalesced = await singleflight.run(
+            cache_key,
+            lambda: _verify_and_store(cache_key, payload.query, payload.type or "auto"),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Verification failed: {str(e)}")
+
+    if out.get("error"):
+        raise HTTPException(status_code=400, detail=out["error"])
+
+    response.headers["X-Cache"] = "MISS"
+    return {**out, "cache": {"hit": False, "age_seconds": 0, "coalesced": coalesced}}
+
+
+# -------------------------------------------------------------------------
+# BATCH VERIFY ENDPOINT (NDJSON STREAM)
+# -------------------------------------------------------------------------
+
+@router.post("/api/verify/batch")
+async def verify_batch(payload: BatchVerifyRequest):
+    """
+    Verifies many queries in one request. Queries that canonicalize to the
+    same artifact run once; items on the same domain share upstream calls.
+    One NDJSON line is streamed per unique artifact as soon as it finishes;
+    "indexes" lists the positions in the request it answers.
+    """
+    if len(payload.queries) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BATCH_MAX_ITEMS} queries per batch"
+        )
+
+    items = OrderedDict()
+    for idx, q in enumerate(payload.queries):
+        qtype, value = canonical_artifact(q.query, q.type or "auto")
+        key = verdict_cache.cache_key(qtype, value)
+        item = items.setdefault(key, {"query": q.query.strip(), "type": qtype, "indexes": []})
+        item["indexes"].append(idx)
+
+    refresh = payload.refresh
+    shared = {}
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run_item(key: str, item: dict) -> dict:
+        head = {"indexes": item["indexes"], "query": item["query"]}
+        async with semaphore:
+            # batch items queue behind interactive /api/verify for upstream quota
+            quota_priority.set(BACKGROUND)
+            try:
+                if not refresh:
+                    cached = await run_in_threadpool(verdict_cache.get_verdict, key)
+                    VERDICT_CACHE.inc("hit" if cached else "miss")
+                    if cached:
+                        out, age = cached
+                        return {**head, **out, "cache": {"hit": True, "age_seconds": age}}
+
+                out, coalesced = await singleflight.run(
+                    key,
+                    lambda: _verify_and_store(key, item["query"], item["type"], shared),
+                )
+                if out.get("error"):
+                    return {**head, "error": out["error"]}
+                return {**head, **out, "cache": {"hit": False, "age_seconds": 0, "coalesced": coalesced}}
+
+            except Exception as e:
+                return {**head, "error": f"Verification failed: {str(e)}"}
+
+    async def stream():
+        tasks = [asyncio.ensure_future(run_item(k, item)) for k, item in items.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                yield json.dumps(line, default=str) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 # -------------------------------------------------------------------------
 # GET ARTIFACT DETAILS
 # -------------------------------------------------------------------------
 
-@router.get("/api/artifacts/{artifact_id}")
-def get_artifact(artifact_id: int, db: Session = Depends(get_db)):
+def _page(rows: list, limit: int):
+    """Splits a limit + 1 keyset fetch into (page, next_cursor)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]["id"]
+    return rows, None
 
-    from app.models import Artifact
 
-    art = db.query(Artifact).filter(Artifact.id == artifact_id).first()
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check: weak comparison against each listed tag, or "*"."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+
+def _verdict(art) -> Optional[dict]:
+    if art["latest_label"] is None:
+        return None
+    return {
+        "score": art["latest_score"],
+        "label": art["latest_label"],
+        "verified_at": art["last_verified_at"].isoformat() if art["last_verified_at"] else None,
+    }
+
+
+@router.get("/api/artifacts/{artifact_id}")
+async def get_artifact(
+    artifact_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    evidence_cursor: Optional[int] = None,
+    score_cursor: Optional[int] = None,
+    latest_score_only: bool = False,
+):
+    """
+    Artifact with keyset-paginated history, newest first. Pass the
+    returned next_*_cursor back to fetch older rows. Responses carry a
+    weak ETag derived from the newest history ids, the current verdict
+    and the artifact version, so polling clients get a 304 without the
+    history being loaded.
+    """
+    art = await repo.get_artifact_with_versions(artifact_id)
     if not art:
         raise HTTPException(status_code=404, detail="Artifact not found")
 
+    version = (
+        f"{art['id']}:{art['max_evidence_id']}:{art['max_score_id']}:"
+        f"{art['latest_score']}:{art['latest_label']}:{art['version']}:"
+        f"{limit}:{evidence_cursor}:{score_cursor}:{int(latest_score_only)}"
+    )
+    etag = 'W/"%s"' % hashlib.sha1(version.encode("utf-8")).hexdigest()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    evidences, next_evidence_cursor = _page(
+        await repo.list_evidences(artifact_id, limit, evidence_cursor), limit
+    )
+    if latest_score_only:
+        scores, next_score_cursor = (await repo.list_scores(artifact_id, 1))[:1], None
+    else:
+        scores, next_score_cursor = _page(
+            await repo.list_scores(artifact_id, limit, score_cursor), limit
+        )
+
     evidences_out = [
         {
-            "id": e.id,
-            "source": e.source,
-            "title": e.title,
-            "url": e.url,
-            "summary": e.summary,
-            "captured_at": e.captured_at.isoformat()
+            "id": e["id"],
+            "source": e["source"],
+            "title": e["title"],
+            "url": e["url"],
+            "summary": decode_payload(e["body"], e["compression"]),
+            "captured_at": e["captured_at"].isoformat()
         }
-        for e in art.evidences
+        for e in evidences
     ]
 
     scores_out = [
         {
-            "id": s.id,
-            "score": s.score,
-            "label": s.label,
+            "id": s["id"],
+            "score": s["score"],
+            "label": s["label"],
             "reasons": [],
-            "computed_at": s.computed_at.isoformat()
+            "computed_at": s["computed_at"].isoformat()
         }
-        for s in art.scores
+        for s in scores
     ]
 
     return {
-        "id": art.id,
-        "type": art.type,
-        "value": art.value,
+        "id": art["id"],
+        "type": art["type"],
+        "value": art["value"],
         "metadata": {},
-        "created_at": art.created_at.isoformat(),
+        "created_at": art["created_at"].isoformat(),
+        "verdict": _verdict(art),
         "evidences": evidences_out,
-        "scores": scores_out
+        "scores": scores_out,
+        "next_evidence_cursor": next_evidence_cursor,
+        "next_score_cursor": next_score_cursor,
+    }
+
+
+@router.get("/api/verdict")
+async def get_verdict(query: str, type: Optional[str] = None):
+    """
+    Stored verdict of the artifact a query canonicalizes to, read from the
+    artifact row alone; nothing is verified. 404 if it was never verified.
+    """
+    qtype, value = canonical_artifact(query, type or "auto")
+    art = await repo.get_verdict(value)
+    if not art or _verdict(art) is None:
+        raise HTTPException(status_code=404, detail="No verdict for this artifact")
+    return {"id": art["id"], "type": art["type"], "value": art["value"], **_verdict(art)}
+
+
+# -------------------------------------------------------------------------
+# BACKGROUND JOB STATUS
+# -------------------------------------------------------------------------
+
+@router.get("/api/jobs/{job_id}")
+async def get_job(job_id: int):
+    job = await repo.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "target": job["target"],
+        "artifact_id": job["artifact_id"],
+        "evidence_id": job["evidence_id"],
+        "attempts": job["attempts"],
+        "next_poll_at": job["next_poll_at"].isoformat() if job["status"] == "pending" and job["next_poll_at"] else None,
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"].isoformat() if job["created_at"] else None,
+        "updated_at": job["updated_at"].isoformat() if job["updated_at"] else None,
+    }
+
+
+# -------------------------------------------------------------------------
+# ADAPTER CACHE STATS
+# -------------------------------------------------------------------------
+
+@router.get("/api/cache/stats")
+def cache_stats():
+    return {
+        "adapters": adapter_cache_stats(),
+        "singleflight": singleflight.singleflight_stats(),
+        "dns": dns_cache.snapshot(),
     }
 
 
@@ -168,7 +400,7 @@ def get_artifact(artifact_id: int, db: Session = Depends(get_db)):
 # -------------------------------------------------------------------------
 
 @router.post("/api/report")
-def report(payload: dict, db: Session = Depends(get_db)):
+async def report(payload: dict):
 
     artifact_type = payload.get("artifact_type")
     artifact_value = payload.get("artifact_value")
@@ -181,12 +413,9 @@ def report(payload: dict, db: Session = Depends(get_db)):
             detail="artifact_type, artifact_value and description required"
         )
 
-    rep = crud.create_user_report(
-        db,
+    return await repo.create_user_report(
         artifact_type,
         artifact_value,
         description,
         contact
     )
-
-    return {"id": rep.id, "status": rep.status}
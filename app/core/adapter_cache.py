@@ -0,0 +1,145 @@
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Callable, Dict
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Background revalidation runs here so a stale hit returns immediately.
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="adapter-refresh")
+
+_registry: Dict[str, "AdapterCache"] = {}
+
+# Set when a call is answered from memory; callers running the adapter in
+# a copied context read it back afterwards (request metrics).
+served_from_cache: ContextVar[bool] = ContextVar("served_from_cache", default=False)
+
+
+class AdapterCache:
+    """
+    Per-source, in-process result cache for one adapter function.
+
+    - fresh (age < ttl): served from memory
+    - stale (ttl <= age < ttl + stale_ttl): served from memory while one
+      background call refreshes the entry
+    - older, or missing: the adapter is called inline
+    Results carrying an "error" key are cached for error_ttl only and are
+    never served stale, so a flapping upstream is retried soon.
+    """
+
+    def __init__(self, source: str, fn: Callable, ttl: float, stale_ttl: float,
+                 error_ttl: float, max_entries: int):
+        self.source = source
+        self.fn = fn
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()   # key -> (stored_at, result, is_error)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "negative_hits": 0, "misses": 0, "refreshes": 0}
+
+    def _store(self, key: tuple, result: dict):
+        if isinstance(result, dict) and result.get("status") == "skipped":
+            return      # quota refusals say nothing about the artifact; don't cache them
+        is_error = isinstance(result, dict) and bool(result.get("error"))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result, is_error)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _revalidate(self, key: tuple, args: tuple):
+        try:
+            self._store(key, self.fn(*args))
+        except Exception:
+            logger.exception("Background refresh failed for %s", self.source)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def __call__(self, *args):
+        if not settings.ADAPTER_CACHE_ENABLED:
+            return self.fn(*args)
+
+        key = args
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result, is_error = entry
+                age = now - stored_at
+
+                if is_error and age < self.error_ttl:
+                    self.stats["negative_hits"] += 1
+                    served_from_cache.set(True)
+                    return dict(result)
+
+                if not is_error and age < self.ttl:
+                    self.stats["hits"] += 1
+                    self._entries.move_to_end(key)
+                    served_from_cache.set(True)
+                    return dict(result)
+
+                if not is_error and age < self.ttl + self.stale_ttl:
+                    self.stats["stale_hits"] += 1
+                    served_from_cache.set(True)
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self.stats["refreshes"] += 1
+                        _refresh_pool.submit(self._revalidate, key, args)
+                    return dict(result)
+
+            self.stats["misses"] += 1
+
+        result = self.fn(*args)
+        self._store(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries)}
+
+
+def cached_adapter(source: str, ttl: float, stale_ttl: float = 0, error_ttl: float = 60):
+    """
+    Decorator for adapter functions. TTLs can be overridden per source with
+    ADAPTER_CACHE_TTLS, e.g. {"whois": 86400}.
+    """
+    def decorator(fn: Callable):
+        cache = AdapterCache(
+            source,
+            fn,
+            ttl=settings.ADAPTER_CACHE_TTLS.get(source, ttl),
+            stale_ttl=stale_ttl,
+            error_ttl=error_ttl,
+            max_entries=settings.ADAPTER_CACHE_MAX_ENTRIES,
+        )
+        _registry[source] = cache
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            return cache(*args)
+
+        wrapper.cache = cache
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorator
+
+
+def adapter_cache_stats() -> Dict[str, dict]:
+    return {source: cache.snapshot() for source, cache in _registry.items()}
@@ -0,0 +1,324 @@
+import bz2
+import csv
+import gzip
+import hashlib
+import io
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.core.domains import canonical_url, normalize_host, registrable_domain
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "phishing_blocklist.bin")
+
+MAGIC = b"TCBLOCK1"
+FORMAT_VERSION = 2
+MAX_FEEDS = 8       # feed membership is one bitmask byte per entry
+
+# File layout, every section 8-byte aligned:
+#   MAGIC | u32 header length | JSON header | Bloom bits | u64 hashes (sorted) | u8 feed masks
+_PREFIX = struct.Struct("<8sI")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _site(host: str) -> str:
+    # "www.evil.com" and "evil.com" are one site to a phishing feed
+    return host[4:] if host.startswith("www.") else host
+
+
+def _is_root(url: str) -> bool:
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False
+    return parts.path in ("", "/") and not parts.query
+
+
+def entry_keys(entry: str) -> List[str]:
+    """
+    Keys stored for one feed entry. A bare host lists the whole site
+    ("host:"); a URL lists only itself ("url:"), plus its host ("root:")
+    when it is the site's root. Phishing pages on shared hosts (GitHub,
+    Google Docs) must not list the host.
+    """
+    entry = entry.strip()
+    host = normalize_host(entry)
+    if not host:
+        return []
+    if "://" not in entry:
+        return ["host:" + _site(host)]
+    keys = ["url:" + canonical_url(entry)]
+    if _is_root(entry):
+        keys.append("root:" + _site(host))
+    return keys
+
+
+def lookup_keys(value: str) -> List[Tuple[str, str]]:
+    """
+    (match kind, key) probed for a URL or domain, most specific first:
+    exact URL, host (listed bare or as a root URL), and the registrable
+    domain, which only bare-host entries cover.
+    """
+    host = normalize_host(value)
+    if not host:
+        return []
+    keys = []
+    if "://" in value:
+        keys.append(("url", "url:" + canonical_url(value)))
+    site = _site(host)
+    keys += [("host", "host:" + site), ("host", "root:" + site)]
+    domain = registrable_domain(host)
+    if domain and _site(domain) != site:
+        keys.append(("domain", "host:" + _site(domain)))
+    return keys
+
+
+# ---------------------------------------------------------------------------
+# Feed parsing
+# ---------------------------------------------------------------------------
+
+def decode_feed(data: bytes) -> str:
+    """
+    Feed dump as text; gzip and bzip2 dumps (PhishTank) are unpacked.
+    """
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    elif data[:3] == b"BZh":
+        data = bz2.decompress(data)
+    return data.decode("utf-8", errors="replace")
+
+
+def parse_feed(text: str) -> Iterable[str]:
+    """
+    Entries of a feed dump: one URL or host per line (OpenPhish, plain
+    domain lists), or CSV rows (PhishTank, URLhaus) where the first field
+    holding a URL is taken. Lines starting with '#' are comments.
+    """
+    lines = [line for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    if not lines:
+        return
+    if "," not in lines[0]:
+        yield from (line.strip() for line in lines)
+        return
+    for row in csv.reader(io.StringIO("\n".join(lines))):
+        url = next((field for field in row if "://" in field), None)
+        if url:
+            yield url
+
+
+# ---------------------------------------------------------------------------
+# Building
+# ---------------------------------------------------------------------------
+
+def _bloom_positions(h: int, k: int, m: int):
+    # double hashing on the two halves of the 64-bit key hash
+    h1 = h & 0xFFFFFFFF
+    h2 = (h >> 32) | 1
+    return [(h1 + i * h2) % m for i in range(k)]
+
+
+def build(feeds: Dict[str, Iterable[str]], path: str, bloom_bits_per_entry: int = 10) -> dict:
+    """
+    Writes the blocklist for {feed name: entries} to path and returns its
+    header. The file is written next to path and renamed over it, so
+    readers see either the old list or the new one, never a partial file.
+    """
+    if len(feeds) > MAX_FEEDS:
+        raise ValueError(f"At most {MAX_FEEDS} feeds per blocklist")
+
+    masks: Dict[int, int] = {}
+    feed_entries = {}
+    for bit, (name, entries) in enumerate(feeds.items()):
+        count = 0
+        for entry in entries:
+            keys = entry_keys(entry)
+            if not keys:
+                continue
+            count += 1
+            for key in keys:
+                h = key_hash(key)
+                masks[h] = masks.get(h, 0) | (1 << bit)
+        feed_entries[name] = count
+
+    hashes = array("Q", sorted(masks))
+    feed_masks = array("B", (masks[h] for h in hashes))
+    n = len(hashes)
+
+    bloom_bits = bloom_k = 0
+    bloom = bytearray()
+    if bloom_bits_per_entry > 0 and n:
+        bloom_bits = _align(max(64, n * bloom_bits_per_entry) // 8) * 8
+        bloom_k = max(1, round(bloom_bits_per_entry * math.log(2)))
+        bloom = bytearray(bloom_bits // 8)
+        for h in hashes:
+            for pos in _bloom_positions(h, bloom_k, bloom_bits):
+                bloom[pos >> 3] |= 1 << (pos & 7)
+
+    header = {
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "feeds": list(feeds),
+        "feed_entries": feed_entries,
+        "count": n,
+        "bloom_bits": bloom_bits,
+        "bloom_k": bloom_k,
+        "built_at": time.time(),
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (_align(_PREFIX.size + len(header_bytes)) - _PREFIX.size - len(header_bytes))
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(bloom)
+        hashes.tofile(f)
+        feed_masks.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return header
+
+
+# ---------------------------------------------------------------------------
+# Lookups
+# ---------------------------------------------------------------------------
+
+class _MappedList:
+    """
+    One mmap'ed blocklist file. Pages live in the OS page cache, so every
+    worker process shares a single copy of the list.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, header_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a blocklist file")
+        self.header = json.loads(bytes(self._mm[_PREFIX.size:_PREFIX.size + header_len]))
+        if self.header.get("version") != FORMAT_VERSION or self.header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{path}: unsupported blocklist version or byte order; rebuild it")
+
+        n = self.header["count"]
+        self.bloom_bits = self.header["bloom_bits"]
+        self.bloom_k = self.header["bloom_k"]
+        offset = _PREFIX.size + header_len
+        view = memoryview(self._mm)
+        self.bloom = view[offset:offset + self.bloom_bits // 8]
+        offset += self.bloom_bits // 8
+        self.hashes = view[offset:offset + 8 * n].cast("Q")
+        offset += 8 * n
+        self.masks = view[offset:offset + n]
+
+    def mask(self, h: int) -> int:
+        """
+        Feed bitmask of a key hash, 0 if absent.
+        """
+        if self.bloom_bits:
+            bloom = self.bloom
+            for pos in _bloom_positions(h, self.bloom_k, self.bloom_bits):
+                if not bloom[pos >> 3] & (1 << (pos & 7)):
+                    return 0
+        i = bisect_left(self.hashes, h)
+        if i < len(self.hashes) and self.hashes[i] == h:
+            return self.masks[i]
+        return 0
+
+
+class Blocklist:
+    """
+    Read side of the blocklist file. Maps it on first use and re-stats it
+    at most every recheck seconds; when the builder has renamed a new file
+    into place, the new one is mapped and swapped in with one reference
+    assignment (lookups never lock). A missing file is an empty list.
+    """
+
+    def __init__(self, path: str, recheck: float = 30):
+        self.path = path
+        self.recheck = recheck
+        self._list: Optional[_MappedList] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self) -> Optional[_MappedList]:
+        if time.monotonic() - self._checked_at >= self.recheck:
+            self.reload()
+        return self._list
+
+    def reload(self) -> bool:
+        """
+        Maps the file if it changed since the last check. Returns True if a
+        new list was swapped in.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._list = None
+                return False
+            current = self._list
+            if current is not None and current.identity == (st.st_ino, st.st_mtime_ns, st.st_size):
+                return False
+            try:
+                self._list = _MappedList(self.path)
+            except Exception:
+                logger.exception("Could not load blocklist %s; keeping the previous one", self.path)
+                return False
+            return True
+
+    def lookup(self, value: str) -> Optional[dict]:
+        """
+        First hit among the exact URL, host and registrable domain of value:
+        {"matched": "url" | "host" | "domain", "feeds": [...]}, or None.
+        """
+        current = self._current()
+        if current is None:
+            return None
+        for kind, key in lookup_keys(value):
+            mask = current.mask(key_hash(key))
+            if mask:
+                feeds = current.header["feeds"]
+                return {"matched": kind, "feeds": [name for bit, name in enumerate(feeds) if mask & (1 << bit)]}
+        return None
+
+    def status(self) -> dict:
+        current = self._current()
+        if current is None:
+            return {"loaded": False, "size": 0, "age_seconds": None, "feeds": {}}
+        return {
+            "loaded": True,
+            "size": current.header["count"],
+            "age_seconds": round(time.time() - current.header["built_at"], 1),
+            "feeds": current.header["feed_entries"],
+        }
+
+
+phishing_blocklist = Blocklist(
+    settings.BLOCKLIST_PATH or DEFAULT_PATH,
+    recheck=settings.BLOCKLIST_RECHECK_SECONDS,
+)
@@ -1,4 +1,5 @@
 import os
+from typing import Dict, List
 from pydantic import BaseSettings
 
 class Settings(BaseSettings):
@@ -12,6 +13,33 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     REDIS_URL: str
 
+    # DB access mode for the API routes (see app/db/repository.py)
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str = ""     # defaults to DATABASE_URL without the sync driver
+    DB_POOL_MIN_SIZE: int = 1        # async pool
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_SIZE: int = 5            # sync engine pool (ignored for SQLite)
+    DB_MAX_OVERFLOW: int = 10
+    DB_AUTO_MIGRATE: bool = True     # alembic upgrade at warm-up; turn off where deploys run migrations
+
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+
+    # Evidence payloads, stored once per artifact / source / content (see app/core/payloads.py)
+    EVIDENCE_COMPRESS_MIN_BYTES: int = 512   # zlib larger payloads; 0 stores all as plain JSON
+
+    # Verdict cache in front of run_verification (TTL in seconds per risk label).
+    # Low-risk verdicts expire fastest: a clean domain can turn malicious.
+    VERDICT_CACHE_ENABLED: bool = True
+    VERDICT_CACHE_TTLS: Dict[str, int] = {"high": 86400, "medium": 3600, "low": 900}
+    VERDICT_CACHE_DEFAULT_TTL: int = 900
+
+    # Coalescing of concurrent verifications of one artifact (see app/services/singleflight.py)
+    SINGLEFLIGHT_ENABLED: bool = True
+    SINGLEFLIGHT_LOCK_SECONDS: float = 30.0     # lease on the cross-worker lock
+    SINGLEFLIGHT_WAIT_SECONDS: float = 20.0     # how long a follower waits for the leader
+    SINGLEFLIGHT_POLL_INTERVAL: float = 0.1
+    SINGLEFLIGHT_RESULT_TTL: int = 30           # how long the leader's result stays readable
+
     # WHOIS (optional external API, but we keep fields for compatibility)
     WHOIS_API_KEY: str = ""
     WHOIS_API_URL: str = ""
@@ -20,16 +48,110 @@ class Settings(BaseSettings):
     NEWS_API_KEY: str = ""
     NEWS_API_URL: str = ""
 
+    # News scan: pages fetched concurrently, scored by keyword weight
+    NEWS_PAGE_SIZE: int = 100        # NewsAPI maximum
+    NEWS_MAX_PAGES: int = 1          # every page costs one request of the newsapi quota
+    NEWS_SCAM_MIN_WEIGHT: float = 1.0
+    # Local article store (see app/services/news_store.py)
+    NEWS_STORE_ENABLED: bool = True
+    NEWS_STORE_FRESH_SECONDS: float = 3600     # answer locally if fetched this recently
+    NEWS_STORE_OVERLAP_SECONDS: float = 3600   # re-fetch window before the last fetch
+    NEWS_STORE_MAX_ARTICLES: int = 500         # newest local matches scanned per query
+    NEWS_SCAM_KEYWORDS: Dict[str, float] = {
+        "scam": 1.0, "scams": 1.0, "scammer": 1.0, "scammers": 1.0, "scammed": 1.0,
+        "fraud": 1.0, "frauds": 1.0, "fraudulent": 1.0,
+        "fake": 1.0, "cheat": 1.0, "cheating": 1.0, "cheated": 1.0,
+        "phishing": 2.0, "ponzi": 2.0, "money laundering": 2.0, "scam alert": 2.0,
+        "fraud case": 2.0, "fraudster": 2.0, "fraudsters": 2.0, "fake investment": 2.0,
+    }
+
     # VirusTotal API (IMPORTANT)
     VIRUSTOTAL_API_KEY: str = ""
     VIRUSTOTAL_API_URL: str = "https://www.virustotal.com/api/v3"
 
+    # VirusTotal URL scans run as background jobs (see app/services/vt_jobs.py)
+    VT_URL_SCAN_ASYNC: bool = True       # False: submit + fetch inline (old behaviour)
+    VT_JOB_WORKER_ENABLED: bool = True
+    VT_JOB_POLL_INTERVAL: float = 5.0
+    VT_JOB_INITIAL_BACKOFF: float = 10.0
+    VT_JOB_MAX_BACKOFF: float = 300.0
+    VT_JOB_MAX_ATTEMPTS: int = 12
+    VT_JOB_BATCH_SIZE: int = 20
+    VT_JOB_LEASE_SECONDS: float = 60.0
+
     # MCA Scraper
     MCA_SCRAPER_USER_AGENT: str = "TrustCheckBot/1.0"
+    MCA_SEARCH_URL: str = "https://www.google.com/search"   # configurable for local stand-ins
 
     # Phishing API (optional future integration)
     PHISHTANK_API_KEY: str = ""
 
+    # OpenPhish feed (refreshed in the background)
+    OPENPHISH_FEED_URL: str = "https://openphish.com/feed.txt"
+    OPENPHISH_REFRESH_SECONDS: float = 900
+
+    # Local phishing blocklist (app/core/blocklist.py), rebuilt out of band
+    # by scripts/build_blocklist.py; workers pick up a new file on their own
+    BLOCKLIST_PATH: str = ""                 # default: app/data/phishing_blocklist.bin
+    BLOCKLIST_FEEDS: Dict[str, str] = {      # name -> URL or local file
+        "openphish": "https://openphish.com/feed.txt",
+        "phishtank": "http://data.phishtank.com/data/online-valid.csv",
+        "urlhaus": "https://urlhaus.abuse.ch/downloads/csv_recent/",
+    }
+    BLOCKLIST_BLOOM_BITS_PER_ENTRY: int = 10  # 0 builds without a Bloom filter
+    BLOCKLIST_RECHECK_SECONDS: float = 30     # how often workers stat the file
+
+    # Verification fan-out (seconds)
+    VERIFY_DEADLINE_SECONDS: float = 12.0    # overall budget for one verification
+    ADAPTER_TIMEOUT_SECONDS: float = 10.0    # default budget per source
+    ADAPTER_TIMEOUTS: Dict[str, float] = {}  # per-source overrides, e.g. {"whois": 5}
+    ADAPTER_MAX_WORKERS: int = 32
+
+    # Company -> domain guessing (see app/core/resolver.py)
+    DNS_TIMEOUT_SECONDS: float = 2.0         # per lookup
+    DNS_GUESS_BUDGET_SECONDS: float = 1.5    # all candidates together
+    DNS_GUESS_TLDS: List[str] = [".com", ".in", ".co.in"]
+    DNS_GUESS_MAX_CANDIDATES: int = 12
+    DNS_CACHE_MAX_ENTRIES: int = 4096
+    DNS_MIN_TTL: float = 30                  # clamp on record TTLs
+    DNS_MAX_TTL: float = 3600
+    DNS_NEGATIVE_TTL: float = 300            # NXDOMAIN / no A record
+    DNS_ERROR_TTL: float = 30                # timeouts, SERVFAIL
+
+    # Batch verification (/api/verify/batch)
+    BATCH_MAX_ITEMS: int = 500
+    BATCH_CONCURRENCY: int = 16
+
+    # Per-source adapter result cache (see app/core/adapter_cache.py)
+    ADAPTER_CACHE_ENABLED: bool = True
+    ADAPTER_CACHE_TTLS: Dict[str, float] = {}   # per-source overrides of the decorator TTL
+    ADAPTER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Upstream quotas shared across workers through Redis (see app/core/quota.py)
+    QUOTA_ENABLED: bool = True
+    UPSTREAM_QUOTAS: Dict[str, Dict[str, float]] = {
+        "virustotal": {"per_minute": 4, "per_day": 500},
+        "newsapi": {"per_minute": 50, "per_day": 100},
+        "whois": {"per_minute": 50, "per_day": 1000},
+    }
+    QUOTA_MAX_WAIT_SECONDS: float = 2.0              # interactive calls
+    QUOTA_BACKGROUND_MAX_WAIT_SECONDS: float = 30.0  # batch items, job workers; capped by the source timeout
+    QUOTA_BACKGROUND_RESERVE: float = 0.25           # budget share background calls may not touch
+
+    # Shared upstream HTTP clients (see app/core/http.py)
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_HOST_LIMITS: Dict[str, int] = {}    # per-upstream overrides, e.g. {"virustotal": 4}
+    HTTP_MAX_KEEPALIVE: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False              # needs the optional 'h2' package
+
+    # Prometheus metrics on /metrics (see app/core/metrics.py)
+    METRICS_ENABLED: bool = True
+
+    # Startup warm-up reported on /ready (see app/services/warmup.py)
+    WARMUP_TIMEOUT_SECONDS: float = 30.0    # per component
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,195 @@
+import functools
+import gzip
+import ipaddress
+import logging
+import os
+from typing import FrozenSet, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Mozilla's public suffix list, bundled so lookups never touch the network.
+# Refresh with: python -m scripts.update_public_suffix_list
+PSL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "public_suffix_list.dat.gz")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _to_ascii(host: str) -> str:
+    """
+    IDNA (punycode) form of a lowercase hostname. Uses the idna package
+    (UTS #46, as browsers do) when installed, else the stdlib IDNA 2003 codec.
+    """
+    if host.isascii():
+        return host
+    try:
+        import idna
+        return idna.encode(host, uts46=True).decode("ascii")
+    except ImportError:
+        return host.encode("idna").decode("ascii")
+
+
+class PublicSuffixList:
+    """
+    Public suffix rules (normal, "*." wildcard and "!" exception), with
+    labels stored in punycode so they compare against _to_ascii hosts.
+    """
+
+    def __init__(self, rules: FrozenSet[str], wildcards: FrozenSet[str], exceptions: FrozenSet[str]):
+        self.rules = rules
+        self.wildcards = wildcards        # "ck" for "*.ck"
+        self.exceptions = exceptions      # "www.ck" for "!www.ck"
+
+    @classmethod
+    def parse(cls, lines) -> "PublicSuffixList":
+        rules, wildcards, exceptions = set(), set(), set()
+        for line in lines:
+            rule = line.split(None, 1)[0] if line.strip() else ""
+            if not rule or rule.startswith("//"):
+                continue
+            try:
+                if rule.startswith("!"):
+                    exceptions.add(_to_ascii(rule[1:].lower()))
+                elif rule.startswith("*."):
+                    wildcards.add(_to_ascii(rule[2:].lower()))
+                else:
+                    rules.add(_to_ascii(rule.lower()))
+            except (UnicodeError, ValueError):
+                logger.warning("Skipping unparseable public suffix rule %r", rule)
+        return cls(frozenset(rules), frozenset(wildcards), frozenset(exceptions))
+
+    @classmethod
+    def load(cls, path: str = PSL_PATH) -> "PublicSuffixList":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return cls.parse(f)
+
+    def suffix_labels(self, labels: list) -> int:
+        """
+        Number of trailing labels forming the public suffix; the longest
+        matching rule wins, exceptions beat wildcards, unknown TLDs are
+        treated as a one-label suffix ("*").
+        """
+        n = len(labels)
+        for i in range(n):
+            candidate = ".".join(labels[i:])
+            if candidate in self.exceptions:
+                return n - i - 1
+            if candidate in self.rules:
+                return n - i
+            if i + 1 < n and ".".join(labels[i + 1:]) in self.wildcards:
+                return n - i
+        return 1
+
+    def registrable_domain(self, host: str) -> Optional[str]:
+        """
+        eTLD+1 of an ASCII hostname ("login.example.co.uk" -> "example.co.uk"),
+        None if the host is itself a public suffix.
+        """
+        labels = host.split(".")
+        suffix = self.suffix_labels(labels)
+        if suffix >= len(labels):
+            return None
+        return ".".join(labels[-suffix - 1:])
+
+
+@functools.lru_cache(maxsize=1)
+def public_suffixes() -> PublicSuffixList:
+    return PublicSuffixList.load()
+
+
+def _is_ip(host: str) -> bool:
+    # hostnames never end in a digit (TLDs are alphabetic); skip the parse
+    if ":" not in host and not host[-1:].isdigit():
+        return False
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+@functools.lru_cache(maxsize=16384)
+def normalize_host(value: str) -> Optional[str]:
+    """
+    Bare hostname of a domain or URL: scheme, credentials, port, path and
+    trailing dots dropped, lowercased and punycoded. None if there is no
+    usable host. "https://User@WWW.Bücher.de.:8443/x" -> "www.xn--bcher-kva.de"
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        host = urlsplit(value if "://" in value else f"//{value}").hostname
+    except ValueError:
+        return None
+    host = (host or "").rstrip(".")
+    if not host:
+        return None
+    if _is_ip(host):
+        return host
+    try:
+        host = _to_ascii(host)
+    except (UnicodeError, ValueError):
+        return None
+    if any(not label for label in host.split(".")):
+        return None
+    return host
+
+
+@functools.lru_cache(maxsize=16384)
+def registrable_domain(value: str) -> Optional[str]:
+    """
+    eTLD+1 of a domain or URL, e.g. "login.example.com/path" -> "example.com".
+    None for IP addresses, public suffixes and unusable input.
+    """
+    host = normalize_host(value)
+    if host is None or _is_ip(host):
+        return None
+    return public_suffixes().registrable_domain(host)
+
+
+def canonical_domain(value: str) -> str:
+    """
+    Key for domain-level lookups (WHOIS, news, VT domain reports): the
+    registrable domain, else the normalized host (IPs, bare suffixes),
+    else the input lowercased.
+    """
+    return registrable_domain(value) or normalize_host(value) or (value or "").strip().lower()
+
+
+def canonical_site(value: str) -> str:
+    """
+    Key for domain artifacts and verdicts: the normalized host without a
+    leading "www.", since phishing feeds list hosts, not registrable
+    domains. "WWW.Example.com." -> "example.com", "login.example.com/x"
+    -> "login.example.com".
+    """
+    host = normalize_host(value)
+    if not host:
+        return (value or "").strip().lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def canonical_url(value: str) -> str:
+    """
+    URL with its host normalized and a default port dropped; the path and
+    query are kept as-is since they are what URL scanners look at.
+    """
+    value = value.strip()
+    try:
+        parts = urlsplit(value)
+        port = parts.port
+    except ValueError:
+        return value
+    scheme = parts.scheme.lower()
+    host = normalize_host(value)
+    if not host:
+        return value
+    if ":" in host:
+        host = f"[{host}]"
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    out = f"{scheme}://{host}{parts.path or '/'}"
+    if parts.query:
+        out += f"?{parts.query}"
+    return out
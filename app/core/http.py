@@ -0,0 +1,79 @@
+import logging
+import threading
+from typing import Dict
+
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (httpx needs it for http2=True)
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPClientRegistry:
+    """
+    One pooled httpx.Client per upstream (VirusTotal, WHOIS, NewsAPI, ...).
+
+    Clients are created lazily and reused for the whole app lifetime so
+    repeated calls to the same host keep their TCP/TLS connections alive.
+    app/main.py owns the registry: it opens it on startup and closes it
+    on shutdown. httpx.Client is thread-safe, so adapters running on the
+    orchestrator's thread pool share the same client.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+        self._http2 = False
+
+    def startup(self):
+        self._http2 = settings.HTTP2_ENABLED and _http2_available()
+        if settings.HTTP2_ENABLED and not self._http2:
+            logger.warning("HTTP2_ENABLED is set but 'h2' is not installed; using HTTP/1.1.")
+
+    def _build(self, upstream: str) -> httpx.Client:
+        max_conns = settings.HTTP_HOST_LIMITS.get(upstream, settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+        limits = httpx.Limits(
+            max_connections=max_conns,
+            max_keepalive_connections=min(max_conns, settings.HTTP_MAX_KEEPALIVE),
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        return httpx.Client(
+            limits=limits,
+            timeout=settings.HTTP_TIMEOUT_SECONDS,
+            http2=self._http2,
+        )
+
+    def get(self, upstream: str) -> httpx.Client:
+        client = self._clients.get(upstream)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(upstream)
+            if client is None:
+                client = self._build(upstream)
+                self._clients[upstream] = client
+            return client
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            try:
+                client.close()
+            except Exception:
+                logger.exception("Failed to close HTTP client")
+
+
+http_clients = HTTPClientRegistry()
+
+
+def get_client(upstream: str) -> httpx.Client:
+    return http_clients.get(upstream)
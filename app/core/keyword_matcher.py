@@ -0,0 +1,74 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Union
+
+
+class KeywordHit(NamedTuple):
+    keyword: str
+    start: int
+    end: int
+    weight: float
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """
+    One alternation shaped like the keyword trie, so shared prefixes are
+    matched once ("fraud", "fraud case", "fraudster" -> fraud(?:\\s+case|ster)?).
+    """
+    trie: dict = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alts = [(r"\s+" if ch == " " else re.escape(ch)) + build(child)
+                for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            return ("(?:" + body + ")?") if len(alts) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Precompiled multi-keyword matcher: the keyword list is folded into a
+    single trie-shaped regex, so one pass over the text finds them all
+    (in C, which beats a pure-Python Aho-Corasick loop on CPython).
+    Matching is case-insensitive and whole-word ("scam" does not hit
+    "scampi"); spaces in a keyword match any run of whitespace. Where
+    keywords overlap, the longest one starting leftmost wins
+    ("fraud case" rather than "fraud").
+
+    Build once per keyword list and reuse; find() is thread-safe.
+    """
+
+    def __init__(self, keywords: Union[Dict[str, float], Iterable[str]]):
+        if not isinstance(keywords, dict):
+            keywords = {kw: 1.0 for kw in keywords}
+        self.weights = {" ".join(kw.lower().split()): float(w) for kw, w in keywords.items() if kw.strip()}
+        pattern = _trie_regex(self.weights) if self.weights else r"(?!)"
+        # lowercasing the text up front is faster than re.IGNORECASE
+        self._regex = re.compile(r"(?<!\w)(?:" + pattern + r")(?!\w)")
+
+    def find(self, text: str) -> List[KeywordHit]:
+        """
+        Keyword occurrences in text, in order. Offsets index text.lower(),
+        which is text itself unless it has characters whose lowercase form
+        is longer (rare outside Turkish dotted I).
+        """
+        hits = []
+        for m in self._regex.finditer(text.lower()):
+            kw = " ".join(m.group().split())
+            hits.append(KeywordHit(kw, m.start(), m.end(), self.weights[kw]))
+        return hits
+
+    def score(self, text: str) -> float:
+        """
+        Sum of weights of the distinct keywords found in text.
+        """
+        return sum(self.weights[kw] for kw in {h.keyword for h in self.find(text)})
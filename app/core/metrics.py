@@ -0,0 +1,185 @@
+"""
+Minimal in-process Prometheus instrumentation (text exposition format
+0.0.4), so /metrics needs no extra dependency.
+
+Metrics are per process: with several uvicorn workers, scrape each one
+(or run one worker per pod). Updating a metric is a dict lookup and an
+add under a lock, cheap enough to leave on in production.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+# Seconds; upstream calls run from ~10ms (cache) to the 10s adapter timeout
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    @contextmanager
+    def track(self, *labels: str):
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][i] += 1
+            entry[1] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(counts), total)) for k, (counts, total) in self._values.items())
+        out = []
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _num(bound) + '"'
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return out
+
+
+def render() -> str:
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Application metrics
+# ---------------------------------------------------------------------------
+
+ADAPTER_SECONDS = Histogram(
+    "trustcheck_adapter_duration_seconds",
+    "Upstream source call latency, by source and outcome (ok, error, timeout, skipped, cached).",
+    ("source", "outcome"),
+)
+HTTP_REQUESTS = Counter(
+    "trustcheck_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"),
+)
+HTTP_SECONDS = Histogram(
+    "trustcheck_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"),
+)
+HTTP_DB_SECONDS = Histogram(
+    "trustcheck_http_request_db_seconds", "Database time spent within one HTTP request, by route.",
+    ("method", "route"),
+)
+DB_SECONDS = Histogram(
+    "trustcheck_db_operation_duration_seconds", "Repository call latency by operation.", ("operation",),
+)
+VERIFICATIONS_IN_FLIGHT = Gauge(
+    "trustcheck_verifications_in_flight", "Verifications currently running adapters (after singleflight).",
+)
+VERDICT_CACHE = Counter(
+    "trustcheck_verdict_cache_total",
+    "Verdict cache lookups on /api/verify and /api/verify/batch by result (hit, miss).",
+    ("result",),
+)
+
+# Per-request database time accumulator, set by the HTTP middleware
+_request_db_time: ContextVar[Optional[list]] = ContextVar("request_db_time", default=None)
+
+
+def start_request_db_timer() -> list:
+    acc = [0.0]
+    _request_db_time.set(acc)
+    return acc
+
+
+@contextmanager
+def db_timer(operation: str):
+    """
+    Times one database operation into DB_SECONDS and the current
+    request's database total.
+    """
+    if not settings.METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        DB_SECONDS.observe(elapsed, operation)
+        acc = _request_db_time.get()
+        if acc is not None:
+            acc[0] += elapsed
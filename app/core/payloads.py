@@ -0,0 +1,63 @@
+"""
+Evidence payload encoding: adapter results are stored as compact,
+key-sorted JSON, zlib-compressed past EVIDENCE_COMPRESS_MIN_BYTES, and
+addressed by the SHA-256 of that JSON, so an unchanged result maps to
+the same stored payload on every re-verification.
+"""
+import ast
+import hashlib
+import json
+import zlib
+from typing import Any, Optional, Tuple
+
+from app.core.config import settings
+
+ZLIB = "zlib"
+
+
+def canonical_json(data: Any) -> bytes:
+    # values JSON has no type for (datetimes from adapters) become strings
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def encode_payload(data: Any) -> Tuple[str, bytes, Optional[str]]:
+    """
+    Returns (content_hash, body, compression). The hash is taken before
+    compression, so changing the threshold doesn't split duplicates.
+    """
+    raw = canonical_json(data)
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if 0 < settings.EVIDENCE_COMPRESS_MIN_BYTES <= len(raw):
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return content_hash, packed, ZLIB
+    return content_hash, raw, None
+
+
+def decode_payload(body, compression: Optional[str]) -> Any:
+    """
+    Stored payload back as JSON values; None for a missing payload.
+    Raises ValueError for a corrupt one.
+    """
+    if body is None:
+        return None
+    raw = bytes(body)     # psycopg2 hands back memoryview for bytea
+    if compression == ZLIB:
+        try:
+            raw = zlib.decompress(raw)
+        except zlib.error as e:
+            raise ValueError(f"corrupt payload: {e}") from e
+    elif compression:
+        raise ValueError(f"unknown payload compression {compression!r}")
+    return json.loads(raw)
+
+
+def parse_legacy_summary(summary: str) -> Any:
+    """
+    Evidence summaries were once stored as str() of the adapter result;
+    the literal they spell, else the text itself.
+    """
+    try:
+        return ast.literal_eval(summary)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return summary
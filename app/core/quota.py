@@ -0,0 +1,163 @@
+import contextvars
+import logging
+import math
+import threading
+import time
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Set by batch requests and background workers; adapter threads inherit it
+# through the context copied in orchestrator._call_source.
+quota_priority: contextvars.ContextVar = contextvars.ContextVar("quota_priority", default=INTERACTIVE)
+
+# time.monotonic() by which the calling source must have its answer, set
+# per source call; a wait for budget that would run past it is a skip.
+quota_deadline: contextvars.ContextVar = contextvars.ContextVar("quota_deadline", default=None)
+
+SKIPPED = "skipped"
+
+# Token bucket (per-minute rate) + daily counter, evaluated atomically in
+# Redis so every uvicorn worker draws from the same budget.
+# Returns {allowed, wait_ms}; wait_ms = -1 means the daily budget is spent.
+_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local reserve = tonumber(ARGV[4])
+local day_limit = tonumber(ARGV[5])
+local day_reserve = tonumber(ARGV[6])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local used = tonumber(redis.call('GET', KEYS[2]) or '0')
+if day_limit > 0 and used + cost > day_limit - day_reserve then
+  return {0, -1}
+end
+
+local tokens = tonumber(redis.call('HGET', KEYS[1], 't') or ARGV[2])
+local ts = tonumber(redis.call('HGET', KEYS[1], 'ts') or now)
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+if tokens - cost < reserve then
+  redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+  redis.call('EXPIRE', KEYS[1], 3600)
+  return {0, math.ceil((reserve + cost - tokens) / rate * 1000)}
+end
+
+redis.call('HSET', KEYS[1], 't', tokens - cost, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 3600)
+redis.call('INCRBY', KEYS[2], cost)
+redis.call('EXPIRE', KEYS[2], 172800)
+return {1, 0}
+"""
+
+
+class MemoryBuckets:
+    """
+    Same algorithm as _BUCKET_LUA for a single process (REDIS_URL=memory://).
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._days = {}
+        self._lock = threading.Lock()
+
+    def take(self, keys, rate, capacity, cost, reserve, day_limit, day_reserve) -> Tuple[int, int]:
+        bucket_key, day_key = keys
+        with self._lock:
+            now = time.time()
+            used = self._days.get(day_key, 0)
+            if day_limit > 0 and used + cost > day_limit - day_reserve:
+                return 0, -1
+
+            tokens, ts = self._buckets.get(bucket_key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+
+            if tokens - cost < reserve:
+                self._buckets[bucket_key] = (tokens, now)
+                return 0, math.ceil((reserve + cost - tokens) / rate * 1000)
+
+            self._buckets[bucket_key] = (tokens - cost, now)
+            self._days[day_key] = used + cost
+            return 1, 0
+
+
+_memory = MemoryBuckets()
+_script = None
+
+
+def _take(upstream: str, cost: int, reserve: float, day_reserve: float, limits: dict) -> Tuple[int, int]:
+    global _script
+    from app.services.verdict_cache import get_redis
+
+    per_minute = float(limits.get("per_minute", 0)) or 1e9
+    rate = per_minute / 60.0
+    keys = [f"quota:{upstream}:bucket", f"quota:{upstream}:day:{time.strftime('%Y%m%d', time.gmtime())}"]
+    args = [rate, per_minute, cost, reserve, float(limits.get("per_day", 0)), day_reserve]
+
+    if settings.REDIS_URL.startswith("memory://"):
+        return _memory.take(keys, *args)
+
+    client = get_redis()
+    if _script is None:
+        _script = client.register_script(_BUCKET_LUA)
+    allowed, wait_ms = _script(keys=keys, args=args)
+    return int(allowed), int(wait_ms)
+
+
+def skipped(upstream: str, why: str = "quota") -> dict:
+    """
+    Adapter result for a call that was not made. Carries "error" so callers
+    that only check for errors never mistake it for a clean result; the
+    adapter cache does not store it.
+    """
+    return {"status": SKIPPED, "skipped": why, "error": f"skipped: {why}", "upstream": upstream}
+
+
+def check_quota(upstream: str, cost: int = 1) -> Optional[dict]:
+    """
+    Reserves budget for one upstream call. Returns None when the call may
+    go ahead, or a skipped(...) result to hand back instead.
+
+    Interactive calls may use the whole budget and wait briefly for the
+    per-minute bucket to refill. Background calls (batch, job workers)
+    leave QUOTA_BACKGROUND_RESERVE of each budget to interactive traffic
+    and may queue for longer. Neither waits past quota_deadline, so a
+    source that can't get budget in time reports "skipped", not a timeout.
+    """
+    limits = settings.UPSTREAM_QUOTAS.get(upstream)
+    if not settings.QUOTA_ENABLED or not limits:
+        return None
+
+    background = quota_priority.get() == BACKGROUND
+    share = settings.QUOTA_BACKGROUND_RESERVE if background else 0.0
+    reserve = float(limits.get("per_minute", 0)) * share
+    day_reserve = float(limits.get("per_day", 0)) * share
+    max_wait = settings.QUOTA_BACKGROUND_MAX_WAIT_SECONDS if background else settings.QUOTA_MAX_WAIT_SECONDS
+
+    deadline = time.monotonic() + max_wait
+    call_deadline = quota_deadline.get()
+    if call_deadline is not None:
+        deadline = min(deadline, call_deadline)
+    while True:
+        try:
+            allowed, wait_ms = _take(upstream, cost, reserve, day_reserve, limits)
+        except Exception:
+            logger.warning("Quota check failed for %s; allowing call", upstream, exc_info=True)
+            return None
+
+        if allowed:
+            return None
+        if wait_ms < 0:
+            return skipped(upstream, "quota")
+
+        wait = wait_ms / 1000.0
+        if time.monotonic() + wait > deadline:
+            return skipped(upstream, "quota")
+        time.sleep(wait)
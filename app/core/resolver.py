@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import socket
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import aiodns
+    import pycares
+except ImportError:     # fall back to getaddrinfo on the default executor
+    aiodns = None
+
+# c-ares codes meaning "the name has no A record" (cacheable as a miss);
+# anything else (timeout, SERVFAIL, refused) is only cached briefly.
+_NEGATIVE_CODES = {pycares.errno.ARES_ENOTFOUND, pycares.errno.ARES_ENODATA} if aiodns else set()
+
+
+class DNSCache:
+    """
+    Bounded in-process cache of A lookups, hits and misses alike.
+
+    Hits live for the record TTL clamped to [DNS_MIN_TTL, DNS_MAX_TTL];
+    NXDOMAIN/NODATA for DNS_NEGATIVE_TTL; resolver errors and timeouts
+    for DNS_ERROR_TTL, so a flaky resolver is retried soon.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Optional[List[str]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0}
+
+    def get(self, host: str) -> Tuple[bool, Optional[List[str]]]:
+        """
+        (found, addresses); addresses is None for a cached miss.
+        """
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None or entry[0] <= time.monotonic():
+                self.stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(host)
+            self.stats["hits" if entry[1] else "negative_hits"] += 1
+            return True, entry[1]
+
+    def put(self, host: str, addresses: Optional[List[str]], ttl: float):
+        with self._lock:
+            self._entries[host] = (time.monotonic() + ttl, addresses)
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries)}
+
+
+dns_cache = DNSCache(settings.DNS_CACHE_MAX_ENTRIES)
+
+# aiodns binds to an event loop; the sync run_verification path runs a fresh
+# loop per call, so keep one resolver per loop.
+_resolvers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = weakref.WeakKeyDictionary()
+
+
+# keeps a reference to lookups that outlive first_resolving()
+_background: set = set()
+
+
+def _clamp_ttl(ttl: float) -> float:
+    return max(settings.DNS_MIN_TTL, min(settings.DNS_MAX_TTL, ttl))
+
+
+async def _query(host: str) -> Tuple[Optional[List[str]], float]:
+    """
+    (addresses or None, ttl). Raises on resolver failures (timeouts,
+    SERVFAIL), which resolve() caches only briefly.
+    """
+    if aiodns is not None:
+        loop = asyncio.get_running_loop()
+        resolver = _resolvers.get(loop)
+        if resolver is None:
+            resolver = _resolvers[loop] = aiodns.DNSResolver(loop=loop, timeout=settings.DNS_TIMEOUT_SECONDS)
+        try:
+            records = await resolver.query(host, "A")
+        except aiodns.error.DNSError as e:
+            if e.args and e.args[0] in _NEGATIVE_CODES:
+                return None, settings.DNS_NEGATIVE_TTL
+            raise OSError(f"DNS error for {host}: {e}") from e
+        if not records:
+            return None, settings.DNS_NEGATIVE_TTL
+        return [r.host for r in records], _clamp_ttl(min(r.ttl for r in records))
+
+    # getaddrinfo exposes no TTL; hits get the minimum
+    loop = asyncio.get_running_loop()
+    try:
+        infos = await loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        if e.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)):
+            return None, settings.DNS_NEGATIVE_TTL
+        raise
+    return sorted({info[4][0] for info in infos}), settings.DNS_MIN_TTL
+
+
+async def resolve(host: str) -> Optional[List[str]]:
+    """
+    IPv4 addresses for host, or None if it does not resolve. Never raises;
+    answers (including misses and failures) are served from dns_cache.
+    """
+    host = host.lower().rstrip(".")
+    found, addresses = dns_cache.get(host)
+    if found:
+        return addresses
+
+    try:
+        addresses, ttl = await asyncio.wait_for(_query(host), settings.DNS_TIMEOUT_SECONDS)
+    except Exception:
+        logger.debug("DNS lookup failed for %s", host, exc_info=True)
+        addresses, ttl = None, settings.DNS_ERROR_TTL
+
+    dns_cache.put(host, addresses, ttl)
+    return addresses
+
+
+async def first_resolving(candidates: List[str], budget: float) -> Optional[str]:
+    """
+    Resolves all candidates at once and returns the first one in list order
+    that resolves, waiting at most budget seconds in total. A candidate that
+    is still pending at the deadline is passed over for later ones that
+    already answered.
+    """
+    if not candidates:
+        return None
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    tasks = [asyncio.ensure_future(resolve(c)) for c in candidates]
+    try:
+        for candidate, task in zip(candidates, tasks):
+            try:
+                addresses = await asyncio.wait_for(asyncio.shield(task), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                continue
+            if addresses:
+                return candidate
+        return None
+    finally:
+        # Lookups still running finish in the background so their answer
+        # (or failure) is cached and the next guess doesn't wait on them.
+        for task in tasks:
+            if not task.done():
+                _background.add(task)
+                task.add_done_callback(_background.discard)
@@ -1,10 +1,287 @@
+import datetime
+
+from sqlalchemy import bindparam, func, or_, select
 from sqlalchemy.orm import Session
 from app import models
-from typing import Dict, Any, List
+from app.core.payloads import encode_payload
+from typing import Dict, Any, List, Tuple
+
+# -------------------------------------------------------------------------
+# Statement builders shared with app/crud_async.py
+# -------------------------------------------------------------------------
+
+artifacts_t = models.Artifact.__table__
+evidences_t = models.Evidence.__table__
+payloads_t = models.EvidencePayload.__table__
+scores_t = models.RiskScore.__table__
+reports_t = models.UserReport.__table__
+jobs_t = models.ScanJob.__table__
+
+
+def artifact_versions_query(artifact_id: int):
+    """
+    Artifact row (with its current verdict and version) plus the newest
+    evidence / score ids, in one query. Verifications only append history
+    rows; scan jobs that edit rows in place bump the version. Together
+    these identify the artifact's current state and are enough to build
+    an ETag.
+    """
+    return select(
+        artifacts_t.c.id, artifacts_t.c.type, artifacts_t.c.value, artifacts_t.c.created_at,
+        artifacts_t.c.latest_score, artifacts_t.c.latest_label, artifacts_t.c.last_verified_at,
+        artifacts_t.c.version,
+        select(func.max(evidences_t.c.id)).where(evidences_t.c.artifact_id == artifacts_t.c.id)
+        .scalar_subquery().label("max_evidence_id"),
+        select(func.max(scores_t.c.id)).where(scores_t.c.artifact_id == artifacts_t.c.id)
+        .scalar_subquery().label("max_score_id"),
+    ).where(artifacts_t.c.id == artifact_id)
+
+
+def evidences_page_query(artifact_id: int, limit: int, before_id: int = None):
+    """
+    Keyset page of evidences with their payload (body, compression),
+    newest first. Fetches limit + 1 rows so the caller can tell whether
+    another page exists.
+    """
+    q = (
+        select(evidences_t, payloads_t.c.body, payloads_t.c.compression)
+        .select_from(evidences_t.outerjoin(payloads_t, payloads_t.c.id == evidences_t.c.payload_id))
+        .where(evidences_t.c.artifact_id == artifact_id)
+    )
+    if before_id is not None:
+        q = q.where(evidences_t.c.id < before_id)
+    return q.order_by(evidences_t.c.id.desc()).limit(limit + 1)
+
+
+def scores_page_query(artifact_id: int, limit: int, before_id: int = None):
+    q = select(scores_t).where(scores_t.c.artifact_id == artifact_id)
+    if before_id is not None:
+        q = q.where(scores_t.c.id < before_id)
+    return q.order_by(scores_t.c.id.desc()).limit(limit + 1)
+
+
+def score_history_query(artifact_id: int):
+    return (
+        select(scores_t.c.id, scores_t.c.score, scores_t.c.label, scores_t.c.computed_at)
+        .where(scores_t.c.artifact_id == artifact_id)
+        .order_by(scores_t.c.computed_at, scores_t.c.id)
+    )
+
+
+def latest_evidences_query(after_id: int = 0):
+    """
+    (artifact id, type, value, source, body, compression) for the newest
+    evidence of each source, ordered by artifact id, for artifacts above after_id that
+    have no pending scan job (the job worker still owns their latest
+    score). Feeds offline rescoring (scripts/rescore.py).
+    """
+    ranked = select(
+        evidences_t.c.artifact_id, evidences_t.c.source, evidences_t.c.payload_id,
+        func.row_number().over(
+            partition_by=(evidences_t.c.artifact_id, evidences_t.c.source),
+            order_by=(evidences_t.c.captured_at.desc(), evidences_t.c.id.desc()),
+        ).label("rn"),
+    ).where(evidences_t.c.artifact_id > after_id).subquery()
+
+    pending_job = (
+        select(jobs_t.c.id)
+        .where(jobs_t.c.artifact_id == artifacts_t.c.id)
+        .where(jobs_t.c.status == "pending")
+        .exists()
+    )
+    return (
+        select(artifacts_t.c.id, artifacts_t.c.type, artifacts_t.c.value, ranked.c.source,
+               payloads_t.c.body, payloads_t.c.compression)
+        .join(ranked, ranked.c.artifact_id == artifacts_t.c.id)
+        .outerjoin(payloads_t, payloads_t.c.id == ranked.c.payload_id)
+        .where(ranked.c.rn == 1)
+        .where(~pending_job)
+        .order_by(artifacts_t.c.id)
+    )
+
+
+def verdict_values(score: int, label: str, now: datetime.datetime) -> Dict[str, Any]:
+    """
+    Denormalized verdict columns of an artifact for a new RiskScore.
+    """
+    return dict(latest_score=score, latest_label=label, last_verified_at=now)
+
+
+def artifact_upsert_statements(dialect: str, type_: str, value: str, metadata: Dict[str, Any],
+                               now: datetime.datetime, verdict: Dict[str, Any]):
+    """
+    Returns (insert_stmt, returns_row). ON CONFLICT on the unique value
+    column closes the get-then-create race and sets the verdict columns
+    of an existing row. Postgres returns the row directly; elsewhere the
+    caller selects it with artifact_by_value_query. Other dialects get
+    None and insert or update the row themselves.
+    """
+    values = dict(type=type_, value=value, artifact_metadata=metadata or {}, created_at=now, **verdict)
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(artifacts_t).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[artifacts_t.c.value],
+            set_={k: stmt.excluded[k] for k in verdict},
+        ).returning(artifacts_t.c.id, artifacts_t.c.type, artifacts_t.c.value, artifacts_t.c.created_at)
+        return stmt, True
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(artifacts_t).values(**values)
+        return stmt.on_conflict_do_update(
+            index_elements=[artifacts_t.c.value],
+            set_={k: stmt.excluded[k] for k in verdict},
+        ), False
+
+    return None, False
+
+
+def latest_verdict_update():
+    """
+    executemany-ready UPDATE of an artifact's latest score and label
+    (binds: b_artifact_id, b_score, b_label, b_computed_at). Skips
+    artifacts verified after b_computed_at, whose newer verdict stands.
+    """
+    return (
+        artifacts_t.update()
+        .where(artifacts_t.c.id == bindparam("b_artifact_id"))
+        .where(or_(artifacts_t.c.last_verified_at.is_(None),
+                   artifacts_t.c.last_verified_at <= bindparam("b_computed_at")))
+        .values(latest_score=bindparam("b_score"), latest_label=bindparam("b_label"))
+    )
+
+
+def artifact_verdict_query(value: str):
+    """
+    Current verdict of an artifact by its canonical value: one lookup on
+    the unique value index, no history rows read.
+    """
+    return select(
+        artifacts_t.c.id, artifacts_t.c.type, artifacts_t.c.value,
+        artifacts_t.c.latest_score, artifacts_t.c.latest_label, artifacts_t.c.last_verified_at,
+    ).where(artifacts_t.c.value == value)
+
+
+def payload_rows(artifact_id: int, evidences: List[Dict], now: datetime.datetime) -> List[Dict]:
+    """
+    One evidence_payloads row per evidence, from its "data".
+    """
+    rows = []
+    for ev in evidences:
+        content_hash, body, compression = encode_payload(ev.get("data"))
+        rows.append({
+            "artifact_id": artifact_id,
+            "source": ev.get("source"),
+            "content_hash": content_hash,
+            "compression": compression,
+            "body": body,
+            "created_at": now,
+        })
+    return rows
+
+
+def payload_ids_query(artifact_id: int, hashes: List[str]):
+    return select(payloads_t.c.id, payloads_t.c.source, payloads_t.c.content_hash).where(
+        payloads_t.c.artifact_id == artifact_id,
+        payloads_t.c.content_hash.in_(hashes),
+    )
+
+
+def payload_insert_statement(dialect: str, rows: List[Dict]):
+    """
+    Multi-row INSERT of new payloads. ON CONFLICT DO NOTHING lets a
+    concurrent verification of the same artifact store them first.
+    """
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return payloads_t.insert().values(rows)
+    return insert(payloads_t).values(rows).on_conflict_do_nothing(
+        index_elements=[payloads_t.c.artifact_id, payloads_t.c.source, payloads_t.c.content_hash]
+    )
+
+
+def missing_payloads(rows: List[Dict], ids: Dict[Tuple[str, str], int]) -> List[Dict]:
+    """
+    rows not stored yet (per ids, keyed by (source, content_hash)), once each.
+    """
+    missing = {}
+    for row in rows:
+        key = (row["source"], row["content_hash"])
+        if key not in ids:
+            missing.setdefault(key, row)
+    return list(missing.values())
+
+
+def artifact_by_value_query(value: str):
+    return select(artifacts_t.c.id, artifacts_t.c.type, artifacts_t.c.value, artifacts_t.c.created_at) \
+        .where(artifacts_t.c.value == value)
+
+
+def job_query(job_id: int):
+    return select(jobs_t).where(jobs_t.c.id == job_id)
+
+
+def job_rows(evidences: List[Dict], evidence_ids: List[int], artifact_id: int, score_id: int,
+             now: datetime.datetime) -> List[Dict]:
+    """
+    One scan_jobs row per evidence that asked for a background job.
+    """
+    return [
+        {
+            "kind": ev["job"]["kind"],
+            "status": "pending",
+            "target": ev["job"].get("target"),
+            "external_id": ev["job"].get("external_id"),
+            "artifact_id": artifact_id,
+            "evidence_id": ev_id,
+            "score_id": score_id,
+            "attempts": 0,
+            "next_poll_at": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for ev, ev_id in zip(evidences, evidence_ids)
+        if ev.get("job")
+    ]
+
+
+def verification_result(art, evidences: List[Dict], score: Dict, history, jobs: List[Dict] = ()) -> Dict[str, Any]:
+    return {
+        "artifact": {"id": art["id"], "type": art["type"], "value": art["value"], "created_at": art["created_at"]},
+        "evidences": evidences,
+        "score": score,
+        "scores": [dict(row) for row in history],
+        "jobs": [{"id": j["id"], "kind": j["kind"], "status": j["status"]} for j in jobs],
+    }
+
+
+# -------------------------------------------------------------------------
+# Sync session operations
+# -------------------------------------------------------------------------
 
 def get_artifact_by_value(db: Session, value: str):
     return db.query(models.Artifact).filter(models.Artifact.value == value).first()
 
+def get_artifact_with_versions(db: Session, artifact_id: int):
+    return db.execute(artifact_versions_query(artifact_id)).mappings().first()
+
+def get_verdict(db: Session, value: str):
+    return db.execute(artifact_verdict_query(value)).mappings().first()
+
+def get_job(db: Session, job_id: int):
+    return db.execute(job_query(job_id)).mappings().first()
+
+def list_evidences(db: Session, artifact_id: int, limit: int, before_id: int = None):
+    return db.execute(evidences_page_query(artifact_id, limit, before_id)).mappings().all()
+
+def list_scores(db: Session, artifact_id: int, limit: int, before_id: int = None):
+    return db.execute(scores_page_query(artifact_id, limit, before_id)).mappings().all()
+
 def create_artifact(db: Session, type_: str, value: str, metadata: Dict[str, Any] = None):
     obj = models.Artifact(type=type_, value=value, metadata=metadata or {})
     db.add(obj)
@@ -12,8 +289,11 @@ def create_artifact(db: Session, type_: str, value: str, metadata: Dict[str, Any
     db.refresh(obj)
     return obj
 
-def add_evidence(db: Session, artifact: models.Artifact, source: str, title: str = None, url: str = None, summary: str = None):
-    ev = models.Evidence(artifact_id=artifact.id, source=source, title=title, url=url, summary=summary)
+def add_evidence(db: Session, artifact: models.Artifact, source: str, title: str = None, url: str = None, data: Any = None):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    payload_id = store_payloads(db, artifact.id, [{"source": source, "data": data}], now)[0]
+    ev = models.Evidence(artifact_id=artifact.id, source=source, title=title, url=url, payload_id=payload_id,
+                         captured_at=now)
     db.add(ev)
     db.commit()
     db.refresh(ev)
@@ -32,3 +312,107 @@ def create_user_report(db: Session, artifact_type: str, artifact_value: str, des
     db.commit()
     db.refresh(r)
     return r
+
+
+def _upsert_artifact(db: Session, type_: str, value: str, metadata: Dict[str, Any], now: datetime.datetime,
+                     verdict: Dict[str, Any]):
+    """
+    Inserts the artifact or sets the verdict of the existing row; returns
+    (id, type, value, created_at).
+    """
+    stmt, returns_row = artifact_upsert_statements(db.get_bind().dialect.name, type_, value, metadata, now, verdict)
+
+    if returns_row:
+        return db.execute(stmt).mappings().first()
+
+    if stmt is not None:
+        db.execute(stmt)
+    elif db.execute(artifact_by_value_query(value)).first() is None:
+        db.execute(artifacts_t.insert().values(type=type_, value=value, artifact_metadata=metadata or {},
+                                               created_at=now, **verdict))
+    else:
+        db.execute(artifacts_t.update().where(artifacts_t.c.value == value).values(**verdict))
+
+    return db.execute(artifact_by_value_query(value)).mappings().first()
+
+
+def store_payloads(db: Session, artifact_id: int, evidences: List[Dict], now: datetime.datetime) -> List[int]:
+    """
+    Payload id for each evidence's "data", inserting only contents the
+    artifact has not stored for that source before.
+    """
+    rows = payload_rows(artifact_id, evidences, now)
+    if not rows:
+        return []
+
+    def lookup():
+        found = db.execute(payload_ids_query(artifact_id, [r["content_hash"] for r in rows]))
+        return {(r.source, r.content_hash): r.id for r in found}
+
+    ids = lookup()
+    missing = missing_payloads(rows, ids)
+    if missing:
+        db.execute(payload_insert_statement(db.get_bind().dialect.name, missing))
+        ids = lookup()
+    return [ids[(r["source"], r["content_hash"])] for r in rows]
+
+
+def save_verification(db: Session, type_: str, value: str, metadata: Dict[str, Any],
+                      evidences: List[Dict], score: int, label: str, reasons: List[Dict]) -> Dict[str, Any]:
+    """
+    Writes the artifact (with the new verdict), all evidences (pointing at
+    deduplicated payloads) and the new risk score in one transaction.
+    Timestamps are set here rather than by the server, so generated ids
+    are the only thing read back and no refresh is needed.
+    Returns plain dicts (safe to use after the session is closed).
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    try:
+        art = _upsert_artifact(db, type_, value, metadata, now, verdict_values(score, label, now))
+        payload_ids = store_payloads(db, art["id"], evidences, now)
+
+        ev_rows = [
+            models.Evidence(
+                artifact_id=art["id"],
+                source=ev.get("source"),
+                title=ev.get("title"),
+                url=ev.get("url"),
+                payload_id=payload_id,
+                captured_at=now,
+            )
+            for ev, payload_id in zip(evidences, payload_ids)
+        ]
+        rs = models.RiskScore(artifact_id=art["id"], score=score, label=label, reasons=reasons, computed_at=now)
+
+        db.add_all(ev_rows + [rs])
+        db.flush()   # one batched INSERT per table; fills in primary keys
+
+        jobs = [
+            models.ScanJob(**row)
+            for row in job_rows(evidences, [e.id for e in ev_rows], art["id"], rs.id, now)
+        ]
+        if jobs:
+            db.add_all(jobs)
+            db.flush()
+
+        history = db.execute(score_history_query(art["id"])).mappings().all()
+
+        result = verification_result(
+            art,
+            [
+                {"id": e.id, "source": e.source, "title": e.title, "url": e.url,
+                 "data": ev.get("data"), "captured_at": e.captured_at}
+                for e, ev in zip(ev_rows, evidences)
+            ],
+            {"id": rs.id, "score": rs.score, "label": rs.label, "computed_at": rs.computed_at},
+            history,
+            [{"id": j.id, "kind": j.kind, "status": j.status} for j in jobs],
+        )
+
+        db.commit()
+        return result
+
+    except Exception:
+        db.rollback()
+        raise
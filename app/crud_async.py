@@ -0,0 +1,166 @@
+"""
+Async counterparts of the app/crud.py operations used by the API routes,
+running on the `databases` connection pool (asyncpg / aiosqlite) instead
+of a threadpool-bound SQLAlchemy session. Statements are shared with
+app/crud.py so both paths issue the same SQL.
+"""
+import datetime
+from typing import Any, Dict, List
+
+from databases import Database
+
+from app.crud import (
+    artifact_by_value_query,
+    artifact_upsert_statements,
+    artifact_verdict_query,
+    artifact_versions_query,
+    artifacts_t,
+    evidences_page_query,
+    evidences_t,
+    job_query,
+    job_rows,
+    jobs_t,
+    missing_payloads,
+    payload_ids_query,
+    payload_insert_statement,
+    payload_rows,
+    reports_t,
+    score_history_query,
+    scores_page_query,
+    scores_t,
+    verdict_values,
+    verification_result,
+)
+
+
+def _dialect(database: Database) -> str:
+    return database.url.dialect
+
+
+async def _insert_returning_ids(database: Database, table, rows: List[Dict]) -> List[int]:
+    if not rows:
+        return []
+
+    if _dialect(database) == "postgresql":
+        # one multi-row INSERT ... RETURNING id
+        records = await database.fetch_all(table.insert().values(rows).returning(table.c.id))
+        return [r["id"] for r in records]
+
+    # sqlite: execute() hands back lastrowid; still one transaction
+    return [await database.execute(table.insert().values(**row)) for row in rows]
+
+
+async def get_artifact_with_versions(database: Database, artifact_id: int):
+    return await database.fetch_one(artifact_versions_query(artifact_id))
+
+
+async def get_verdict(database: Database, value: str):
+    return await database.fetch_one(artifact_verdict_query(value))
+
+
+async def get_job(database: Database, job_id: int):
+    return await database.fetch_one(job_query(job_id))
+
+
+async def list_evidences(database: Database, artifact_id: int, limit: int, before_id: int = None):
+    return await database.fetch_all(evidences_page_query(artifact_id, limit, before_id))
+
+
+async def list_scores(database: Database, artifact_id: int, limit: int, before_id: int = None):
+    return await database.fetch_all(scores_page_query(artifact_id, limit, before_id))
+
+
+async def create_user_report(database: Database, artifact_type: str, artifact_value: str,
+                             description: str, contact: str = None) -> Dict[str, Any]:
+    values = dict(
+        artifact_type=artifact_type,
+        artifact_value=artifact_value,
+        description=description,
+        contact=contact,
+        status="pending",
+        created_at=datetime.datetime.now(datetime.timezone.utc),
+    )
+    report_id = (await _insert_returning_ids(database, reports_t, [values]))[0]
+    return {"id": report_id, "status": values["status"]}
+
+
+async def _upsert_artifact(database: Database, type_: str, value: str, metadata: Dict[str, Any],
+                           now: datetime.datetime, verdict: Dict[str, Any]):
+    stmt, returns_row = artifact_upsert_statements(_dialect(database), type_, value, metadata, now, verdict)
+
+    if returns_row:
+        return await database.fetch_one(stmt)
+
+    if stmt is not None:
+        await database.execute(stmt)
+    elif await database.fetch_one(artifact_by_value_query(value)) is None:
+        await database.execute(
+            artifacts_t.insert().values(type=type_, value=value, artifact_metadata=metadata or {},
+                                        created_at=now, **verdict)
+        )
+    else:
+        await database.execute(artifacts_t.update().where(artifacts_t.c.value == value).values(**verdict))
+
+    return await database.fetch_one(artifact_by_value_query(value))
+
+
+async def _store_payloads(database: Database, artifact_id: int, evidences: List[Dict],
+                          now: datetime.datetime) -> List[int]:
+    rows = payload_rows(artifact_id, evidences, now)
+    if not rows:
+        return []
+
+    async def lookup():
+        found = await database.fetch_all(payload_ids_query(artifact_id, [r["content_hash"] for r in rows]))
+        return {(r["source"], r["content_hash"]): r["id"] for r in found}
+
+    ids = await lookup()
+    missing = missing_payloads(rows, ids)
+    if missing:
+        await database.execute(payload_insert_statement(_dialect(database), missing))
+        ids = await lookup()
+    return [ids[(r["source"], r["content_hash"])] for r in rows]
+
+
+async def save_verification(database: Database, type_: str, value: str, metadata: Dict[str, Any],
+                            evidences: List[Dict], score: int, label: str, reasons: List[Dict]) -> Dict[str, Any]:
+    """
+    Same contract as crud.save_verification: one transaction, plain dicts back.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    async with database.transaction():
+        art = await _upsert_artifact(database, type_, value, metadata, now, verdict_values(score, label, now))
+        payload_ids = await _store_payloads(database, art["id"], evidences, now)
+
+        ev_rows = [
+            {
+                "artifact_id": art["id"],
+                "source": ev.get("source"),
+                "title": ev.get("title"),
+                "url": ev.get("url"),
+                "payload_id": payload_id,
+                "captured_at": now,
+            }
+            for ev, payload_id in zip(evidences, payload_ids)
+        ]
+        ev_ids = await _insert_returning_ids(database, evidences_t, ev_rows)
+
+        score_row = {"artifact_id": art["id"], "score": score, "label": label, "reasons": reasons, "computed_at": now}
+        score_id = (await _insert_returning_ids(database, scores_t, [score_row]))[0]
+
+        new_jobs = job_rows(evidences, ev_ids, art["id"], score_id, now)
+        job_ids = await _insert_returning_ids(database, jobs_t, new_jobs)
+
+        history = await database.fetch_all(score_history_query(art["id"]))
+
+    return verification_result(
+        art,
+        [
+            {"id": ev_id, **{k: row[k] for k in ("source", "title", "url", "captured_at")}, "data": ev.get("data")}
+            for ev_id, row, ev in zip(ev_ids, ev_rows, evidences)
+        ],
+        {"id": score_id, "score": score, "label": label, "computed_at": now},
+        [{k: row[k] for k in ("id", "score", "label", "computed_at")} for row in history],
+        [{**job, "id": job_id} for job, job_id in zip(new_jobs, job_ids)],
+    )
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from databases import Database
+from app.core.config import settings
+
+
+def async_database_url() -> str:
+    """
+    ASYNC_DATABASE_URL if set, else DATABASE_URL with any sync driver
+    suffix dropped ("postgresql+psycopg2://" -> "postgresql://"), which
+    `databases` maps to asyncpg / aiosqlite.
+    """
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+
+    scheme, sep, rest = settings.DATABASE_URL.partition("://")
+    return scheme.split("+", 1)[0] + sep + rest
+
+
+_database: Optional[Database] = None
+
+
+def get_database() -> Database:
+    global _database
+    if _database is None:
+        url = async_database_url()
+        if url.startswith("sqlite"):
+            # aiosqlite runs one connection; pool sizes don't apply
+            _database = Database(url)
+        else:
+            _database = Database(url, min_size=settings.DB_POOL_MIN_SIZE, max_size=settings.DB_POOL_MAX_SIZE)
+    return _database
@@ -0,0 +1,102 @@
+"""
+Data access used by the async API routes.
+
+DB_ASYNC=false (default): each call opens a SQLAlchemy session and runs
+the app/crud.py function on the anyio threadpool.
+DB_ASYNC=true: calls go through app/crud_async.py on the `databases`
+pool, so waiting on the database doesn't hold a threadpool worker.
+
+Both return the same shapes (dict-like rows / plain dicts).
+"""
+from fastapi.concurrency import run_in_threadpool
+
+from app import crud
+from app.core.config import settings
+from app.core.metrics import db_timer
+from app.db.session import SessionLocal
+
+
+class ThreadpoolRepository:
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def _run(self, fn, *args, **kwargs):
+        def call():
+            db = SessionLocal()
+            try:
+                return fn(db, *args, **kwargs)
+            finally:
+                db.close()
+
+        with db_timer(fn.__name__):
+            return await run_in_threadpool(call)
+
+    async def save_verification(self, *args, **kwargs):
+        return await self._run(crud.save_verification, *args, **kwargs)
+
+    async def get_artifact_with_versions(self, artifact_id: int):
+        return await self._run(crud.get_artifact_with_versions, artifact_id)
+
+    async def get_verdict(self, value: str):
+        return await self._run(crud.get_verdict, value)
+
+    async def get_job(self, job_id: int):
+        return await self._run(crud.get_job, job_id)
+
+    async def list_evidences(self, artifact_id: int, limit: int, before_id: int = None):
+        return await self._run(crud.list_evidences, artifact_id, limit, before_id)
+
+    async def list_scores(self, artifact_id: int, limit: int, before_id: int = None):
+        return await self._run(crud.list_scores, artifact_id, limit, before_id)
+
+    async def create_user_report(self, *args, **kwargs):
+        rep = await self._run(crud.create_user_report, *args, **kwargs)
+        return {"id": rep.id, "status": rep.status}
+
+
+class AsyncRepository:
+
+    def __init__(self):
+        from app import crud_async
+        from app.db.async_session import get_database
+
+        self.crud = crud_async
+        self.database = get_database()
+
+    async def connect(self):
+        await self.database.connect()
+
+    async def disconnect(self):
+        await self.database.disconnect()
+
+    async def _run(self, fn, *args, **kwargs):
+        with db_timer(fn.__name__):
+            return await fn(self.database, *args, **kwargs)
+
+    async def save_verification(self, *args, **kwargs):
+        return await self._run(self.crud.save_verification, *args, **kwargs)
+
+    async def get_artifact_with_versions(self, artifact_id: int):
+        return await self._run(self.crud.get_artifact_with_versions, artifact_id)
+
+    async def get_verdict(self, value: str):
+        return await self._run(self.crud.get_verdict, value)
+
+    async def get_job(self, job_id: int):
+        return await self._run(self.crud.get_job, job_id)
+
+    async def list_evidences(self, artifact_id: int, limit: int, before_id: int = None):
+        return await self._run(self.crud.list_evidences, artifact_id, limit, before_id)
+
+    async def list_scores(self, artifact_id: int, limit: int, before_id: int = None):
+        return await self._run(self.crud.list_scores, artifact_id, limit, before_id)
+
+    async def create_user_report(self, *args, **kwargs):
+        return await self._run(self.crud.create_user_report, *args, **kwargs)
+
+
+repo = AsyncRepository() if settings.DB_ASYNC else ThreadpoolRepository()
@@ -0,0 +1,37 @@
+"""
+Alembic revision checks and upgrades run from the app (warm-up), using
+the migrations/ scripts next to alembic.ini.
+"""
+import os
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(ROOT, "alembic.ini")
+
+
+def alembic_config() -> Config:
+    cfg = Config(ALEMBIC_INI, attributes={"configure_logger": False})
+    # resolve against the repo, not the working directory
+    cfg.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    return cfg
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(engine) -> Optional[str]:
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def upgrade(engine, revision: str = "head"):
+    cfg = alembic_config()
+    with engine.begin() as conn:
+        cfg.attributes["connection"] = conn
+        command.upgrade(cfg, revision)
@@ -1,8 +1,18 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware   # ⭐ CORS import
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.api import routes
-from app.db import session as db_session
 from app.core.config import settings
+from app.core.http import http_clients
+from app.core import metrics
+from app.adapters.openphish_adapter import openphish_feed
+from app.core.blocklist import phishing_blocklist
+from app.services.verdict_cache import close_redis
+from app.services.warmup import WarmUp, warmup
+from app.db.repository import repo
+from app.services.vt_jobs import vt_job_worker
 import logging
 
 app = FastAPI(title="TrustCheck-India API")
@@ -19,14 +29,67 @@ app.add_middleware(
 # Include routes
 app.include_router(routes.router)
 
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if not settings.METRICS_ENABLED:
+        return await call_next(request)
+
+    started = time.perf_counter()
+    db_time = metrics.start_request_db_timer()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # route template, not the raw path, to keep label cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.HTTP_REQUESTS.inc(request.method, route, str(status))
+        metrics.HTTP_SECONDS.observe(time.perf_counter() - started, request.method, route)
+        metrics.HTTP_DB_SECONDS.observe(db_time[0], request.method, route)
+
+
+def start_background_workers(done: WarmUp):
+    # the refresher's first fetch is a conditional GET after the warm-up's
+    openphish_feed.start()
+    if not done.ready:
+        logging.error("Warm-up incomplete; VT job worker not started: %s", done.report()["components"])
+    elif settings.VT_URL_SCAN_ASYNC and settings.VT_JOB_WORKER_ENABLED:
+        vt_job_worker.start()
+
 @app.on_event("startup")
-def startup():
-    # create tables if not present (simple approach)
-    from app.db.session import engine, Base
-    from app import models
-    Base.metadata.create_all(bind=engine)
-    logging.info("Database tables ensured.")
+async def startup():
+    http_clients.startup()
+    # datasets, feeds, schema check and pools load in the background; /ready tracks them
+    warmup.start(on_done=start_background_workers)
+
+@app.on_event("startup")
+async def connect_database():
+    await repo.connect()
+
+@app.on_event("shutdown")
+async def disconnect_database():
+    await repo.disconnect()
+
+@app.on_event("shutdown")
+def shutdown():
+    vt_job_worker.stop()
+    openphish_feed.stop()
+    http_clients.close()
+    close_redis()
 
 @app.get("/health")
 def health():
     return {"status": "ok", "env": settings.APP_ENV}
+
+@app.get("/ready")
+def ready():
+    report = warmup.report()
+    # feed freshness; verdict evidence leaves it out so payloads dedup
+    report["feeds"] = {"openphish": openphish_feed.status(), "phishing_blocklist": phishing_blocklist.status()}
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
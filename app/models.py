@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Text
+from sqlalchemy import (
+    Boolean, Column, Integer, String, DateTime, JSON, ForeignKey, Text, Index, LargeBinary, UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func
 from app.db.session import Base
 
 class Artifact(Base):
@@ -13,10 +15,39 @@ class Artifact(Base):
     # FIX: "metadata" is a reserved SQLAlchemy keyword → renamed
     artifact_metadata = Column(JSON, default={})
 
+    # Current verdict, written together with each new RiskScore so readers
+    # don't have to go through the score history
+    latest_score = Column(Integer)
+    latest_label = Column(String)
+    last_verified_at = Column(DateTime(timezone=True))
+    # Bumped when stored history is edited in place (scan job results),
+    # which new ids alone don't reveal to ETags
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
     evidences = relationship("Evidence", back_populates="artifact", cascade="all, delete-orphan")
+    payloads = relationship("EvidencePayload", cascade="all, delete-orphan")
     scores = relationship("RiskScore", back_populates="artifact", cascade="all, delete-orphan")
 
 
+class EvidencePayload(Base):
+    """
+    Adapter result stored once per artifact, source and content (see
+    app/core/payloads.py); evidences of repeat verifications point at it.
+    """
+    __tablename__ = "evidence_payloads"
+    id = Column(Integer, primary_key=True, index=True)
+    artifact_id = Column(Integer, ForeignKey("artifacts.id", ondelete="CASCADE"), nullable=False)
+    source = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=False)   # SHA-256 of the uncompressed JSON
+    compression = Column(String)                        # None or "zlib"
+    body = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("artifact_id", "source", "content_hash", name="uq_evidence_payloads_content"),
+    )
+
+
 class Evidence(Base):
     __tablename__ = "evidences"
     id = Column(Integer, primary_key=True, index=True)
@@ -24,11 +55,15 @@ class Evidence(Base):
     source = Column(String)
     title = Column(String)
     url = Column(String)
-    summary = Column(Text)
+    payload_id = Column(Integer, ForeignKey("evidence_payloads.id", ondelete="CASCADE"))
     captured_at = Column(DateTime(timezone=True), server_default=func.now())
 
     artifact = relationship("Artifact", back_populates="evidences")
 
+    __table_args__ = (
+        Index("ix_evidences_artifact_id_captured_at", "artifact_id", "captured_at"),
+    )
+
 
 class RiskScore(Base):
     __tablename__ = "risk_scores"
@@ -41,6 +76,10 @@ class RiskScore(Base):
 
     artifact = relationship("Artifact", back_populates="scores")
 
+    __table_args__ = (
+        Index("ix_risk_scores_artifact_id_computed_at", "artifact_id", "computed_at"),
+    )
+
 
 class UserReport(Base):
     __tablename__ = "user_reports"
@@ -51,3 +90,63 @@ class UserReport(Base):
     contact = Column(String, nullable=True)
     status = Column(String, default="pending")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ScanJob(Base):
+    """
+    Background upstream scan (e.g. a VirusTotal URL analysis) whose result
+    is written back into the evidence / score of the verification that
+    started it.
+    """
+    __tablename__ = "scan_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, index=True)              # virustotal_url
+    status = Column(String, index=True, default="pending")   # pending / completed / failed
+    target = Column(String)
+    external_id = Column(String)                   # upstream analysis id
+    artifact_id = Column(Integer, ForeignKey("artifacts.id", ondelete="CASCADE"), index=True)
+    evidence_id = Column(Integer, ForeignKey("evidences.id", ondelete="CASCADE"))
+    score_id = Column(Integer, ForeignKey("risk_scores.id", ondelete="CASCADE"))
+    attempts = Column(Integer, default=0)
+    next_poll_at = Column(DateTime(timezone=True), index=True)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class NewsArticle(Base):
+    """
+    Article fetched from NewsAPI, kept so repeat news lookups can be
+    answered locally (see app/services/news_store.py).
+    """
+    __tablename__ = "news_articles"
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, nullable=False)
+    title = Column(Text)
+    description = Column(Text)
+    source_name = Column(String)
+    published_at = Column(DateTime(timezone=True), index=True)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class NewsTerm(Base):
+    """
+    Inverted index: one row per (token, article) for tokens of the
+    article's title and description.
+    """
+    __tablename__ = "news_terms"
+    term = Column(String, primary_key=True)
+    article_id = Column(Integer, ForeignKey("news_articles.id", ondelete="CASCADE"), primary_key=True)
+
+
+class NewsFetch(Base):
+    """
+    When NewsAPI was last queried for a set of entity tokens
+    (terms: sorted tokens joined by spaces), and whether every matching
+    article was stored (NewsAPI results are capped at NEWS_MAX_PAGES).
+    """
+    __tablename__ = "news_fetches"
+    terms = Column(String, primary_key=True)
+    last_fetched_at = Column(DateTime(timezone=True), nullable=False)
+    complete = Column(Boolean, nullable=False, default=False, server_default=false())
@@ -10,7 +10,7 @@ class EvidenceOut(BaseModel):
     source: str
     title: Optional[str]
     url: Optional[HttpUrl]
-    summary: Optional[str]
+    summary: Optional[Any]      # adapter result, as stored
     captured_at: datetime
 
     class Config:
@@ -60,13 +60,28 @@ class VerifyRequest(BaseModel):
     query: str
     type: Optional[str] = "auto"
     context_text: Optional[str] = None
+    refresh: Optional[bool] = False   # bypass the verdict cache
+
+
+# --------------------- Batch Verify Request ---------------------
+
+class BatchVerifyRequest(BaseModel):
+    queries: List[VerifyRequest]
+    refresh: Optional[bool] = False
 
 
 # --------------------- Verify Response ---------------------
 
+class CacheInfo(BaseModel):
+    hit: bool
+    age_seconds: int = 0
+    coalesced: bool = False     # served from a concurrent identical verification
+
+
 class VerifyResponse(BaseModel):
     label: str
     score: int
     reasons: List[Reason]
     evidences: List[EvidenceOut]
     artifact: ArtifactOut
+    cache: Optional[CacheInfo]
@@ -0,0 +1,186 @@
+import datetime
+import itertools
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app import models
+from app.core.config import settings
+from app.db.session import engine
+
+articles_t = models.NewsArticle.__table__
+terms_t = models.NewsTerm.__table__
+fetches_t = models.NewsFetch.__table__
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Entities with more tokens than this only reuse fetches of the exact set
+MAX_SUBSET_TOKENS = 6
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Distinct lowercase alphanumeric tokens, in order of first appearance.
+    Single characters are kept: "acme-1.com" and "acme-2.com" must not
+    share a fetch.
+    """
+    return list(dict.fromkeys(_TOKEN.findall((text or "").lower())))
+
+
+def terms_key(tokens: Iterable[str]) -> str:
+    return " ".join(sorted(set(tokens)))
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _aware(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    # SQLite hands back naive datetimes
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def _parse_published(value: Optional[str]) -> Optional[datetime.datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _insert(table):
+    """
+    Dialect INSERT with ON CONFLICT support (Postgres and SQLite).
+    """
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"news store needs ON CONFLICT support ({engine.dialect.name})")
+    return insert(table)
+
+
+def fetch_state(tokens: List[str]) -> Tuple[Optional[datetime.datetime], bool, bool]:
+    """
+    (last fetch of exactly these tokens, whether it was complete, covered).
+    covered is True when NewsAPI was queried within NEWS_STORE_FRESH_SECONDS
+    for these tokens, or completely for a subset of them: NewsAPI ANDs
+    query words, so articles about "acme finance" are among those fetched
+    for "acme" - unless "acme" had more results than were stored.
+    """
+    exact = terms_key(tokens)
+    keys = {exact}
+    if len(tokens) <= MAX_SUBSET_TOKENS:
+        for n in range(1, len(tokens)):
+            keys.update(terms_key(c) for c in itertools.combinations(tokens, n))
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(fetches_t.c.terms, fetches_t.c.last_fetched_at, fetches_t.c.complete)
+            .where(fetches_t.c.terms.in_(keys))
+        ).all()
+
+    fresh_after = _utcnow() - datetime.timedelta(seconds=settings.NEWS_STORE_FRESH_SECONDS)
+    last_exact = None
+    exact_complete = covered = False
+    for key, fetched_at, complete in rows:
+        fetched_at = _aware(fetched_at)
+        if key == exact:
+            last_exact, exact_complete = fetched_at, bool(complete)
+        if fetched_at >= fresh_after and (key == exact or complete):
+            covered = True
+    return last_exact, exact_complete, covered
+
+
+def add_articles(articles: List[dict]) -> int:
+    """
+    Stores articles not seen before (by URL) and indexes their tokens.
+    Returns how many were new.
+    """
+    by_url = {}
+    for art in articles:
+        url = art.get("url")
+        if url:
+            by_url.setdefault(url, art)
+    if not by_url:
+        return 0
+
+    now = _utcnow()
+    with engine.begin() as conn:
+        known = set(conn.execute(select(articles_t.c.url).where(articles_t.c.url.in_(list(by_url)))).scalars())
+        new = [url for url in by_url if url not in known]
+        if not new:
+            return 0
+
+        conn.execute(_insert(articles_t).on_conflict_do_nothing(index_elements=[articles_t.c.url]), [
+            {
+                "url": url,
+                "title": by_url[url].get("title"),
+                "description": by_url[url].get("description"),
+                "source_name": (by_url[url].get("source") or {}).get("name"),
+                "published_at": _parse_published(by_url[url].get("publishedAt")),
+                "fetched_at": now,
+            }
+            for url in new
+        ])
+        ids = conn.execute(select(articles_t.c.id, articles_t.c.url).where(articles_t.c.url.in_(new))).all()
+
+        postings = [
+            {"term": term, "article_id": article_id}
+            for article_id, url in ids
+            for term in tokenize(f"{by_url[url].get('title') or ''} {by_url[url].get('description') or ''}")
+        ]
+        if postings:
+            conn.execute(_insert(terms_t).on_conflict_do_nothing(
+                index_elements=[terms_t.c.term, terms_t.c.article_id]
+            ), postings)
+    return len(new)
+
+
+def mark_fetched(tokens: List[str], fetched_at: datetime.datetime, complete: bool):
+    stmt = _insert(fetches_t).values(terms=terms_key(tokens), last_fetched_at=fetched_at, complete=complete)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[fetches_t.c.terms],
+        set_={"last_fetched_at": fetched_at, "complete": complete},
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt)
+
+
+def articles_for(tokens: List[str], limit: int = None) -> List[dict]:
+    """
+    Stored articles containing every token, newest first, in NewsAPI's
+    article shape.
+    """
+    if not tokens:
+        return []
+    matching = (
+        select(terms_t.c.article_id)
+        .where(terms_t.c.term.in_(tokens))
+        .group_by(terms_t.c.article_id)
+        .having(func.count(terms_t.c.term) == len(set(tokens)))
+        .subquery()
+    )
+    q = (
+        select(articles_t)
+        .join(matching, matching.c.article_id == articles_t.c.id)
+        .order_by(articles_t.c.published_at.desc(), articles_t.c.id.desc())
+        .limit(limit or settings.NEWS_STORE_MAX_ARTICLES)
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(q).mappings().all()
+    return [
+        {
+            "title": r["title"],
+            "description": r["description"],
+            "url": r["url"],
+            "source": {"name": r["source_name"]},
+            "publishedAt": _aware(r["published_at"]).isoformat() if r["published_at"] else None,
+        }
+        for r in rows
+    ]
@@ -1,12 +1,23 @@
+import asyncio
+import contextvars
 import re
-import socket
-from urllib.parse import urlparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.adapter_cache import served_from_cache
+from app.core.config import settings
+from app.core.metrics import ADAPTER_SECONDS
+from app.core.domains import canonical_domain, canonical_site, canonical_url, normalize_host
+from app.core.resolver import first_resolving
+from app.core.quota import SKIPPED, quota_deadline
+from app.services.risk_engine import PENDING, engine, extract_signals
 
 from app.adapters.mca_adapter import search_mca_company
 from app.adapters.rbi_adapter import check_rbi_nbfc
 from app.adapters.whois_adapter import domain_whois_info
 from app.adapters.phishing_adapter import check_phishing_blacklist
-from app.adapters.virustotal_adapter import vt_check_url, vt_check_domain
+from app.adapters.virustotal_adapter import vt_check_url, vt_submit_url, vt_check_domain
 from app.adapters.news_adapter import search_news
 from app.adapters.openphish_adapter import check_openphish
 
@@ -16,6 +27,14 @@ STRICT_FINANCIAL_KEYWORDS = [
     "asset", "fund", "mutual", "nidhi"
 ]
 
+# Trailing words dropped when guessing a company's domain ("Acme Pvt Ltd" -> acme)
+COMPANY_SUFFIX_WORDS = {
+    "private", "pvt", "limited", "ltd", "llp", "inc", "incorporated",
+    "corp", "corporation", "company", "co",
+}
+
+TIMED_OUT = "timed_out"
+
 
 def detect_type(query: str) -> str:
     q = query.strip().lower()
@@ -35,11 +54,25 @@ def detect_type(query: str) -> str:
     return "company"
 
 
-def _normalize_domain(value: str) -> str:
-    if value.startswith("http://") or value.startswith("https://"):
-        parsed = urlparse(value)
-        return parsed.hostname or value
-    return value
+def canonical_artifact(query: str, qtype: str = "auto") -> Tuple[str, str]:
+    """
+    (type, canonical value) keying artifacts and caches. Domains collapse
+    to their host without "www.", so "WWW.Example.com." is "example.com"
+    but "login.example.com/path" stays "login.example.com": the feed
+    checks are per host, so sibling hosts can't share a verdict. URLs keep
+    their path (VT scans the full URL) with the host normalized.
+    """
+    q = query.strip()
+    if qtype == "auto":
+        qtype = detect_type(q)
+
+    if qtype == "url":
+        return qtype, canonical_url(q)
+
+    if qtype == "domain":
+        return qtype, canonical_site(q)
+
+    return qtype, " ".join(q.lower().split())
 
 
 def _init_response(artifact_type: str, artifact_value: str):
@@ -56,229 +89,276 @@ def _init_response(artifact_type: str, artifact_value: str):
     }
 
 
-def _add_reason(reasons, message: str, points: int):
-    reasons.append({"message": message, "points": points})
-    return points
+def vt_url_reason(report: dict) -> dict:
+    """
+    The scoring reason for a VirusTotal URL report on its own. Shared with
+    the background job that scores pending scans.
+    """
+    vec, details = extract_signals({"virustotal_url": report})
+    return engine.evaluate(vec, "web", details)["reasons"][0]
+
+
+def domain_candidates(company: str) -> list:
+    """
+    Likely domains for a company name, best guess first: the name without
+    legal suffixes before the full name, joined before hyphenated, and each
+    under every DNS_GUESS_TLDS entry in order.
+    """
+    words = re.findall(r"[a-z0-9]+", company.lower())
+    stripped = list(words)
+    while stripped and stripped[-1] in COMPANY_SUFFIX_WORDS:
+        stripped.pop()
+
+    labels = []
+    for parts in (stripped, words):
+        for label in ("".join(parts), "-".join(parts)):
+            if label and label not in labels:
+                labels.append(label)
+
+    candidates = [label + tld for label in labels for tld in settings.DNS_GUESS_TLDS]
+    return candidates[:settings.DNS_GUESS_MAX_CANDIDATES]
+
+
+async def guess_domain(company: str) -> Optional[str]:
+    return await first_resolving(domain_candidates(company), settings.DNS_GUESS_BUDGET_SECONDS)
+
 
+# ======================================================
+# CONCURRENT SOURCE FAN-OUT
+# ======================================================
 
-def guess_domain(company: str):
-    candidate = company.lower().replace(" ", "") + ".com"
+# Adapters are blocking (httpx.get), so they run on a dedicated pool
+# instead of the event loop. A source that misses its deadline keeps its
+# thread until the adapter's own timeout fires, but we stop waiting on it.
+_adapter_pool = ThreadPoolExecutor(
+    max_workers=settings.ADAPTER_MAX_WORKERS,
+    thread_name_prefix="adapter",
+)
+
+
+def _source_timeout(source: str) -> float:
+    return settings.ADAPTER_TIMEOUTS.get(source, settings.ADAPTER_TIMEOUT_SECONDS)
+
+
+def _timed_out(source: str, timeout: float) -> dict:
+    return {
+        "status": TIMED_OUT,
+        "error": f"{source} timed out after {timeout:.1f}s",
+    }
+
+
+def _outcome(result: dict, ctx: contextvars.Context) -> str:
+    if not isinstance(result, dict):
+        return "ok"
+    if result.get("status") == TIMED_OUT:
+        return "timeout"
+    if result.get("status") == SKIPPED:
+        return "skipped"
+    if ctx.get(served_from_cache):
+        return "cached"
+    return "error" if result.get("error") else "ok"
+
+
+async def _call_source(source: str, fn: Callable, *args) -> dict:
+    timeout = _source_timeout(source)
+    loop = asyncio.get_running_loop()
+    # run_in_executor doesn't carry context over; the adapter's quota check
+    # needs the caller's priority (interactive vs batch)
+    ctx = contextvars.copy_context()
+    # queuing for quota may use at most half the source's budget, leaving
+    # the rest for the upstream request itself
+    budget = min(timeout, settings.VERIFY_DEADLINE_SECONDS)
+    ctx.run(quota_deadline.set, time.monotonic() + budget / 2)
+    started = time.perf_counter()
     try:
-        socket.gethostbyname(candidate)
-        return candidate
-    except:
-        return None
+        result = await asyncio.wait_for(
+            loop.run_in_executor(_adapter_pool, ctx.run, fn, *args), timeout
+        )
+    except asyncio.TimeoutError:
+        result = _timed_out(source, timeout)
+    except asyncio.CancelledError:
+        # the verification deadline hit first (gather_sources)
+        if settings.METRICS_ENABLED:
+            ADAPTER_SECONDS.observe(time.perf_counter() - started, source, "timeout")
+        raise
+    except Exception as e:
+        result = {"error": str(e)}
+
+    if settings.METRICS_ENABLED:
+        ADAPTER_SECONDS.observe(time.perf_counter() - started, source, _outcome(result, ctx))
+    return result
+
+
+def _start_source(source: str, fn: Callable, args: tuple, shared: Optional[dict]) -> asyncio.Future:
+    if shared is None:
+        return asyncio.ensure_future(_call_source(source, fn, *args))
+
+    # Batch callers pass one dict for the whole batch so items that hit the
+    # same (source, argument) - e.g. two URLs on one domain - share one call.
+    key = (source, args)
+    task = shared.get(key)
+    if task is None:
+        task = shared[key] = asyncio.ensure_future(_call_source(source, fn, *args))
+    return task
+
+
+async def gather_sources(calls: Dict[str, Tuple], shared: Optional[dict] = None) -> Dict[str, dict]:
+    """
+    Starts every source at once and waits at most VERIFY_DEADLINE_SECONDS.
+    calls maps source name -> (adapter_fn, *args).
+    Sources still running at the deadline come back as "timed_out".
+    """
+    tasks = {
+        source: _start_source(source, fn, tuple(args), shared)
+        for source, (fn, *args) in calls.items()
+    }
+    if not tasks:
+        return {}
+
+    deadline = settings.VERIFY_DEADLINE_SECONDS
+    done, pending = await asyncio.wait(set(tasks.values()), timeout=deadline)
+    if shared is None:
+        # shared tasks may still be awaited by other items; each one is
+        # bounded by its own per-source timeout anyway
+        for task in pending:
+            task.cancel()
+
+    return {
+        source: task.result() if task in done else _timed_out(source, deadline)
+        for source, task in tasks.items()
+    }
+
+
+def _evidence(source: str, data: dict) -> dict:
+    ev = {"source": source, "data": data}
+    if data.get("status") in (TIMED_OUT, SKIPPED):
+        ev["status"] = data["status"]
+    return ev
+
+
+def _finish(response: dict, results: Dict[str, dict], profile: str) -> dict:
+    vec, details = extract_signals(results)
+    response["scoring"] = engine.evaluate(vec, profile, details)
+    return response
 
 
 def run_verification(query: str, qtype: str = "auto") -> dict:
+    """
+    Sync entry point for callers running outside an event loop
+    (e.g. sync FastAPI handlers, which run in a worker thread).
+    """
+    return asyncio.run(run_verification_async(query, qtype))
+
+
+async def run_verification_async(query: str, qtype: str = "auto", shared: Optional[dict] = None) -> dict:
     q = query.strip()
 
     if not q:
         return {"error": "Empty query"}
 
-    if qtype == "auto":
-        qtype = detect_type(q)
-
-    response = _init_response(qtype, q)
+    qtype, value = canonical_artifact(q, qtype)
+    response = _init_response(qtype, value)
     evidences = response["evidences"]
-    reasons = []
-    total_score = 0
 
     # ======================================================
     # URL / DOMAIN ANALYSIS
     # ======================================================
     if qtype in ("url", "domain"):
-        domain = _normalize_domain(q)
+        # domain-level sources share the registrable domain (and its
+        # cache entries); feed lookups also need the exact host
+        domain = canonical_domain(q)
+        host = normalize_host(q) or domain
+
+        calls = {
+            "news_api": (search_news, domain),
+            "whois": (domain_whois_info, domain),
+            "phishing": (check_phishing_blacklist, value if qtype == "url" else host),
+            "openphish": (check_openphish, host),
+            "virustotal_domain": (vt_check_domain, domain),
+        }
+        if qtype == "url":
+            vt_url_fn = vt_submit_url if settings.VT_URL_SCAN_ASYNC else vt_check_url
+            calls["virustotal_url"] = (vt_url_fn, value)
+
+        results = await gather_sources(calls, shared)
+        results["whois"] = results["whois"] or {}
+        results["phishing"] = results["phishing"] or {}
 
         # ----------------------------------------------------------
         # VIRUSTOTAL URL SCAN
         # ----------------------------------------------------------
         if qtype == "url":
-            vt_url_report = vt_check_url(q)
-            evidences.append({"source": "virustotal_url", "data": vt_url_report})
-
-            if vt_url_report.get("malicious", 0) > 0:
-                total_score += _add_reason(
-                    reasons,
-                    f"URL flagged malicious by {vt_url_report['malicious']} VT engines.",
-                    60,
-                )
-            elif vt_url_report.get("suspicious", 0) > 0:
-                total_score += _add_reason(
-                    reasons,
-                    f"URL flagged suspicious by {vt_url_report['suspicious']} VT engines.",
-                    30,
-                )
-            else:
-                total_score += _add_reason(
-                    reasons, "VirusTotal URL scan clean.", 0
-                )
+            vt_url_report = results["virustotal_url"]
+            ev = _evidence("virustotal_url", vt_url_report)
 
-        # ----------------------------------------------------------
-        # NEWS API
-        # ----------------------------------------------------------
-        news = search_news(domain)
-        evidences.append({"source": "news_api", "data": news})
-
-        if news.get("scam_related", 0) > 0:
-            total_score += _add_reason(
-                reasons,
-                f"News reports indicate scam/fraud ({news['scam_related']} articles).",
-                50
-            )
-        else:
-            total_score += _add_reason(reasons, "No scam news detected.", 0)
+            if vt_url_report.get("status") == PENDING:
+                # scored by the background job once the analysis completes
+                ev["status"] = PENDING
+                ev["job"] = {
+                    "kind": "virustotal_url",
+                    "target": value,
+                    "external_id": vt_url_report["analysis_id"],
+                }
+
+            evidences.append(ev)
+
+        evidences.append(_evidence("news_api", results["news_api"]))
 
         # ----------------------------------------------------------
         # WHOIS LOOKUP
         # ----------------------------------------------------------
-        whois = domain_whois_info(domain) or {}
-        raw_whois = whois.get("raw", "") or ""
-        age_days = whois.get("age_days")
-        registrar = whois.get("registrar")
-
+        whois = results["whois"]
         clean_whois = {
             "domain": whois.get("domain") or domain,
-            "registrar": registrar,
+            "registrar": whois.get("registrar"),
             "creation_date": whois.get("creation_date"),
-            "age_days": age_days,
+            "age_days": whois.get("age_days"),
+            "error": whois.get("error"),     # scored, so kept for scripts/rescore.py
         }
-        evidences.append({"source": "whois", "data": clean_whois})
-
-        if age_days is None:
-            total_score += _add_reason(reasons, "Cannot determine domain age.", 25)
-        else:
-            if age_days < 30:
-                total_score += _add_reason(reasons, "Domain <30 days old.", 40)
-            elif age_days < 90:
-                total_score += _add_reason(reasons, "Domain <3 months old.", 30)
-            elif age_days < 365:
-                total_score += _add_reason(reasons, "Domain <1 year old.", 20)
-            elif age_days < 365 * 5:
-                total_score += _add_reason(reasons, "Domain <5 years old.", 10)
-            else:
-                total_score += _add_reason(reasons, "Domain >5 years old (safe).", 0)
-
-        if not registrar:
-            total_score += _add_reason(reasons, "Registrar missing.", 10)
-
-        if whois.get("error"):
-            total_score += _add_reason(reasons, f"WHOIS error: {whois['error']}", 15)
-
-        # ----------------------------------------------------------
-        # PHISHING BLACKLIST
-        # ----------------------------------------------------------
-        ph = check_phishing_blacklist(domain) or {}
-        evidences.append({"source": "phishing", "data": ph})
+        if whois.get("status") in (TIMED_OUT, SKIPPED):
+            clean_whois["status"] = whois["status"]
+        evidences.append(_evidence("whois", clean_whois))
 
-        if ph.get("found") or ph.get("blacklist_hit"):
-            total_score += _add_reason(reasons, "Phishing blacklist match!", 70)
-        else:
-            total_score += _add_reason(reasons, "No phishing blacklist hits.", 0)
+        evidences.append(_evidence("phishing", results["phishing"]))
+        evidences.append(_evidence("openphish", results["openphish"]))
+        evidences.append(_evidence("virustotal_domain", results["virustotal_domain"]))
 
-        # ----------------------------------------------------------
-        # OPENPHISH FEED
-        # ----------------------------------------------------------
-        op = check_openphish(domain)
-        evidences.append({"source": "openphish", "data": op})
-
-        if op.get("found"):
-            total_score += _add_reason(
-                reasons,
-                "Domain appears in OpenPhish feed (confirmed phishing).",
-                80
-            )
-        else:
-            total_score += _add_reason(reasons, "Not found in OpenPhish.", 0)
-
-        # ----------------------------------------------------------
-        # VIRUSTOTAL DOMAIN REPUTATION
-        # ----------------------------------------------------------
-        vt = vt_check_domain(domain)
-        evidences.append({"source": "virustotal_domain", "data": vt})
-
-        if vt.get("malicious", 0) > 0:
-            total_score += _add_reason(
-                reasons,
-                f"Domain flagged malicious by {vt['malicious']} VT engines.",
-                60
-            )
-        elif vt.get("suspicious", 0) > 0:
-            total_score += _add_reason(
-                reasons,
-                f"Domain suspicious according to {vt['suspicious']} VT engines.",
-                30
-            )
-        else:
-            total_score += _add_reason(reasons, "VirusTotal clean.", 0)
-
-        # Finish domain response
-        total_score = max(0, min(100, total_score))
-        response["scoring"]["score"] = total_score
-        response["scoring"]["label"] = risk_label(total_score)
-        response["scoring"]["reasons"] = [
-            {"rule_id": idx, "points": r["points"], "message": r["message"]}
-            for idx, r in enumerate(reasons)
-        ]
-        return response
+        return _finish(response, results, "web")
 
     # ======================================================
     # COMPANY ANALYSIS
     # ======================================================
     if qtype == "company":
 
-        guessed = guess_domain(q)
+        guessed = await guess_domain(q)
         if guessed:
-            return run_verification(guessed, "domain")
+            return await run_verification_async(guessed, "domain", shared)
 
         is_fin = any(i in q.lower() for i in STRICT_FINANCIAL_KEYWORDS)
 
-        mca = search_mca_company(q) or {}
-        evidences.append({"source": "mca", "data": mca})
+        calls = {
+            "mca": (search_mca_company, q),
+            "news_api": (search_news, q),
+        }
+        if is_fin:
+            calls["rbi"] = (check_rbi_nbfc, q)
 
-        if mca.get("found"):
-            total_score += _add_reason(reasons, "Company found in MCA.", -10)
-        else:
-            total_score += _add_reason(reasons, "Company not found in MCA.", 30)
+        results = await gather_sources(calls, shared)
+        results["mca"] = results["mca"] or {}
+        evidences.append(_evidence("mca", results["mca"]))
 
         if is_fin:
-            rbi = check_rbi_nbfc(q) or {}
-            evidences.append({"source": "rbi", "data": rbi})
-
-            if rbi.get("authorized"):
-                total_score += _add_reason(reasons, "Listed in RBI registry.", -15)
-            else:
-                total_score += _add_reason(reasons, "Not in RBI registry.", 40)
-
-        news = search_news(q)
-        evidences.append({"source": "news_api", "data": news})
-
-        if news.get("scam_related", 0) > 0:
-            total_score += _add_reason(reasons, "Scam-related news detected.", 50)
-        else:
-            total_score += _add_reason(reasons, "No scam-related news.", 0)
-
-        total_score = max(0, min(100, total_score))
-        response["scoring"]["score"] = total_score
-        response["scoring"]["label"] = risk_label(total_score)
-        response["scoring"]["reasons"] = [
-            {"rule_id": idx, "points": r["points"], "message": r["message"]}
-            for idx, r in enumerate(reasons)
-        ]
-        return response
+            results["rbi"] = results["rbi"] or {}
+            evidences.append(_evidence("rbi", results["rbi"]))
+
+        evidences.append(_evidence("news_api", results["news_api"]))
+
+        return _finish(response, results, "company")
 
     # For unsupported types, just return base response
     response["scoring"]["score"] = 0
     response["scoring"]["label"] = "low"
     response["scoring"]["reasons"] = [
-        {"rule_id": 0, "points": 0, "message": f"Type '{qtype}' not supported"}
+        {"rule_id": "type_not_supported", "points": 0, "message": f"Type '{qtype}' not supported"}
     ]
     return response
-
-
-def risk_label(score: int) -> str:
-    if score >= 75:
-        return "high"
-    if score >= 40:
-        return "medium"
-    return "low"
@@ -1,97 +1,386 @@
-def compute_risk_score(signals: dict):
+import operator
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.quota import SKIPPED
+
+PENDING = "pending"
+FAILED = "failed"
+
+VT_URL_PENDING_MESSAGE = "VirusTotal URL scan pending."
+
+MISSING = float("nan")
+
+# Order is the vector layout (also the columns of score_batch matrices);
+# append new signals at the end so vectors built by older code keep
+# their meaning.
+SIGNALS = (
+    "has_virustotal_url", "vt_url_pending", "vt_url_skipped", "vt_url_malicious", "vt_url_suspicious",
+    "has_news_api", "news_skipped", "news_scam_related",
+    "has_whois", "whois_skipped", "domain_age_days", "registrar_present", "whois_error",
+    "has_phishing", "phishing_hit",
+    "has_openphish", "openphish_hit",
+    "has_virustotal_domain", "vt_domain_skipped", "vt_domain_malicious", "vt_domain_suspicious",
+    "has_mca", "mca_found",
+    "has_rbi", "rbi_authorized",
+)
+SIGNAL_INDEX = {name: i for i, name in enumerate(SIGNALS)}
+
+
+def _source_flags() -> Dict[str, str]:
+    # each source's signals follow its has_* flag in SIGNALS
+    flags, current = {}, None
+    for name in SIGNALS:
+        if name.startswith("has_"):
+            current = name
+        flags[name] = current
+    return flags
+
+
+SOURCE_FLAGS = _source_flags()
+
+# Message placeholders that are not signals, for vectors scored without
+# the adapter results at hand (compute_risk_score, rescoring)
+DETAIL_DEFAULTS = {
+    "vt_url_skipped_reason": "quota",
+    "news_skipped_reason": "quota",
+    "whois_skipped_reason": "quota",
+    "vt_domain_skipped_reason": "quota",
+    "whois_error_text": "unknown",
+}
+
+# Label thresholds, highest first
+LABELS = ((75, "high"), (40, "medium"), (0, "low"))
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    when: conditions that must all hold, as (signal, op, value); op is one
+    of < <= > >= == or "missing". Comparisons on a missing (NaN) signal are
+    false. An empty when always matches (the "else" of a group).
+    message may use {signal} and detail placeholders.
+    """
+    id: str
+    points: int
+    message: str
+    when: Tuple[Tuple[str, str, Optional[float]], ...] = ()
+
+
+@dataclass(frozen=True)
+class RuleGroup:
+    id: str
+    profiles: Tuple[str, ...]    # "web" (url/domain) and/or "company"
+    requires: str                # signal that must be 1 for the group to fire
+    rules: Tuple[Rule, ...]      # first match wins
+
+
+# The scoring rules. Each group is an if/elif/else over the signal vector
+# and fires only if its source was checked. Rule ids are stored with every
+# RiskScore reason: rename one only together with a data migration.
+RULES: Tuple[RuleGroup, ...] = (
+    RuleGroup("vt_url", ("web",), "has_virustotal_url", (
+        Rule("vt_url_pending", 0, VT_URL_PENDING_MESSAGE, (("vt_url_pending", "==", 1),)),
+        Rule("vt_url_skipped", 0, "VirusTotal URL scan skipped: {vt_url_skipped_reason}.", (("vt_url_skipped", "==", 1),)),
+        Rule("vt_url_malicious", 60, "URL flagged malicious by {vt_url_malicious} VT engines.", (("vt_url_malicious", ">", 0),)),
+        Rule("vt_url_suspicious", 30, "URL flagged suspicious by {vt_url_suspicious} VT engines.", (("vt_url_suspicious", ">", 0),)),
+        Rule("vt_url_clean", 0, "VirusTotal URL scan clean."),
+    )),
+    RuleGroup("news", ("web",), "has_news_api", (
+        Rule("news_skipped", 0, "News search skipped: {news_skipped_reason}.", (("news_skipped", "==", 1),)),
+        Rule("news_scam", 50, "News reports indicate scam/fraud ({news_scam_related} articles).", (("news_scam_related", ">", 0),)),
+        Rule("news_clean", 0, "No scam news detected."),
+    )),
+    RuleGroup("domain_age", ("web",), "has_whois", (
+        Rule("whois_skipped", 0, "WHOIS lookup skipped: {whois_skipped_reason}.", (("whois_skipped", "==", 1),)),
+        Rule("domain_age_unknown", 25, "Cannot determine domain age.", (("domain_age_days", "missing", None),)),
+        Rule("domain_age_lt_30d", 40, "Domain <30 days old.", (("domain_age_days", "<", 30),)),
+        Rule("domain_age_lt_90d", 30, "Domain <3 months old.", (("domain_age_days", "<", 90),)),
+        Rule("domain_age_lt_1y", 20, "Domain <1 year old.", (("domain_age_days", "<", 365),)),
+        Rule("domain_age_lt_5y", 10, "Domain <5 years old.", (("domain_age_days", "<", 365 * 5),)),
+        Rule("domain_age_ge_5y", 0, "Domain >5 years old (safe)."),
+    )),
+    RuleGroup("registrar", ("web",), "has_whois", (
+        Rule("registrar_missing", 10, "Registrar missing.", (("registrar_present", "==", 0), ("whois_skipped", "==", 0))),
+    )),
+    RuleGroup("whois_error", ("web",), "has_whois", (
+        Rule("whois_error", 15, "WHOIS error: {whois_error_text}", (("whois_error", "==", 1), ("whois_skipped", "==", 0))),
+    )),
+    RuleGroup("phishing", ("web",), "has_phishing", (
+        Rule("phishing_blacklist", 70, "Phishing blacklist match!", (("phishing_hit", "==", 1),)),
+        Rule("phishing_clean", 0, "No phishing blacklist hits."),
+    )),
+    RuleGroup("openphish", ("web",), "has_openphish", (
+        Rule("openphish_hit", 80, "Domain appears in OpenPhish feed (confirmed phishing).", (("openphish_hit", "==", 1),)),
+        Rule("openphish_clean", 0, "Not found in OpenPhish."),
+    )),
+    RuleGroup("vt_domain", ("web",), "has_virustotal_domain", (
+        Rule("vt_domain_skipped", 0, "VirusTotal domain check skipped: {vt_domain_skipped_reason}.", (("vt_domain_skipped", "==", 1),)),
+        Rule("vt_domain_malicious", 60, "Domain flagged malicious by {vt_domain_malicious} VT engines.", (("vt_domain_malicious", ">", 0),)),
+        Rule("vt_domain_suspicious", 30, "Domain suspicious according to {vt_domain_suspicious} VT engines.", (("vt_domain_suspicious", ">", 0),)),
+        Rule("vt_domain_clean", 0, "VirusTotal clean."),
+    )),
+    RuleGroup("mca", ("company",), "has_mca", (
+        Rule("mca_found", -10, "Company found in MCA.", (("mca_found", "==", 1),)),
+        Rule("mca_not_found", 30, "Company not found in MCA."),
+    )),
+    RuleGroup("rbi", ("company",), "has_rbi", (
+        Rule("rbi_authorized", -15, "Listed in RBI registry.", (("rbi_authorized", "==", 1),)),
+        Rule("rbi_not_authorized", 40, "Not in RBI registry."),
+    )),
+    RuleGroup("company_news", ("company",), "has_news_api", (
+        Rule("company_news_skipped", 0, "News search skipped: {news_skipped_reason}.", (("news_skipped", "==", 1),)),
+        Rule("company_news_scam", 50, "Scam-related news detected.", (("news_scam_related", ">", 0),)),
+        Rule("company_news_clean", 0, "No scam-related news."),
+    )),
+)
+
+_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "missing": lambda x, _: x != x,
+}
+
+
+def risk_label(score: int) -> str:
+    for threshold, label in LABELS:
+        if score >= threshold:
+            return label
+    return LABELS[-1][1]
+
+
+def _flag(value) -> float:
+    return 1.0 if value else 0.0
+
+
+def _number(value) -> float:
+    if value is None:
+        return MISSING
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return MISSING
+
+
+def extract_signals(results: Dict[str, dict]) -> Tuple[List[float], Dict[str, str]]:
+    """
+    (signal vector, message details) from adapter results keyed by source
+    name (the evidence sources). Sources that are absent leave their
+    signals missing and their rule groups silent.
+    """
+    vec = [MISSING] * len(SIGNALS)
+    details = {}
+
+    def put(name, value):
+        vec[SIGNAL_INDEX[name]] = value
+
+    def skip(prefix, data):
+        put(f"{prefix}_skipped", _flag(data.get("status") == SKIPPED))
+        details[f"{prefix}_skipped_reason"] = data.get("skipped") or DETAIL_DEFAULTS[f"{prefix}_skipped_reason"]
+
+    # a scan job that gave up is no result, not a clean one
+    vt_url = results.get("virustotal_url")
+    if vt_url is not None and vt_url.get("status") != FAILED:
+        put("has_virustotal_url", 1.0)
+        put("vt_url_pending", _flag(vt_url.get("status") == PENDING))
+        skip("vt_url", vt_url)
+        put("vt_url_malicious", _number(vt_url.get("malicious", 0)))
+        put("vt_url_suspicious", _number(vt_url.get("suspicious", 0)))
+
+    news = results.get("news_api")
+    if news is not None:
+        put("has_news_api", 1.0)
+        skip("news", news)
+        put("news_scam_related", _number(news.get("scam_related", 0)))
+
+    whois = results.get("whois")
+    if whois is not None:
+        put("has_whois", 1.0)
+        skip("whois", whois)
+        put("domain_age_days", _number(whois.get("age_days")))
+        put("registrar_present", _flag(whois.get("registrar")))
+        put("whois_error", _flag(whois.get("error")))
+        details["whois_error_text"] = str(whois.get("error") or "")
+
+    phishing = results.get("phishing")
+    if phishing is not None:
+        put("has_phishing", 1.0)
+        put("phishing_hit", _flag(phishing.get("found") or phishing.get("blacklist_hit")))
+
+    # a feed that hasn't loaded yet checked nothing
+    openphish = results.get("openphish")
+    if openphish is not None and openphish.get("status") != SKIPPED:
+        put("has_openphish", 1.0)
+        put("openphish_hit", _flag(openphish.get("found")))
+
+    vt_domain = results.get("virustotal_domain")
+    if vt_domain is not None:
+        put("has_virustotal_domain", 1.0)
+        skip("vt_domain", vt_domain)
+        put("vt_domain_malicious", _number(vt_domain.get("malicious", 0)))
+        put("vt_domain_suspicious", _number(vt_domain.get("suspicious", 0)))
+
+    mca = results.get("mca")
+    if mca is not None:
+        put("has_mca", 1.0)
+        put("mca_found", _flag(mca.get("found")))
+
+    rbi = results.get("rbi")
+    if rbi is not None:
+        put("has_rbi", 1.0)
+        put("rbi_authorized", _flag(rbi.get("authorized")))
+
+    return vec, details
+
+
+def _compile_check(signal: str, op: str, value):
+    idx = SIGNAL_INDEX[signal]
+    fn = _OPS[op]
+    return lambda vec: fn(vec[idx], value)
+
+
+class _MessageFields(dict):
+    """
+    str.format_map source: details first, then signals (whole numbers
+    rendered without ".0").
+    """
+
+    def __init__(self, vec, details):
+        super().__init__(details or {})
+        self.vec = vec
+
+    def __missing__(self, key):
+        if key not in SIGNAL_INDEX:
+            return DETAIL_DEFAULTS[key]
+        value = self.vec[SIGNAL_INDEX[key]]
+        return int(value) if value == value and float(value).is_integer() else value
+
+
+class RuleEngine:
+    """
+    A rule table compiled per profile into closures over signal indexes.
+    Build once (see engine below) and reuse; with_overrides() compiles a
+    variant for what-if analysis without touching the live table.
+    """
+
+    def __init__(self, groups: Sequence[RuleGroup] = RULES):
+        self.groups = tuple(groups)
+        self._compiled = {}
+        for profile in {p for g in self.groups for p in g.profiles}:
+            self._compiled[profile] = [
+                (
+                    SIGNAL_INDEX[g.requires],
+                    [(rule, [_compile_check(*c) for c in rule.when]) for rule in g.rules],
+                )
+                for g in self.groups if profile in g.profiles
+            ]
+
+    @property
+    def rules(self) -> Dict[str, Rule]:
+        return {rule.id: rule for g in self.groups for rule in g.rules}
+
+    def with_overrides(self, overrides: Dict[str, dict]) -> "RuleEngine":
+        """
+        A new engine with some rules changed, e.g.
+        {"domain_age_lt_30d": {"points": 50, "when": (("domain_age_days", "<", 45),)}}.
+        """
+        unknown = set(overrides) - set(self.rules)
+        if unknown:
+            raise KeyError(f"Unknown rule ids: {sorted(unknown)}")
+        return RuleEngine([
+            replace(g, rules=tuple(replace(r, **overrides[r.id]) if r.id in overrides else r for r in g.rules))
+            for g in self.groups
+        ])
+
+    def evaluate(self, vec: Sequence[float], profile: str, details: Optional[Dict[str, str]] = None) -> dict:
+        """
+        {"score", "label", "reasons"} for one signal vector.
+        """
+        total = 0
+        reasons = []
+        fields = None
+        for requires, rules in self._compiled.get(profile, ()):
+            if vec[requires] != 1:
+                continue
+            for rule, checks in rules:
+                if all(check(vec) for check in checks):
+                    message = rule.message
+                    if "{" in message:
+                        fields = fields or _MessageFields(vec, details)
+                        message = message.format_map(fields)
+                    reasons.append({"rule_id": rule.id, "points": rule.points, "message": message})
+                    total += rule.points
+                    break
+
+        score = max(0, min(100, total))
+        return {"score": score, "label": risk_label(score), "reasons": reasons}
+
+    def score_batch(self, matrix, profile: str):
+        """
+        Scores many signal vectors at once (rows of a float array shaped
+        (n, len(SIGNALS)), missing = NaN). Returns (scores, hits): clamped
+        int scores of shape (n,) and a boolean (n, n_rules) matrix of the
+        rules that fired, columns in batch_rule_ids(profile) order.
+        Used by scripts/rescore.py --what-if. Needs NumPy; the per-request
+        path does not.
+        """
+        import numpy as np
+
+        m = np.asarray(matrix, dtype=float)
+        ops = {
+            "<": np.less, "<=": np.less_equal, ">": np.greater,
+            ">=": np.greater_equal, "==": np.equal,
+            "missing": lambda x, _: np.isnan(x),
+        }
+
+        total = np.zeros(len(m))
+        hits = []
+        with np.errstate(invalid="ignore"):
+            for g in self.groups:
+                if profile not in g.profiles:
+                    continue
+                open_ = m[:, SIGNAL_INDEX[g.requires]] == 1     # rows still looking for a match
+                for rule in g.rules:
+                    fired = open_.copy()
+                    for signal, op, value in rule.when:
+                        fired &= ops[op](m[:, SIGNAL_INDEX[signal]], value)
+                    open_ &= ~fired
+                    total += fired * rule.points
+                    hits.append(fired)
+
+        scores = np.clip(total, 0, 100).astype(int)
+        return scores, (np.stack(hits, axis=1) if hits else np.zeros((len(m), 0), dtype=bool))
+
+    def batch_rule_ids(self, profile: str) -> List[str]:
+        return [r.id for g in self.groups if profile in g.profiles for r in g.rules]
+
+
+engine = RuleEngine()
+
+
+def profile_for(artifact_type: str) -> str:
+    return "company" if artifact_type == "company" else "web"
+
+
+def compute_risk_score(signals: dict, profile: str = "web"):
     """
-    Compute a meaningful scam risk score using real rules.
-    Output:
-        score: 0–100
-        label: low / medium / high
-        reasons: list of reasons
+    Scores a dict of named signals (see SIGNALS); unnamed signals are
+    missing. Kept for callers that build signals by hand: a signal marks
+    its source as checked unless its has_* flag is given, so the older
+    {"domain_age_days": 12, "phishing_hit": True} style still scores.
+    Raises KeyError for names that are not signals.
     """
+    unknown = set(signals) - set(SIGNAL_INDEX)
+    if unknown:
+        raise KeyError(f"Unknown signals: {sorted(unknown)}")
 
-    score = 0
-    reasons = []
-
-    # -----------------------------------------
-    # 1. Domain age score
-    # -----------------------------------------
-    age = signals.get("domain_age_days")
-    if age is None:
-        score += 10
-        reasons.append({
-            "rule_id": "domain_age_missing",
-            "points": 10,
-            "message": "Domain age could not be determined."
-        })
-    elif age < 30:
-        score += 40
-        reasons.append({
-            "rule_id": "domain_too_new",
-            "points": 40,
-            "message": "Domain is less than 30 days old — high scam risk."
-        })
-    elif age < 180:
-        score += 20
-        reasons.append({
-            "rule_id": "domain_recent",
-            "points": 20,
-            "message": "Domain is less than 6 months old — moderately risky."
-        })
-
-    # -----------------------------------------
-    # 2. MCA company verification
-    # -----------------------------------------
-    if signals.get("mca_found") is False:
-        score += 25
-        reasons.append({
-            "rule_id": "mca_not_found",
-            "points": 25,
-            "message": "Company not found in MCA database."
-        })
-
-    # -----------------------------------------
-    # 3. RBI NBFC validation
-    # -----------------------------------------
-    if signals.get("rbi_authorized") is False:
-        score += 15
-        reasons.append({
-            "rule_id": "rbi_not_authorized",
-            "points": 15,
-            "message": "Company is NOT on RBI's authorized NBFC list."
-        })
-
-    # -----------------------------------------
-    # 4. Phishing blacklist
-    # -----------------------------------------
-    if signals.get("phishing_hit") is True:
-        score += 50
-        reasons.append({
-            "rule_id": "phishing_blacklist",
-            "points": 50,
-            "message": "Domain appears on phishing blacklists."
-        })
-
-    # -----------------------------------------
-    # 5. Free email domain usage
-    # -----------------------------------------
-    if signals.get("uses_free_email"):
-        score += 10
-        reasons.append({
-            "rule_id": "free_email_detected",
-            "points": 10,
-            "message": "Free email provider detected — lower trust factor."
-        })
-
-    # -----------------------------------------
-    # Final label
-    # -----------------------------------------
-    if score < 30:
-        label = "low"
-    elif score < 70:
-        label = "medium"
-    else:
-        label = "high"
-
-    return {
-        "score": score,
-        "label": label,
-        "reasons": reasons
-    }
+    vec = [MISSING] * len(SIGNALS)
+    for name, value in signals.items():
+        vec[SIGNAL_INDEX[name]] = _number(value) if not isinstance(value, bool) else _flag(value)
+        source = SOURCE_FLAGS[name]
+        if source not in signals:
+            vec[SIGNAL_INDEX[source]] = 1.0
+    return engine.evaluate(vec, profile)
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.verdict_cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "inflight:v1"
+
+# Delete the lock only if we still hold it (the lease may have expired and
+# been taken by another worker).
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_inflight: Dict[str, asyncio.Future] = {}
+_release = None
+
+_stats = {"leaders": 0, "coalesced_local": 0, "coalesced_remote": 0, "fallbacks": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def singleflight_stats() -> dict:
+    with _stats_lock:
+        out = dict(_stats)
+    out["in_flight"] = len(_inflight)
+    return out
+
+
+def _cross_worker() -> bool:
+    # memory:// is one process; the in-process layer already covers it
+    return not settings.REDIS_URL.startswith("memory://")
+
+
+def _lock_key(key: str) -> str:
+    return f"{KEY_PREFIX}:lock:{key}"
+
+
+def _result_key(key: str, token: str) -> str:
+    return f"{KEY_PREFIX}:result:{key}:{token}"
+
+
+def _try_lock(key: str, token: str) -> Tuple[bool, Optional[str]]:
+    """
+    (acquired, holder_token). Raises on Redis errors.
+    """
+    client = get_redis()
+    lease_ms = int(settings.SINGLEFLIGHT_LOCK_SECONDS * 1000)
+    if client.set(_lock_key(key), token, nx=True, px=lease_ms):
+        return True, token
+    holder = client.get(_lock_key(key))
+    return False, holder.decode() if holder is not None else None
+
+
+def _publish(key: str, token: str, result: dict):
+    get_redis().setex(_result_key(key, token), settings.SINGLEFLIGHT_RESULT_TTL, json.dumps(result, default=str))
+
+
+def _unlock(key: str, token: str):
+    global _release
+    client = get_redis()
+    if _release is None:
+        _release = client.register_script(_RELEASE_LUA)
+    _release(keys=[_lock_key(key)], args=[token])
+
+
+def _poll_result(key: str, token: str) -> Tuple[Optional[dict], bool]:
+    """
+    (result, leader_still_running) for the run holding token.
+    """
+    client = get_redis()
+    raw = client.get(_result_key(key, token))
+    if raw is not None:
+        return json.loads(raw), False
+    holder = client.get(_lock_key(key))
+    return None, holder is not None and holder.decode() == token
+
+
+async def _run_across_workers(key: str, fn: Callable[[], Awaitable[dict]]) -> Tuple[dict, bool]:
+    """
+    One verification per key across uvicorn workers: the worker that takes
+    the Redis lock runs fn and publishes its result under the lock token;
+    the others poll for that result. If the leader dies or gives up without
+    a result, a waiter takes the lock and runs fn itself.
+    """
+    deadline = time.monotonic() + settings.SINGLEFLIGHT_WAIT_SECONDS
+    token = uuid.uuid4().hex
+
+    while True:
+        try:
+            acquired, holder = await asyncio.to_thread(_try_lock, key, token)
+        except Exception:
+            logger.warning("Single-flight lock failed; running uncoordinated", exc_info=True)
+            _count("fallbacks")
+            return await fn(), False
+
+        if acquired:
+            _count("leaders")
+            try:
+                result = await fn()
+                try:
+                    await asyncio.to_thread(_publish, key, token, result)
+                except Exception:
+                    logger.warning("Single-flight publish failed", exc_info=True)
+                return result, False
+            finally:
+                try:
+                    await asyncio.to_thread(_unlock, key, token)
+                except Exception:
+                    logger.warning("Single-flight unlock failed", exc_info=True)
+
+        # Another worker is running it; wait for its result
+        while holder is not None and time.monotonic() < deadline:
+            await asyncio.sleep(settings.SINGLEFLIGHT_POLL_INTERVAL)
+            try:
+                result, running = await asyncio.to_thread(_poll_result, key, holder)
+            except Exception:
+                logger.warning("Single-flight poll failed", exc_info=True)
+                break
+            if result is not None:
+                _count("coalesced_remote")
+                return result, True
+            if not running:
+                break
+
+        if time.monotonic() >= deadline:
+            _count("fallbacks")
+            return await fn(), False
+        # leader went away without a result (or the lock expired between
+        # SET and GET): try to take over
+
+
+async def run(key: str, fn: Callable[[], Awaitable[dict]]) -> Tuple[dict, bool]:
+    """
+    Runs fn once per key at a time and returns (result, coalesced).
+    Callers that arrive while a run for the same key is in flight - in this
+    process or, with Redis, in another worker - get that run's result
+    instead of starting their own.
+    """
+    if not settings.SINGLEFLIGHT_ENABLED:
+        return await fn(), False
+
+    while True:
+        fut = _inflight.get(key)
+        if fut is None:
+            break
+        try:
+            result = await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            if not fut.cancelled():
+                raise       # we were cancelled, not the leader
+            continue        # leader was cancelled: take over or join the next one
+        _count("coalesced_local")
+        return result, True
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        if _cross_worker():
+            result, coalesced = await _run_across_workers(key, fn)
+        else:
+            _count("leaders")
+            result, coalesced = await fn(), False
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+    except BaseException as e:
+        fut.set_exception(e)
+        fut.exception()     # mark retrieved when nobody joined
+        raise
+    else:
+        fut.set_result(result)
+        return result, coalesced
+    finally:
+        if _inflight.get(key) is fut:
+            del _inflight[key]
@@ -0,0 +1,136 @@
+import json
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "verdict:v1"
+
+
+class MemoryCache:
+    """
+    In-process stand-in for the handful of Redis commands we use.
+    Selected with REDIS_URL=memory:// (tests, local dev without Redis).
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def setex(self, key: str, ttl: int, value) -> bool:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+        return True
+
+    def delete(self, *keys) -> int:
+        with self._lock:
+            return sum(1 for k in keys if self._data.pop(k, None) is not None)
+
+    def close(self):
+        pass
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis():
+    """
+    Shared Redis connection pool (or the in-process stand-in for memory://).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if settings.REDIS_URL.startswith("memory://"):
+                    _client = MemoryCache()
+                else:
+                    import redis
+                    _client = redis.Redis.from_url(
+                        settings.REDIS_URL,
+                        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    )
+    return _client
+
+
+def close_redis():
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+
+def cache_key(artifact_type: str, canonical_value: str) -> str:
+    return f"{KEY_PREFIX}:{artifact_type}:{canonical_value}"
+
+
+def ttl_for(label: str) -> int:
+    return settings.VERDICT_CACHE_TTLS.get(label, settings.VERDICT_CACHE_DEFAULT_TTL)
+
+
+def get_verdict(key: str) -> Optional[Tuple[dict, int]]:
+    """
+    Returns (payload, age_seconds) or None on a miss.
+    Redis errors are treated as misses: the cache must never fail a verify.
+    """
+    if not settings.VERDICT_CACHE_ENABLED:
+        return None
+
+    try:
+        raw = get_redis().get(key)
+    except Exception:
+        logger.warning("Verdict cache read failed", exc_info=True)
+        return None
+
+    if raw is None:
+        return None
+
+    entry = json.loads(raw)
+    age = max(0, int(time.time() - entry["cached_at"]))
+    return entry["payload"], age
+
+
+def set_verdict(key: str, payload: dict, label: str):
+    if not settings.VERDICT_CACHE_ENABLED:
+        return
+
+    entry = {"cached_at": time.time(), "payload": payload}
+    try:
+        get_redis().setex(key, ttl_for(label), json.dumps(entry, default=str))
+    except Exception:
+        logger.warning("Verdict cache write failed", exc_info=True)
+
+
+def delete_verdict(key: str):
+    try:
+        get_redis().delete(key)
+    except Exception:
+        logger.warning("Verdict cache delete failed", exc_info=True)
+
+
+def delete_verdicts(keys: List[str]):
+    if not keys:
+        return
+    try:
+        get_redis().delete(*keys)
+    except Exception:
+        logger.warning("Verdict cache delete failed", exc_info=True)
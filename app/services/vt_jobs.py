@@ -0,0 +1,200 @@
+import datetime
+import logging
+import threading
+from typing import Optional
+
+from sqlalchemy import update
+
+from app import models
+from app.crud import store_payloads
+from app.adapters.virustotal_adapter import vt_fetch_analysis
+from app.core.config import settings
+from app.core.quota import BACKGROUND, SKIPPED, quota_priority
+from app.db.session import SessionLocal
+from app.services import verdict_cache
+from app.services.orchestrator import canonical_artifact, vt_url_reason
+from app.services.risk_engine import FAILED, VT_URL_PENDING_MESSAGE, risk_label
+
+logger = logging.getLogger(__name__)
+
+REPORT_FIELDS = ("malicious", "suspicious", "undetected", "harmless", "source")
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def backoff_seconds(attempts: int) -> float:
+    return min(settings.VT_JOB_MAX_BACKOFF, settings.VT_JOB_INITIAL_BACKOFF * 2 ** max(0, attempts - 1))
+
+
+class VTJobWorker:
+    """
+    Polls pending VirusTotal URL analyses with exponential backoff and
+    writes completed results back into the evidence and risk score of
+    the verification that submitted them.
+
+    Every uvicorn worker runs one; a job is claimed by moving its
+    next_poll_at forward in a conditional UPDATE, so only one process
+    polls a given job at a time.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _claim(self, db, job_id: int, seen_next_poll_at, now) -> bool:
+        lease = now + datetime.timedelta(seconds=settings.VT_JOB_LEASE_SECONDS)
+        res = db.execute(
+            update(models.ScanJob.__table__)
+            .where(models.ScanJob.id == job_id)
+            .where(models.ScanJob.status == "pending")
+            .where(models.ScanJob.next_poll_at == seen_next_poll_at)
+            .values(next_poll_at=lease)
+        )
+        db.commit()
+        return res.rowcount == 1
+
+    def _set_payload(self, db, ev: models.Evidence, data: dict, now):
+        # payloads are shared between evidences; point at a new one instead of editing
+        ev.payload_id = store_payloads(db, ev.artifact_id, [{"source": ev.source, "data": data}], now)[0]
+
+    def _bump_version(self, db, artifact_id: int):
+        # evidence and score rows change in place below; invalidates artifact ETags
+        db.execute(
+            update(models.Artifact.__table__)
+            .where(models.Artifact.id == artifact_id)
+            .values(version=models.Artifact.version + 1)
+        )
+
+    def _resolve(self, db, job: models.ScanJob, data: dict, reason: Optional[dict], now):
+        """
+        Writes a finished job back: the evidence payload becomes data and
+        the pending reason becomes reason (dropped if None), then the
+        score, the artifact's verdict, its version and the cached verdict
+        follow.
+        """
+        ev = db.get(models.Evidence, job.evidence_id)
+        if ev:
+            self._set_payload(db, ev, data, now)
+
+        art = db.get(models.Artifact, job.artifact_id)
+        rs = db.get(models.RiskScore, job.score_id)
+        if rs:
+            reasons = []
+            delta = reason["points"] if reason else 0
+            for r in rs.reasons or []:
+                # rows scored before rule ids were stable only match on the message
+                if r.get("rule_id") == "vt_url_pending" or r.get("message") == VT_URL_PENDING_MESSAGE:
+                    delta -= r.get("points") or 0
+                    if reason:
+                        reasons.append(dict(reason))
+                    reason = None
+                else:
+                    reasons.append(dict(r))
+            rs.reasons = reasons
+            rs.score = max(0, min(100, rs.score + delta))
+            rs.label = risk_label(rs.score)
+            # unless a newer verification has replaced it, this is the current verdict
+            if art and (art.last_verified_at is None or art.last_verified_at <= rs.computed_at):
+                art.latest_score, art.latest_label = rs.score, rs.label
+
+        self._bump_version(db, job.artifact_id)
+
+        # the cached verdict still says "pending"
+        if art:
+            verdict_cache.delete_verdict(verdict_cache.cache_key(*canonical_artifact(art.value, art.type)))
+
+    def _complete(self, db, job: models.ScanJob, report: dict, now):
+        data = {k: report.get(k) for k in REPORT_FIELDS}
+        job.status = "completed"
+        job.result = data
+        job.error = None
+        self._resolve(db, job, data, vt_url_reason(report), now)
+
+    def _fail(self, db, job: models.ScanJob, error: str, now):
+        # not a clean scan: the evidence is scored as missing from now on
+        job.status = FAILED
+        job.error = error
+        self._resolve(db, job, {"status": FAILED, "error": error}, None, now)
+
+    def _poll(self, db, job_id: int):
+        job = db.get(models.ScanJob, job_id)
+        now = _utcnow()
+
+        report = vt_fetch_analysis(job.external_id)
+        job.updated_at = now
+
+        if report.get("status") == SKIPPED:
+            # no poll was made; retry later without spending an attempt
+            job.error = report["error"]
+            job.next_poll_at = now + datetime.timedelta(seconds=backoff_seconds(job.attempts or 1))
+            db.commit()
+            return
+
+        job.attempts = (job.attempts or 0) + 1
+
+        if report.get("status") == "completed":
+            self._complete(db, job, report, now)
+        elif job.attempts >= settings.VT_JOB_MAX_ATTEMPTS:
+            error = report.get("error") or f"analysis still {report.get('status')} after {job.attempts} polls"
+            self._fail(db, job, error, now)
+        else:
+            job.error = report.get("error")
+            job.next_poll_at = now + datetime.timedelta(seconds=backoff_seconds(job.attempts))
+
+        db.commit()
+
+    def run_once(self) -> int:
+        """
+        Polls every due job once. Returns how many jobs this process handled.
+        """
+        db = SessionLocal()
+        handled = 0
+        try:
+            now = _utcnow()
+            due = (
+                db.query(models.ScanJob.id, models.ScanJob.next_poll_at)
+                .filter(models.ScanJob.status == "pending")
+                .filter(models.ScanJob.kind == "virustotal_url")
+                .filter(models.ScanJob.next_poll_at <= now)
+                .order_by(models.ScanJob.next_poll_at)
+                .limit(settings.VT_JOB_BATCH_SIZE)
+                .all()
+            )
+
+            for job_id, next_poll_at in due:
+                if not self._claim(db, job_id, next_poll_at, now):
+                    continue
+                try:
+                    self._poll(db, job_id)
+                    handled += 1
+                except Exception:
+                    db.rollback()
+                    logger.exception("VT job %s failed", job_id)
+        finally:
+            db.close()
+        return handled
+
+    def _run(self):
+        quota_priority.set(BACKGROUND)
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("VT job worker iteration failed")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vt-job-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+vt_job_worker = VTJobWorker(interval=settings.VT_JOB_POLL_INTERVAL)
@@ -0,0 +1,214 @@
+"""
+Startup warm-up: loads local datasets and feeds, checks the database
+schema and opens connection pools before the worker reports ready, so
+the first real requests don't pay for any of it.
+
+Components run concurrently on threads once the app has started; /health
+answers right away (liveness) while /ready returns 503 until every
+required component is done (readiness).
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, OK, FAILED = "pending", "running", "ok", "failed"
+
+
+# ---------------------------------------------------------------------------
+# Components
+# ---------------------------------------------------------------------------
+
+def check_schema():
+    """
+    Fails unless the database is at the newest Alembic revision, or
+    upgrades it when DB_AUTO_MIGRATE allows (local dev).
+    """
+    from app.db.schema import current_revision, head_revision, upgrade
+    from app.db.session import engine
+
+    current, head = current_revision(engine), head_revision()
+    if current == head:
+        return
+    if not settings.DB_AUTO_MIGRATE:
+        raise RuntimeError(f"database at revision {current}, expected {head}; run `alembic upgrade head`")
+    upgrade(engine)
+    logger.info("Migrated database from revision %s to %s", current, head)
+
+
+def open_db_pool():
+    """
+    Opens (and returns to the pool) as many connections as the pool keeps.
+    """
+    from app.db.session import engine
+
+    count = 1 if engine.dialect.name == "sqlite" else settings.DB_POOL_SIZE
+    conns = []
+    try:
+        for _ in range(count):
+            conn = engine.connect()
+            conns.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+def open_http_clients():
+    # building a client loads the CA bundle into an SSL context (tens of ms)
+    from app.core.http import http_clients
+
+    for upstream in ("virustotal", "whois", "newsapi", "openphish", "google"):
+        http_clients.get(upstream)
+
+
+def check_redis():
+    from app.services.verdict_cache import get_redis
+
+    get_redis().get("warmup")
+
+
+def load_openphish():
+    from app.adapters.openphish_adapter import openphish_feed
+
+    openphish_feed.refresh()
+
+
+def load_rbi():
+    from app.adapters.rbi_adapter import load_rbi_index
+
+    load_rbi_index()
+
+
+def load_domain_data():
+    from app.core.blocklist import phishing_blocklist
+    from app.core.domains import public_suffixes
+
+    public_suffixes()
+    phishing_blocklist.reload()
+
+
+def resolve_upstreams():
+    """
+    Creates the resolver and caches the upstream hosts' addresses.
+    """
+    from app.core.resolver import resolve
+
+    hosts = {
+        urlsplit(url).hostname
+        for url in (settings.VIRUSTOTAL_API_URL, settings.WHOIS_API_URL, settings.NEWS_API_URL,
+                    settings.OPENPHISH_FEED_URL)
+        if url
+    }
+
+    async def run():
+        await asyncio.gather(*(resolve(h) for h in hosts if h))
+
+    asyncio.run(run())
+
+
+class Component:
+
+    def __init__(self, name: str, fn: Callable[[], None], required: bool = True):
+        self.name = name
+        self.fn = fn
+        self.required = required
+        self.state = PENDING
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def report(self) -> dict:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+        }
+
+
+# Optional components depend on third parties; failing them leaves the
+# worker serving with what it has (adapters degrade on their own).
+def default_components() -> List[Component]:
+    return [
+        Component("database_schema", check_schema),
+        Component("database_pool", open_db_pool),
+        Component("redis", check_redis, required=False),
+        Component("http_clients", open_http_clients),
+        Component("rbi_index", load_rbi),
+        Component("domain_data", load_domain_data),
+        Component("openphish_feed", load_openphish, required=False),
+        Component("dns", resolve_upstreams, required=False),
+    ]
+
+
+class WarmUp:
+
+    def __init__(self, components: List[Component]):
+        self.components: Dict[str, Component] = {c.name: c for c in components}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_one(self, component: Component):
+        loop = asyncio.get_running_loop()
+        component.state = RUNNING
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.run_in_executor(None, component.fn), settings.WARMUP_TIMEOUT_SECONDS)
+            component.state = OK
+        except asyncio.TimeoutError:
+            component.state = FAILED
+            component.error = f"timed out after {settings.WARMUP_TIMEOUT_SECONDS:.0f}s"
+        except Exception as e:
+            component.state = FAILED
+            component.error = str(e) or type(e).__name__
+        component.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        log = logger.info if component.state == OK else (logger.error if component.required else logger.warning)
+        log("Warm-up %s: %s in %.0f ms%s", component.name, component.state, component.duration_ms,
+            f" ({component.error})" if component.error else "")
+
+    async def run(self, on_done: Optional[Callable[["WarmUp"], None]] = None):
+        self.started_at = time.time()
+        await asyncio.gather(*(self._run_one(c) for c in self.components.values()))
+        self.finished_at = time.time()
+        logger.info("Warm-up finished in %.0f ms; ready=%s", (self.finished_at - self.started_at) * 1000, self.ready)
+        if on_done is not None:
+            on_done(self)
+
+    def start(self, on_done: Optional[Callable[["WarmUp"], None]] = None):
+        """
+        Runs the warm-up in the background on the running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run(on_done))
+
+    async def wait(self):
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None and all(
+            c.state == OK for c in self.components.values() if c.required
+        )
+
+    def report(self) -> dict:
+        done = sum(1 for c in self.components.values() if c.state in (OK, FAILED))
+        end = self.finished_at or time.time()
+        return {
+            "ready": self.ready,
+            "progress": f"{done}/{len(self.components)}",
+            "duration_ms": round((end - self.started_at) * 1000, 1) if self.started_at else None,
+            "components": {name: c.report() for name, c in self.components.items()},
+        }
+
+
+warmup = WarmUp(default_components())
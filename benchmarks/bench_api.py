@@ -0,0 +1,271 @@
+"""
+End-to-end API benchmark against local upstream stand-ins
+(benchmarks/fake_upstreams.py), so runs are repeatable and safe for CI.
+
+The fake upstreams run in a separate process with the configured latency,
+jitter, error rate and payload size; the API runs in this process behind
+an in-memory ASGI client, with every adapter pointed at the fakes. The
+database is a fresh SQLite file unless --database-url names another one
+(e.g. a throwaway Postgres database).
+
+Scenarios:
+    verify_cold      POST /api/verify, a new domain per request (all adapters called)
+    verify_url       POST /api/verify, a new URL per request (adds the VT URL scan)
+    verify_company   POST /api/verify, a new company name per request
+    verify_hot       POST /api/verify, repeating a warmed set (verdict cache hits)
+    verify_refresh   POST /api/verify?refresh on the warmed set (verdict cache bypassed,
+                     adapter caches hot)
+    batch            POST /api/verify/batch, half the items duplicates
+    artifact_reads   GET /api/artifacts/{id} on the warmed set
+    verdict_reads    GET /api/verdict on the warmed set (artifact row only)
+
+Results go to stdout (and --out) as JSON, one entry per scenario with
+p50/p95/p99 latency in ms and requests per second; --compare prints the
+change against an earlier result file.
+
+Usage:
+    python -m benchmarks.bench_api --requests 300 --concurrency 32 --latency-ms 80
+    python -m benchmarks.bench_api --scenarios verify_hot,artifact_reads --out after.json --compare before.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Tuple
+
+import httpx
+
+from benchmarks.bench_db_modes import percentile
+from benchmarks.fake_upstreams import upstream_env
+
+SCENARIOS = ["verify_cold", "verify_url", "verify_company", "verify_hot", "verify_refresh", "batch", "artifact_reads",
+             "verdict_reads"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_upstreams(args) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    proc = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.fake_upstreams", "--port", str(port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--news-articles", str(args.news_articles),
+        "--feed-size", str(args.feed_size), "--payload-kb", str(args.payload_kb), "--seed", str(args.seed),
+    ])
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/healthz", timeout=1).status_code == 204:
+                return proc, base_url
+        except httpx.HTTPError:
+            pass
+        if proc.poll() is not None:
+            break
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("fake upstreams did not start")
+
+
+def configure_env(args, base_url: str):
+    """
+    Must run before anything under app/ is imported: settings are read once.
+    """
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}"
+    os.environ.update(upstream_env(base_url))
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "REDIS_URL": os.environ.get("REDIS_URL", "memory://"),
+        "QUOTA_ENABLED": "true" if args.quotas else "false",
+        "DNS_GUESS_MAX_CANDIDATES": "0",     # company -> domain guessing needs real DNS
+        "VT_JOB_WORKER_ENABLED": "false",    # keep background polling out of the numbers
+        "OPENPHISH_REFRESH_SECONDS": "3600",
+        "BLOCKLIST_PATH": os.path.join(tempfile.gettempdir(), "bench-no-blocklist.bin"),
+    })
+    return database_url
+
+
+def summarize(name: str, latencies: list, errors: int, elapsed: float, concurrency: int, upstream: dict) -> dict:
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "mean_ms": round(statistics.mean(latencies), 2) if latencies else None,
+        "p50_ms": round(percentile(latencies, 50), 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95), 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99), 2) if latencies else None,
+        "upstream_calls": upstream,
+    }
+
+
+async def run_load(client, requests: int, concurrency: int, make_request):
+    """
+    Sends requests with at most concurrency in flight. make_request(i)
+    returns (method, path, json body); a response >= 400 counts as an error.
+    """
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        nonlocal errors
+        method, path, body = make_request(i)
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                r = await client.request(method, path, json=body)
+                await r.aread()     # batch answers stream NDJSON
+                if r.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_benchmark(args, base_url: str) -> list:
+    import anyio
+
+    from app.main import app
+    from app.services.warmup import warmup
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    await app.router.startup()
+    # measure warm workers only, as a rolling deploy would route traffic
+    await warmup.wait()
+    if not warmup.ready:
+        raise RuntimeError(f"warm-up failed: {warmup.report()}")
+
+    hot = [f"hot-{i}.com" for i in range(args.hot_set)]
+    n, size = args.requests, args.batch_size
+    scenarios = {
+        "verify_cold": lambda i: ("POST", "/api/verify", {"query": f"cold-{i}.com", "refresh": True}),
+        "verify_url": lambda i: ("POST", "/api/verify", {"query": f"https://url-{i}.com/login?id={i}", "refresh": True}),
+        "verify_company": lambda i: ("POST", "/api/verify", {"query": f"Bench Finance {i} Pvt Ltd", "refresh": True}),
+        "verify_hot": lambda i: ("POST", "/api/verify", {"query": hot[i % len(hot)]}),
+        "verify_refresh": lambda i: ("POST", "/api/verify", {"query": hot[i % len(hot)], "refresh": True}),
+        "batch": lambda i: ("POST", "/api/verify/batch", {
+            "queries": [{"query": f"batch-{i}-{j % max(1, size // 2)}.com"} for j in range(size)],
+            "refresh": True,
+        }),
+        "artifact_reads": lambda i: ("GET", f"/api/artifacts/{artifact_ids[i % len(artifact_ids)]}", None),
+        "verdict_reads": lambda i: ("GET", f"/api/verdict?query={hot[i % len(hot)]}", None),
+    }
+
+    results = []
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=120) as client:
+        # warm set shared by the hot, refresh and read scenarios
+        artifact_ids = []
+        for q in hot:
+            r = await client.post("/api/verify", json={"query": q, "refresh": True})
+            artifact_ids.append(r.json()["artifact"]["id"])
+
+        async with httpx.AsyncClient(base_url=base_url) as upstream:
+            for name in args.scenarios:
+                before = (await upstream.get("/stats")).json()
+                requests = args.batch_requests if name == "batch" else n
+                latencies, errors, elapsed = await run_load(client, requests, args.concurrency, scenarios[name])
+                after = (await upstream.get("/stats")).json()
+                calls = {k: after[k] - before.get(k, 0) for k in after if after[k] != before.get(k, 0)}
+                results.append(summarize(name, latencies, errors, elapsed, args.concurrency, calls))
+                print(json.dumps(results[-1]), file=sys.stderr)
+
+    await app.router.shutdown()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {s["scenario"]: s for s in json.load(f)["scenarios"]}
+    print(f"{'scenario':<16}{'rps':>28}{'p95 ms':>28}{'p99 ms':>28}", file=sys.stderr)
+    for s in results:
+        b = baseline.get(s["scenario"])
+        if not b:
+            continue
+
+        def cell(key):
+            if not b[key] or s[key] is None:
+                return f"{s[key]}".rjust(28)
+            return f"{b[key]} -> {s[key]} ({(s[key] / b[key] - 1) * 100:+.0f}%)".rjust(28)
+
+        print(f"{s['scenario']:<16}{cell('rps')}{cell('p95_ms')}{cell('p99_ms')}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=40, help="anyio threadpool size")
+    parser.add_argument("--hot-set", type=int, default=20, help="artifacts warmed for the hot/read scenarios")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--batch-requests", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50, help="fake upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--news-articles", type=int, default=20)
+    parser.add_argument("--feed-size", type=int, default=5000)
+    parser.add_argument("--payload-kb", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", default="", help="default: a fresh SQLite file")
+    parser.add_argument("--quotas", action="store_true", help="keep upstream quotas on (off by default)")
+    parser.add_argument("--out", help="also write the results JSON here")
+    parser.add_argument("--compare", metavar="BASELINE", help="results JSON of an earlier run")
+    args = parser.parse_args()
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    proc, base_url = start_upstreams(args)
+    try:
+        database_url = configure_env(args, base_url)
+        results = asyncio.run(run_benchmark(args, base_url))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    # the URL may carry credentials; only the backend goes in the report
+    config = {k: v for k, v in vars(args).items() if k not in ("out", "compare", "database_url")}
+    config["database"] = database_url.split("://", 1)[0]
+    report = {
+        "commit": git_commit(),
+        "run_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "config": config,
+        "scenarios": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Compares the two DB access modes of the API (DB_ASYNC=false / true)
+at the same worker count: one process, same anyio threadpool size,
+same client concurrency.
+
+Upstream adapters are replaced by sleeps so only the DB path differs.
+Point DATABASE_URL at Postgres for meaningful numbers; with SQLite the
+async driver serializes on a single connection.
+
+Usage:
+    python -m benchmarks.bench_db_modes --requests 500 --concurrency 64 --threads 40
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = {"threadpool": "false", "async": "true"}
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return None
+    k = max(0, min(len(values) - 1, int(round(pct / 100.0 * len(values))) - 1))
+    return values[k]
+
+
+async def run_child(args):
+    import anyio
+    import httpx
+
+    from app.adapters import openphish_adapter
+    from app.services import orchestrator
+
+    def slow(result):
+        def adapter(*_):
+            time.sleep(args.upstream_ms / 1000.0)
+            return dict(result)
+        return adapter
+
+    orchestrator.vt_check_url = slow({"malicious": 0, "suspicious": 0})
+    orchestrator.vt_check_domain = slow({"malicious": 0, "suspicious": 0})
+    orchestrator.search_news = slow({"total_articles": 0, "scam_related": 0, "scam_articles": []})
+    orchestrator.domain_whois_info = slow({"registrar": "bench", "age_days": 4000})
+    openphish_adapter.openphish_feed.start = lambda: None
+
+    from app.main import app
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    await app.router.startup()
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=60) as client:
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                t0 = time.perf_counter()
+                if i % 2 == 0:
+                    r = await client.post("/api/verify", json={"query": f"bench{i % 50}.example", "refresh": True})
+                else:
+                    r = await client.get("/api/artifacts/1", params={"limit": 20})
+                latencies.append((time.perf_counter() - t0) * 1000)
+                if r.status_code >= 500:
+                    errors += 1
+
+        # warm the artifact row read by the GETs
+        await client.post("/api/verify", json={"query": "bench0.example", "refresh": True})
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    await app.router.shutdown()
+
+    print(json.dumps({
+        "mode": args.mode,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "threads": args.threads,
+        "errors": errors,
+        "rps": round(args.requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=40, help="anyio threadpool size (same for both modes)")
+    parser.add_argument("--upstream-ms", type=float, default=20)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(run_child(args))
+        return
+
+    # each mode runs in a fresh process: settings and the repository are chosen at import
+    results = []
+    for mode, flag in MODES.items():
+        env = dict(os.environ, DB_ASYNC=flag, REDIS_URL=os.environ.get("REDIS_URL", "memory://"))
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_modes", "--mode", mode,
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+             "--threads", str(args.threads), "--upstream-ms", str(args.upstream_ms)],
+            env=env, check=True, capture_output=True, text=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
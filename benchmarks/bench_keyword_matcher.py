@@ -0,0 +1,110 @@
+"""
+Micro-benchmark of the news scam-keyword scan on a synthetic corpus:
+the old per-keyword substring loop against KeywordMatcher / scan_articles.
+
+Articles are random words with scam keywords and the entity sprinkled in
+at --keyword-rate; the scan is pure CPU, no network.
+
+Usage:
+    python -m benchmarks.bench_keyword_matcher --articles 50000 --keywords 200
+"""
+import argparse
+import json
+import os
+import random
+import string
+import time
+
+os.environ.setdefault("REDIS_URL", "memory://")
+
+from app.adapters.news_adapter import scan_articles, scam_matcher   # noqa: E402
+from app.core.config import settings   # noqa: E402
+from app.core.keyword_matcher import KeywordMatcher   # noqa: E402
+
+ENTITY = "acme"
+
+
+def make_corpus(rnd: random.Random, n: int, keywords: list, rate: float):
+    vocab = ["".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(2, 10))) for _ in range(20000)]
+
+    def sentence(words: int) -> str:
+        out = []
+        for _ in range(words):
+            r = rnd.random()
+            if r < rate:
+                out.append(rnd.choice(keywords))
+            elif r < rate * 3:
+                out.append(ENTITY.capitalize())
+            else:
+                out.append(rnd.choice(vocab))
+        return " ".join(out)
+
+    return [{"title": sentence(12), "description": sentence(45), "url": f"https://news.example/{i}"}
+            for i in range(n)]
+
+
+def old_scan(entity: str, articles: list, keywords: list) -> int:
+    """
+    The scan search_news used to run (substring, no weights or positions).
+    """
+    entity_l = entity.lower()
+    hits = 0
+    for art in articles:
+        text = f"{(art.get('title') or '').lower()} {(art.get('description') or '').lower()}"
+        if entity_l not in text:
+            continue
+        if any(kw in text for kw in keywords):
+            hits += 1
+    return hits
+
+
+def timed(fn, repeat: int):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=50000)
+    parser.add_argument("--keywords", type=int, default=0,
+                        help="extra synthetic keywords on top of NEWS_SCAM_KEYWORDS")
+    parser.add_argument("--keyword-rate", type=float, default=0.01, help="share of words that are keywords")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    weights = dict(settings.NEWS_SCAM_KEYWORDS)
+    for i in range(args.keywords):
+        weights[f"scamword{i}"] = 1.0
+    keywords = list(weights)
+    matcher = scam_matcher if args.keywords == 0 else KeywordMatcher(weights)
+
+    corpus = make_corpus(rnd, args.articles, keywords, args.keyword_rate)
+    words = sum(len(a["title"].split()) + len(a["description"].split()) for a in corpus)
+
+    old_s, old_hits = timed(lambda: old_scan(ENTITY, corpus, keywords), args.repeat)
+    find_s, _ = timed(lambda: [matcher.find(f"{a['title']} {a['description']}") for a in corpus], args.repeat)
+    scan_s, scan = timed(lambda: scan_articles(ENTITY, corpus), args.repeat) if matcher is scam_matcher else (None, None)
+
+    print(json.dumps({
+        "articles": args.articles,
+        "words": words,
+        "keywords": len(keywords),
+        "old_substring_scan": {"seconds": round(old_s, 4), "articles_per_s": round(args.articles / old_s), "hits": old_hits},
+        "matcher_find": {"seconds": round(find_s, 4), "articles_per_s": round(args.articles / find_s)},
+        "scan_articles": None if scan is None else {
+            "seconds": round(scan_s, 4),
+            "articles_per_s": round(args.articles / scan_s),
+            "hits": scan["scam_related"],
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Local stand-ins for every upstream the adapters call, for benchmarks and
+load tests that must not touch (or pay for) the real APIs.
+
+One server answers all of them under separate prefixes:
+
+    /virustotal/urls, /virustotal/analyses/{id}, /virustotal/domains/{domain}
+    /whois          (WhoisXML shape)
+    /news           (NewsAPI /v2/everything shape, paginated)
+    /openphish/feed.txt
+    /google/search  (HTML with an MCA master-data link)
+    /stats          (calls served per upstream, for the benchmark report)
+
+Point the app at it with upstream_env(base_url). Responses are
+deterministic per query, so runs are repeatable.
+
+Usage:
+    python -m benchmarks.fake_upstreams --port 8900 --latency-ms 80 --jitter-ms 20 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+from collections import Counter
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+
+
+def upstream_env(base_url: str) -> dict:
+    """
+    Settings overrides (as environment variables) routing every adapter
+    to a fake server at base_url.
+    """
+    return {
+        "VIRUSTOTAL_API_URL": f"{base_url}/virustotal",
+        "VIRUSTOTAL_API_KEY": "bench",
+        "WHOIS_API_URL": f"{base_url}/whois",
+        "WHOIS_API_KEY": "bench",
+        "NEWS_API_URL": f"{base_url}/news",
+        "NEWS_API_KEY": "bench",
+        "OPENPHISH_FEED_URL": f"{base_url}/openphish/feed.txt",
+        "MCA_SEARCH_URL": f"{base_url}/google/search",
+    }
+
+
+def _seed(*parts) -> int:
+    return int.from_bytes(hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).digest(), "little")
+
+
+def create_app(latency_ms: float = 50, jitter_ms: float = 0, error_rate: float = 0.0,
+               news_articles: int = 20, news_total: int = 60, feed_size: int = 5000,
+               payload_kb: float = 0, seed: int = 1) -> FastAPI:
+    app = FastAPI(title="Fake upstreams")
+    rnd = random.Random(seed)
+    calls = Counter()
+    padding = "x" * int(payload_kb * 1024)
+
+    async def simulate(upstream: str):
+        """
+        Counts the call, waits the configured latency and returns an error
+        response for error_rate of calls.
+        """
+        calls[upstream] += 1
+        delay = max(0.0, latency_ms + rnd.uniform(-jitter_ms, jitter_ms)) / 1000.0
+        if delay:
+            await asyncio.sleep(delay)
+        if error_rate and rnd.random() < error_rate:
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+        return None
+
+    def stats(key: str) -> dict:
+        s = _seed(key)
+        return {
+            "malicious": s % 5 if s % 7 == 0 else 0,
+            "suspicious": 1 if s % 11 == 0 else 0,
+            "harmless": 60 + s % 10,
+            "undetected": 10 + s % 5,
+        }
+
+    @app.post("/virustotal/urls")
+    async def vt_submit(request: Request):
+        failed = await simulate("virustotal")
+        if failed:
+            return failed
+        url = (await request.form()).get("url", "")
+        return {"data": {"type": "analysis", "id": f"u-{_seed(url):x}"}}
+
+    @app.get("/virustotal/analyses/{analysis_id}")
+    async def vt_analysis(analysis_id: str):
+        failed = await simulate("virustotal")
+        if failed:
+            return failed
+        return {"data": {"attributes": {"status": "completed", "stats": stats(analysis_id)}}, "padding": padding}
+
+    @app.get("/virustotal/domains/{domain}")
+    async def vt_domain(domain: str):
+        failed = await simulate("virustotal")
+        if failed:
+            return failed
+        return {"data": {"attributes": {
+            "reputation": _seed(domain) % 20 - 10,
+            "last_analysis_stats": stats(domain),
+            "categories": {"bench": "business"},
+        }}, "padding": padding}
+
+    @app.get("/whois")
+    async def whois(domainName: str = ""):
+        failed = await simulate("whois")
+        if failed:
+            return failed
+        age_days = _seed(domainName) % 4000
+        year = 2024 - age_days // 365
+        return {"WhoisRecord": {
+            "registrarName": "Bench Registrar",
+            "registryData": {"createdDate": f"{year:04d}-01-15T00:00:00Z"},
+            "registrant": {"organization": "Bench Org", "country": "IN"},
+            "rawText": padding,
+        }}
+
+    @app.get("/news")
+    async def news(q: str = "", page: int = 1, pageSize: int = 100):
+        failed = await simulate("newsapi")
+        if failed:
+            return failed
+        start = (page - 1) * news_articles
+        count = max(0, min(news_articles, news_total - start))
+        articles = []
+        for i in range(start, start + count):
+            s = _seed(q, i)
+            scam = "fraud alert" if s % 4 == 0 else "quarterly results"
+            articles.append({
+                "source": {"name": f"Bench News {s % 9}"},
+                "title": f"{q} {scam} report {i}",
+                "description": f"Coverage of {q}: {scam}. {padding[:200]}",
+                "url": f"https://news.bench/{s:x}",
+                "publishedAt": f"2024-{1 + s % 12:02d}-{1 + s % 28:02d}T00:00:00Z",
+            })
+        return {"status": "ok", "totalResults": news_total, "articles": articles}
+
+    @app.get("/openphish/feed.txt")
+    async def openphish():
+        failed = await simulate("openphish")
+        if failed:
+            return failed
+        return PlainTextResponse("\n".join(f"https://phish{i}.bench-bad.com/login" for i in range(feed_size)))
+
+    @app.get("/google/search")
+    async def google(q: str = ""):
+        failed = await simulate("google")
+        if failed:
+            return failed
+        if _seed(q) % 2:
+            return HTMLResponse('<html><a href="https://www.mca.gov.in/viewCompanyMasterData?cin=BENCH">x</a></html>')
+        return HTMLResponse("<html>no results</html>")
+
+    @app.get("/stats")
+    async def call_stats():
+        return dict(calls)
+
+    @app.get("/healthz")
+    async def healthz():
+        return Response(status_code=204)
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered with HTTP 500")
+    parser.add_argument("--news-articles", type=int, default=20, help="articles per NewsAPI page")
+    parser.add_argument("--news-total", type=int, default=60, help="totalResults reported by NewsAPI")
+    parser.add_argument("--feed-size", type=int, default=5000, help="URLs in the OpenPhish feed")
+    parser.add_argument("--payload-kb", type=float, default=0, help="filler added to VT and WHOIS responses")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(args.latency_ms, args.jitter_ms, args.error_rate, args.news_articles,
+                     args.news_total, args.feed_size, args.payload_kb, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Tables as they stood before migrations. Databases created earlier by
+Base.metadata.create_all hold some or all of them already, so only the
+missing ones are created and such databases upgrade in place.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    now = sa.func.now()
+    return {
+        "artifacts": lambda: (
+            op.create_table(
+                "artifacts",
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("type", sa.String),
+                sa.Column("value", sa.String),
+                sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
+                sa.Column("artifact_metadata", sa.JSON),
+            ),
+            op.create_index("ix_artifacts_id", "artifacts", ["id"]),
+            op.create_index("ix_artifacts_type", "artifacts", ["type"]),
+            op.create_index("ix_artifacts_value", "artifacts", ["value"], unique=True),
+        ),
+        "evidences": lambda: (
+            op.create_table(
+                "evidences",
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("artifact_id", sa.Integer, sa.ForeignKey("artifacts.id", ondelete="CASCADE")),
+                sa.Column("source", sa.String),
+                sa.Column("title", sa.String),
+                sa.Column("url", sa.String),
+                sa.Column("summary", sa.Text),
+                sa.Column("captured_at", sa.DateTime(timezone=True), server_default=now),
+            ),
+            op.create_index("ix_evidences_id", "evidences", ["id"]),
+        ),
+        "risk_scores": lambda: (
+            op.create_table(
+                "risk_scores",
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("artifact_id", sa.Integer, sa.ForeignKey("artifacts.id", ondelete="CASCADE")),
+                sa.Column("score", sa.Integer),
+                sa.Column("label", sa.String),
+                sa.Column("reasons", sa.JSON),
+                sa.Column("computed_at", sa.DateTime(timezone=True), server_default=now),
+            ),
+            op.create_index("ix_risk_scores_id", "risk_scores", ["id"]),
+            op.create_index("ix_risk_scores_score", "risk_scores", ["score"]),
+        ),
+        "user_reports": lambda: (
+            op.create_table(
+                "user_reports",
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("artifact_type", sa.String),
+                sa.Column("artifact_value", sa.String),
+                sa.Column("description", sa.Text),
+                sa.Column("contact", sa.String, nullable=True),
+                sa.Column("status", sa.String),
+                sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
+            ),
+            op.create_index("ix_user_reports_id", "user_reports", ["id"]),
+        ),
+        "scan_jobs": lambda: (
+            op.create_table(
+                "scan_jobs",
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("kind", sa.String),
+                sa.Column("status", sa.String),
+                sa.Column("target", sa.String),
+                sa.Column("external_id", sa.String),
+                sa.Column("artifact_id", sa.Integer, sa.ForeignKey("artifacts.id", ondelete="CASCADE")),
+                sa.Column("evidence_id", sa.Integer, sa.ForeignKey("evidences.id", ondelete="CASCADE")),
+                sa.Column("score_id", sa.Integer, sa.ForeignKey("risk_scores.id", ondelete="CASCADE")),
+                sa.Column("attempts", sa.Integer),
+                sa.Column("next_poll_at", sa.DateTime(timezone=True)),
+                sa.Column("result", sa.JSON),
+                sa.Column("error", sa.Text),
+                sa.Column("created_at", sa.DateTime(timezone=True), server_default=now),
+                sa.Column("updated_at", sa.DateTime(timezone=True), server_default=now),
+            ),
+            op.create_index("ix_scan_jobs_id", "scan_jobs", ["id"]),
+            op.create_index("ix_scan_jobs_kind", "scan_jobs", ["kind"]),
+            op.create_index("ix_scan_jobs_status", "scan_jobs", ["status"]),
+            op.create_index("ix_scan_jobs_artifact_id", "scan_jobs", ["artifact_id"]),
+            op.create_index("ix_scan_jobs_next_poll_at", "scan_jobs", ["next_poll_at"]),
+        ),
+        "news_articles": lambda: (
+            op.create_table(
+                "news_articles",
+                sa.Column("id", sa.Integer, primary_key=True),
+                sa.Column("url", sa.String, nullable=False, unique=True),
+                sa.Column("title", sa.Text),
+                sa.Column("description", sa.Text),
+                sa.Column("source_name", sa.String),
+                sa.Column("published_at", sa.DateTime(timezone=True)),
+                sa.Column("fetched_at", sa.DateTime(timezone=True), server_default=now),
+            ),
+            op.create_index("ix_news_articles_id", "news_articles", ["id"]),
+            op.create_index("ix_news_articles_published_at", "news_articles", ["published_at"]),
+        ),
+        "news_terms": lambda: op.create_table(
+            "news_terms",
+            sa.Column("term", sa.String, primary_key=True),
+            sa.Column("article_id", sa.Integer, sa.ForeignKey("news_articles.id", ondelete="CASCADE"),
+                      primary_key=True),
+        ),
+        "news_fetches": lambda: op.create_table(
+            "news_fetches",
+            sa.Column("terms", sa.String, primary_key=True),
+            sa.Column("last_fetched_at", sa.DateTime(timezone=True), nullable=False),
+        ),
+    }
+
+
+def upgrade():
+    # offline (--sql) scripts target an empty database
+    existing = set() if context.is_offline_mode() else set(sa.inspect(op.get_bind()).get_table_names())
+    for name, create in _tables().items():
+        if name not in existing:
+            create()
+
+
+def downgrade():
+    for name in reversed(list(_tables())):
+        op.drop_table(name)
@@ -0,0 +1,54 @@
+"""latest verdict columns and history indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Adds artifacts.latest_score / latest_label / last_verified_at, written
+together with each new risk score, and (artifact_id, time) indexes on
+the history tables. Existing artifacts are backfilled from their newest
+risk score and evidence.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_risk_scores_artifact_id_computed_at", "risk_scores", ["artifact_id", "computed_at"])
+    op.create_index("ix_evidences_artifact_id_captured_at", "evidences", ["artifact_id", "captured_at"])
+
+    with op.batch_alter_table("artifacts") as batch:
+        batch.add_column(sa.Column("latest_score", sa.Integer))
+        batch.add_column(sa.Column("latest_label", sa.String))
+        batch.add_column(sa.Column("last_verified_at", sa.DateTime(timezone=True)))
+
+    # correlated subqueries run on the indexes created above
+    op.execute("""
+        UPDATE artifacts SET
+            latest_score = (
+                SELECT rs.score FROM risk_scores rs WHERE rs.artifact_id = artifacts.id
+                ORDER BY rs.computed_at DESC, rs.id DESC LIMIT 1
+            ),
+            latest_label = (
+                SELECT rs.label FROM risk_scores rs WHERE rs.artifact_id = artifacts.id
+                ORDER BY rs.computed_at DESC, rs.id DESC LIMIT 1
+            ),
+            last_verified_at = (
+                SELECT MAX(ev.captured_at) FROM evidences ev WHERE ev.artifact_id = artifacts.id
+            )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table("artifacts") as batch:
+        batch.drop_column("last_verified_at")
+        batch.drop_column("latest_label")
+        batch.drop_column("latest_score")
+
+    op.drop_index("ix_evidences_artifact_id_captured_at", table_name="evidences")
+    op.drop_index("ix_risk_scores_artifact_id_computed_at", table_name="risk_scores")
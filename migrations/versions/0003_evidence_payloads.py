@@ -0,0 +1,129 @@
+"""content-addressed evidence payloads
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+Adapter results move out of evidences.summary (str() of a dict) into
+evidence_payloads, stored once per artifact, source and content as JSON;
+evidences keep a payload_id. Existing summaries are parsed back into
+values, deduplicated and linked, then the summary column is dropped.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.core.payloads import decode_payload, encode_payload, parse_legacy_summary
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# artifacts converted per round; payload dedup state is kept per round
+BATCH = 500
+
+# table shapes as of this revision; ids come back through inserted_primary_key
+_meta = sa.MetaData()
+evidences = sa.Table(
+    "evidences", _meta,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("artifact_id", sa.Integer),
+    sa.Column("source", sa.String),
+    sa.Column("summary", sa.Text),
+    sa.Column("payload_id", sa.Integer),
+)
+payloads = sa.Table(
+    "evidence_payloads", _meta,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("artifact_id", sa.Integer),
+    sa.Column("source", sa.String),
+    sa.Column("content_hash", sa.String),
+    sa.Column("compression", sa.String),
+    sa.Column("body", sa.LargeBinary),
+)
+
+
+def upgrade():
+    if context.is_offline_mode():
+        # summaries are converted in Python; a SQL script would drop them unconverted
+        raise RuntimeError("revision 0003 cannot run in --sql mode; run `alembic upgrade head` against the database")
+
+    op.create_table(
+        "evidence_payloads",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("artifact_id", sa.Integer, sa.ForeignKey("artifacts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("source", sa.String, nullable=False),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("compression", sa.String),
+        sa.Column("body", sa.LargeBinary, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("artifact_id", "source", "content_hash", name="uq_evidence_payloads_content"),
+    )
+    op.create_index("ix_evidence_payloads_id", "evidence_payloads", ["id"])
+
+    with op.batch_alter_table("evidences") as batch:
+        batch.add_column(sa.Column("payload_id", sa.Integer))
+        batch.create_foreign_key("fk_evidences_payload_id", "evidence_payloads", ["payload_id"], ["id"],
+                                 ondelete="CASCADE")
+
+    _move_summaries(op.get_bind())
+
+    with op.batch_alter_table("evidences") as batch:
+        batch.drop_column("summary")
+
+
+def _move_summaries(bind):
+    link = evidences.update().where(evidences.c.id == sa.bindparam("b_id")) \
+        .values(payload_id=sa.bindparam("b_payload_id"))
+    after = 0
+    while True:
+        artifact_ids = [r[0] for r in bind.execute(
+            sa.select(evidences.c.artifact_id).distinct()
+            .where(evidences.c.artifact_id > after)
+            .order_by(evidences.c.artifact_id).limit(BATCH)
+        )]
+        if not artifact_ids:
+            return
+
+        rows = bind.execute(
+            sa.select(evidences.c.id, evidences.c.artifact_id, evidences.c.source, evidences.c.summary)
+            .where(evidences.c.artifact_id.in_(artifact_ids))
+            .where(evidences.c.summary.isnot(None))
+            .order_by(evidences.c.id)
+        ).fetchall()
+
+        stored, updates = {}, []
+        for row in rows:
+            content_hash, body, compression = encode_payload(parse_legacy_summary(row.summary))
+            key = (row.artifact_id, row.source or "", content_hash)
+            if key not in stored:
+                stored[key] = bind.execute(payloads.insert().values(
+                    artifact_id=row.artifact_id, source=row.source or "", content_hash=content_hash,
+                    compression=compression, body=body,
+                )).inserted_primary_key[0]
+            updates.append({"b_id": row.id, "b_payload_id": stored[key]})
+        if updates:
+            bind.execute(link, updates)
+        after = artifact_ids[-1]
+
+
+def downgrade():
+    with op.batch_alter_table("evidences") as batch:
+        batch.add_column(sa.Column("summary", sa.Text))
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(evidences.c.id, payloads.c.body, payloads.c.compression)
+        .select_from(evidences.join(payloads, payloads.c.id == evidences.c.payload_id))
+    )
+    fill = evidences.update().where(evidences.c.id == sa.bindparam("b_id")).values(summary=sa.bindparam("b_summary"))
+    while True:
+        chunk = rows.fetchmany(1000)
+        if not chunk:
+            break
+        bind.execute(fill, [{"b_id": r.id, "b_summary": str(decode_payload(r.body, r.compression))} for r in chunk])
+
+    with op.batch_alter_table("evidences") as batch:
+        batch.drop_constraint("fk_evidences_payload_id", type_="foreignkey")
+        batch.drop_column("payload_id")
+    op.drop_table("evidence_payloads")
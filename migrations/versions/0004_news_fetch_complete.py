@@ -0,0 +1,27 @@
+"""news_fetches.complete
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+Marks fetches that stored every matching article; only those answer
+queries for supersets of their tokens. Existing rows are unknown, so
+they start incomplete.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("news_fetches") as batch:
+        batch.add_column(sa.Column("complete", sa.Boolean, nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    with op.batch_alter_table("news_fetches") as batch:
+        batch.drop_column("complete")
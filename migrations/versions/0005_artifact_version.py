@@ -0,0 +1,26 @@
+"""artifacts.version
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+Counter bumped when a scan job edits an artifact's stored evidence or
+score in place; part of the artifact ETag.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("artifacts") as batch:
+        batch.add_column(sa.Column("version", sa.Integer, nullable=False, server_default="0"))
+
+
+def downgrade():
+    with op.batch_alter_table("artifacts") as batch:
+        batch.drop_column("version")
@@ -0,0 +1,178 @@
+"""
+Builds app/data/rbi_nbfc_index.json.gz from the RBI NBFC/ARC workbook.
+
+Usage:
+    python -m scripts.build_rbi_index [path/to/list.xlsx] [out.json.gz]
+
+The workbook is read with the standard library (it is just zipped XML),
+so the build needs no extra dependencies. Re-run whenever the XLSX in
+app/data is replaced with a newer RBI publication.
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+
+from app.adapters.rbi_adapter import INDEX_PATH, INDEX_VERSION, normalize_name, trigrams
+
+DEFAULT_XLSX = os.path.join(os.path.dirname(INDEX_PATH), "rbi_nbfc_list.csv.XLSX")
+
+NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+FIELDS = ["name", "cin", "regional_office", "classification"]
+HEADERS = {
+    "nbfc name": "name",
+    "corporate identification number": "cin",
+    "regional office": "regional_office",
+    "classification": "classification",
+}
+
+# Grams shared by more than this fraction of names carry no signal
+# ("fin", "inv", ...) and would make candidate counting slow.
+MAX_NGRAM_DF = 0.01
+
+_ALIAS = re.compile(
+    r"[\(\[]\s*(?:formerly(?:\s+known\s+as)?|old\s+name|earlier\s+known\s+as|erstwhile|name\s+as\s+per\s+mca)"
+    r"\s*[:\-]?\s*(.*?)[\)\]]",
+    re.I,
+)
+_BRACKETS = re.compile(r"[\(\[][^\)\]]*[\)\]]")
+_AND = re.compile(r"\s+(?:and|&)\s+", re.I)
+
+
+def _col(ref: str) -> str:
+    return re.match(r"[A-Z]+", ref).group(0)
+
+
+def read_sheets(path: str):
+    """
+    Yields (sheet_name, rows) where rows is a list of {column: text}.
+    """
+    with zipfile.ZipFile(path) as z:
+        shared = [
+            "".join(t.text or "" for t in si.iter(f"{{{NS['m']}}}t"))
+            for si in ET.fromstring(z.read("xl/sharedStrings.xml")).findall("m:si", NS)
+        ]
+        sheets = sorted(n for n in z.namelist() if re.match(r"xl/worksheets/sheet\d+\.xml$", n))
+
+        for sheet in sheets:
+            root = ET.fromstring(z.read(sheet))
+            rows = []
+            for row in root.iterfind("m:sheetData/m:row", NS):
+                values = {}
+                for c in row.findall("m:c", NS):
+                    v = c.find("m:v", NS)
+                    if v is None:
+                        continue
+                    values[_col(c.get("r"))] = shared[int(v.text)] if c.get("t") == "s" else v.text
+                rows.append(values)
+            yield sheet, rows
+
+
+def extract_records(path: str):
+    """
+    Yields one dict per registry row from every sheet that has an
+    "NBFC Name" header (the NBFC list and the ARC list).
+    """
+    for sheet, rows in read_sheets(path):
+        columns = None
+        for values in rows:
+            if columns is None:
+                lowered = {col: (text or "").strip().lower() for col, text in values.items()}
+                if "nbfc name" in lowered.values():
+                    columns = {col: HEADERS[h] for col, h in lowered.items() if h in HEADERS}
+                continue
+
+            record = {field: (values.get(col) or "").strip() for col, field in columns.items()}
+            if not record.get("name"):
+                continue
+            if not record.get("classification") and "ARC" in record["name"].upper():
+                record["classification"] = "ARC"
+            yield record
+
+
+def split_aliases(raw: str):
+    """
+    "X Ltd (Formerly : Y Limited and Z Ltd)" -> ["X Ltd", "Y Limited", "Z Ltd"]
+    Only splits on "and" after a legal suffix, so "Finance and Investments"
+    stays one name.
+    """
+    names = [_BRACKETS.sub(" ", raw).strip()]
+
+    for m in _ALIAS.finditer(raw):
+        current = []
+        for part in _AND.split(m.group(1)):
+            current.append(part)
+            if normalize_name(part) != _plain_key(part):
+                names.append(" and ".join(current))
+                current = []
+        if current:
+            names.append(" and ".join(current))
+
+    return [n for n in names if n.strip()]
+
+
+def _plain_key(text: str) -> str:
+    # normalize without stripping legal suffixes, to detect whether one was present
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower().replace("&", " and ").replace(".", "")).split())
+
+
+def build_index(records) -> dict:
+    entries, keys, key_entry = [], [], []
+    seen = set()
+
+    for record in records:
+        entry_id = len(entries)
+        entries.append([record.get(f) or None for f in FIELDS])
+
+        for alias in split_aliases(record["name"]):
+            key = normalize_name(alias)
+            if key and key not in seen:
+                seen.add(key)
+                keys.append(key)
+                key_entry.append(entry_id)
+
+    tokens, ngrams = defaultdict(list), defaultdict(list)
+    for key_id, key in enumerate(keys):
+        for tok in set(key.split()):
+            tokens[tok].append(key_id)
+        for gram in trigrams(key):
+            ngrams[gram].append(key_id)
+
+    max_df = max(1, int(len(keys) * MAX_NGRAM_DF))
+    ngrams = {g: ids for g, ids in ngrams.items() if len(ids) <= max_df}
+
+    return {
+        "version": INDEX_VERSION,
+        "built_at": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "fields": FIELDS,
+        "entries": entries,
+        "keys": keys,
+        "key_entry": key_entry,
+        "tokens": tokens,
+        "ngrams": ngrams,
+    }
+
+
+def main(argv):
+    src = argv[1] if len(argv) > 1 else DEFAULT_XLSX
+    out = argv[2] if len(argv) > 2 else INDEX_PATH
+
+    index = build_index(extract_records(src))
+    with open(src, "rb") as f:
+        index["source_sha256"] = hashlib.sha256(f.read()).hexdigest()
+
+    with gzip.open(out, "wt", encoding="utf-8", compresslevel=9) as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    print(f"{len(index['entries'])} entries, {len(index['keys'])} names -> {out} ({os.path.getsize(out)} bytes)")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
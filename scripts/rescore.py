@@ -0,0 +1,300 @@
+"""
+Recomputes risk scores of stored artifacts from their latest evidence,
+without calling any upstream API. Run after changing the rule table in
+app/services/risk_engine.py.
+
+Usage:
+    python -m scripts.rescore [--chunk-size 500] [--workers N] [--after-id ID] [--dry-run]
+    python -m scripts.rescore --what-if overrides.json [--chunk-size 500] [--workers N]
+
+Artifacts are streamed in id order through a server-side cursor, grouped
+into fixed-size chunks and scored in worker processes; each chunk's new
+RiskScore rows and the artifacts' latest verdicts go in with one
+executemany each. At most 2 x workers chunks are in flight, so memory
+does not grow with the table. Progress lines carry
+the last artifact id written: pass it as --after-id to resume.
+
+--what-if scores the same evidence under the live rule table and under
+one with some rules changed (JSON in RuleEngine.with_overrides form, e.g.
+{"domain_age_lt_30d": {"points": 50, "when": [["domain_age_days", "<", 45]]}}),
+each chunk as one NumPy batch per profile, and reports how labels and
+rule hits would move. It writes nothing.
+"""
+import argparse
+import datetime
+import itertools
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.adapters.whois_adapter import age_days
+from app.core.payloads import decode_payload
+from app.crud import latest_evidences_query, latest_verdict_update, scores_t
+from app.db.session import engine as db_engine
+from app.services import verdict_cache
+from app.services.orchestrator import canonical_artifact
+from app.services.risk_engine import engine as rules, extract_signals, profile_for, risk_label
+
+
+def parse_payload(body, compression):
+    """
+    Stored adapter result, None if it is missing or not a dict (its
+    source is then left out).
+    """
+    try:
+        data = decode_payload(body, compression)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def restore_whois(data: dict) -> dict:
+    """
+    Stored WHOIS evidence as a live lookup would see it now: age_days is
+    recomputed from creation_date (it is frozen at capture), and evidence
+    stored before "error" was kept counts as a failed lookup when it
+    holds no registration data.
+    """
+    data = dict(data)
+    if data.get("creation_date"):
+        try:
+            data["age_days"] = age_days(data["creation_date"])
+        except ValueError:
+            pass
+    if "error" not in data and not (data.get("status") or data.get("registrar") or data.get("creation_date")):
+        data["error"] = "unknown (not stored)"
+    return data
+
+
+def load_results(evidences):
+    """
+    (adapter results by source, number of unparseable evidences) for one
+    artifact's [(source, body, compression), ...].
+    """
+    results = {}
+    unparsed = 0
+    for source, body, compression in evidences:
+        data = parse_payload(body, compression)
+        if data is None:
+            unparsed += 1
+        else:
+            results[source] = restore_whois(data) if source == "whois" else data
+    return results, unparsed
+
+
+def score_chunk(chunk):
+    """
+    Runs in a worker process. chunk is a list of
+    (artifact_id, type, value, [(source, body, compression), ...]); returns
+    (scored rows, number of unparseable evidences).
+    """
+    scored = []
+    unparsed = 0
+    for artifact_id, type_, value, evidences in chunk:
+        results, bad = load_results(evidences)
+        unparsed += bad
+
+        vec, details = extract_signals(results)
+        scoring = rules.evaluate(vec, profile_for(type_), details)
+        scored.append((artifact_id, type_, value, scoring))
+    return scored, unparsed
+
+
+def load_overrides(path: str) -> dict:
+    with open(path) as f:
+        overrides = json.load(f)
+    for changes in overrides.values():
+        if "when" in changes:
+            changes["when"] = tuple(tuple(check) for check in changes["when"])
+    return overrides
+
+
+_variant = None     # the --what-if rule table, built once per worker process
+
+
+def init_what_if(overrides: dict):
+    global _variant
+    _variant = rules.with_overrides(overrides)
+
+
+def what_if_chunk(chunk):
+    """
+    Runs in a worker process: scores chunk under the live and the
+    --what-if table. Returns (last artifact id, Counter of (label, new
+    label), Counter of rule id -> change in hits, unparseable evidences).
+    """
+    vectors = defaultdict(list)
+    unparsed = 0
+    for _, type_, _, evidences in chunk:
+        results, bad = load_results(evidences)
+        unparsed += bad
+        vectors[profile_for(type_)].append(extract_signals(results)[0])
+
+    labels = Counter()
+    hits = Counter()
+    for profile, matrix in vectors.items():
+        scores, fired = rules.score_batch(matrix, profile)
+        new_scores, new_fired = _variant.score_batch(matrix, profile)
+        labels.update(zip(map(risk_label, scores), map(risk_label, new_scores)))
+        for rule_id, before, after in zip(rules.batch_rule_ids(profile), fired.sum(axis=0), new_fired.sum(axis=0)):
+            hits[rule_id] += int(after) - int(before)
+    return chunk[-1][0], labels, hits, unparsed
+
+
+def stream_artifacts(conn, after_id: int, chunk_size: int):
+    result = conn.execution_options(stream_results=True, yield_per=chunk_size * 8).execute(
+        latest_evidences_query(after_id)
+    )
+    for (artifact_id, type_, value), rows in itertools.groupby(result, key=lambda r: (r.id, r.type, r.value)):
+        yield artifact_id, type_, value, [
+            # bytes, not psycopg2's memoryview: chunks are pickled to the workers
+            (r.source, bytes(r.body) if r.body is not None else None, r.compression) for r in rows
+        ]
+
+
+def chunked(iterable, size: int):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_chunks(fn, chunks, workers: int, initializer=None, initargs=()):
+    """
+    fn(chunk) for every chunk, in worker processes when workers > 1.
+    Results come back in submission order with at most 2 x workers
+    chunks in flight.
+    """
+    if workers <= 1:
+        if initializer:
+            initializer(*initargs)
+        for chunk in chunks:
+            yield fn(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(fn, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_scores(conn, scored, now):
+    # the new scores and the artifacts' verdict columns commit together
+    with conn.begin():
+        conn.execute(scores_t.insert(), [
+            {
+                "artifact_id": artifact_id,
+                "score": scoring["score"],
+                "label": scoring["label"],
+                "reasons": scoring["reasons"],
+                "computed_at": now,
+            }
+            for artifact_id, _, _, scoring in scored
+        ])
+        conn.execute(latest_verdict_update(), [
+            {"b_artifact_id": artifact_id, "b_score": scoring["score"], "b_label": scoring["label"],
+             "b_computed_at": now}
+            for artifact_id, _, _, scoring in scored
+        ])
+    verdict_cache.delete_verdicts([
+        verdict_cache.cache_key(*canonical_artifact(value, type_))
+        for _, type_, value, _ in scored
+    ])
+
+
+def run(chunk_size: int, workers: int, after_id: int, dry_run: bool):
+    labels = Counter()
+    done = unparsed = 0
+    last_id = after_id
+    started = time.monotonic()
+    now = datetime.datetime.now(datetime.timezone.utc)
+
+    def handle(scored, bad):
+        nonlocal done, unparsed, last_id
+        if not dry_run:
+            write_scores(writer, scored, now)
+        labels.update(scoring["label"] for _, _, _, scoring in scored)
+        done += len(scored)
+        unparsed += bad
+        last_id = scored[-1][0]
+        rate = done / max(time.monotonic() - started, 1e-9)
+        print(f"{done} artifacts, {rate:.0f}/s, last id {last_id}", file=sys.stderr)
+
+    with db_engine.connect() as reader:
+        # SQLite allows commits while a read is open on the same
+        # connection; a Postgres named cursor would be closed by one.
+        writer = reader if db_engine.dialect.name == "sqlite" else db_engine.connect()
+        try:
+            chunks = chunked(stream_artifacts(reader, after_id, chunk_size), chunk_size)
+            # results are written in submission order, so "last id" in
+            # the progress output is always a safe resume point
+            for scored, bad in map_chunks(score_chunk, chunks, workers):
+                handle(scored, bad)
+        finally:
+            if writer is not reader:
+                writer.close()
+
+    elapsed = time.monotonic() - started
+    action = "scored (dry run)" if dry_run else "rescored"
+    print(f"{done} artifacts {action} in {elapsed:.1f}s; labels {dict(labels)}; "
+          f"{unparsed} unparseable evidences skipped")
+
+
+def run_what_if(path: str, chunk_size: int, workers: int, after_id: int):
+    overrides = load_overrides(path)
+    rules.with_overrides(overrides)     # unknown rule ids fail here, not in a worker
+    labels = Counter()
+    hits = Counter()
+    done = unparsed = 0
+    started = time.monotonic()
+
+    with db_engine.connect() as reader:
+        chunks = chunked(stream_artifacts(reader, after_id, chunk_size), chunk_size)
+        for last_id, chunk_labels, chunk_hits, bad in map_chunks(
+            what_if_chunk, chunks, workers, init_what_if, (overrides,)
+        ):
+            labels.update(chunk_labels)
+            hits.update(chunk_hits)
+            done += sum(chunk_labels.values())
+            unparsed += bad
+            print(f"{done} artifacts, last id {last_id}", file=sys.stderr)
+
+    changed = {f"{old}->{new}": n for (old, new), n in sorted(labels.items()) if old != new}
+    before, after = Counter(), Counter()
+    for (old, new), n in labels.items():
+        before[old] += n
+        after[new] += n
+    elapsed = time.monotonic() - started
+    print(f"{done} artifacts scored with {path} in {elapsed:.1f}s; {unparsed} unparseable evidences skipped")
+    print(f"labels {dict(before)} -> {dict(after)}; changed {changed or 'none'}")
+    for rule_id, delta in sorted(hits.items()):
+        if delta:
+            print(f"  {rule_id}: {delta:+d} artifacts")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute risk scores from stored evidence.")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this artifact id")
+    parser.add_argument("--dry-run", action="store_true", help="score but write nothing")
+    parser.add_argument("--what-if", metavar="OVERRIDES_JSON",
+                        help="compare against a rule table with these overrides; writes nothing")
+    args = parser.parse_args(argv)
+    if args.what_if:
+        run_what_if(args.what_if, args.chunk_size, args.workers, args.after_id)
+    else:
+        run(args.chunk_size, args.workers, args.after_id, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Refreshes the bundled app/data/public_suffix_list.dat.gz from publicsuffix.org.
+
+Usage:
+    python -m scripts.update_public_suffix_list [source URL or local .dat file]
+
+The API never downloads the list itself; commit the refreshed file.
+"""
+import gzip
+import os
+import sys
+
+import httpx
+
+from app.core.domains import PSL_PATH, PublicSuffixList
+
+PSL_URL = "https://publicsuffix.org/list/public_suffix_list.dat"
+
+# A truncated download would silently make most suffixes unknown
+MIN_RULES = 5000
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    source = argv[0] if argv else PSL_URL
+
+    if os.path.exists(source):
+        with open(source, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        response = httpx.get(source, timeout=30, follow_redirects=True)
+        response.raise_for_status()
+        text = response.text
+
+    psl = PublicSuffixList.parse(text.splitlines())
+    count = len(psl.rules) + len(psl.wildcards) + len(psl.exceptions)
+    if count < MIN_RULES:
+        sys.exit(f"Only {count} rules parsed from {source}; refusing to replace {PSL_PATH}")
+
+    tmp = PSL_PATH + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, PSL_PATH)
+    print(f"Wrote {count} rules to {PSL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Verdicts are per host: a subdomain listed in OpenPhish must not share a
+cached verdict (or an artifact row) with its registrable domain.
+
+    python -m pytest tests
+"""
+import os
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["REDIS_URL"] = "memory://"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.adapters import openphish_adapter
+from app.services import orchestrator
+from app.services.warmup import warmup
+
+
+def _fake(data):
+    return lambda *args: dict(data)
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setattr(orchestrator, "search_news", _fake({"total_articles": 0, "scam_related": 0, "scam_articles": []}))
+    monkeypatch.setattr(orchestrator, "domain_whois_info", _fake({"registrar": "R", "creation_date": "2001-01-01T00:00:00"}))
+    monkeypatch.setattr(orchestrator, "vt_check_domain", _fake({"malicious": 0, "source": "virustotal_domain"}))
+    feed = openphish_adapter.openphish_feed
+    monkeypatch.setattr(feed, "start", lambda: None)
+    monkeypatch.setattr(feed, "refresh", lambda: False)
+    monkeypatch.setattr(feed, "domains", openphish_adapter.parse_feed("http://evil.example.com/login\n"))
+    monkeypatch.setattr(feed, "last_updated", time.time())
+
+    from app.main import app
+    with TestClient(app) as c:
+        for _ in range(200):
+            if warmup.finished_at:
+                break
+            time.sleep(0.05)
+        yield c
+
+
+def _verify(client, query, refresh=False):
+    r = client.post("/api/verify", json={"query": query, "refresh": refresh})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_listed_subdomain_does_not_share_parent_verdict(client):
+    parent = _verify(client, "example.com", refresh=True)
+    listed = _verify(client, "evil.example.com")
+    assert listed["cache"]["hit"] is False
+    assert listed["artifact"]["value"] == "evil.example.com"
+    assert listed["artifact"]["id"] != parent["artifact"]["id"]
+    assert "openphish_hit" in {r["rule_id"] for r in listed["reasons"]}
+    assert listed["score"] > parent["score"]
+
+    again = _verify(client, "WWW.Example.com.")
+    assert again["cache"]["hit"] is True
+    assert again["score"] == parent["score"]
+    assert "openphish_hit" not in {r["rule_id"] for r in again["reasons"]}